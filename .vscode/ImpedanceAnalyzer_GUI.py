@@ -12,10 +12,24 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import *
+from tkinter import messagebox
 
 from ctypes import *
 from dwfconstants import *
-
+from dwfBackend import loadDwf, openDevice
+from sweepPlan import SweepPlan
+from sweepEngine import SweepEngine
+from resultWriter import ResultWriter
+from sweepWorker import SweepWorker
+from sweepTimer import SweepTimer
+from autoRange import AutoRange
+from compensation import Compensation
+from broadbandSweep import BroadbandSweep
+from rawCapture import RawSweep
+from checkpoint import findCheckpoint, checkpointPlan
+from livePlot import LivePlot
+
+import os
 import math
 import time
 import sys
@@ -27,10 +41,8 @@ import matplotlib.pyplot as plt
 # Variables Definitons
 win = Tk()
 hdwf = c_int()
+serial = None                   # Serial number of the connected AD2, the same device is opened again after a device error
 szerr = create_string_buffer(512)
-sts = c_byte()
-impedance = c_double()
-phase = c_double()
 
 # Default values for Parameters
 freq_start = int(3.5e6)
@@ -41,14 +53,15 @@ amp_end = int(1000)
 amp_delta = int(100)
 resistance = int(1000)
 dec = tk.BooleanVar()           # WICHTIG!: Diese Variable muss NACH der Fenster Definition 'win = Tk()' definiert werden!!
+txt = tk.BooleanVar(value=True) # Additionally writes the classic text files
+rng = tk.BooleanVar()           # Selects the reference resistor automatically, the chosen one is the start range
+wide = tk.BooleanVar()          # Broadband screening: all frequencies at once with a multisine (see 'broadbandSweep.py')
+cmp = tk.BooleanVar()           # Open/short compensation of the fixture (see 'compensation.py'), always on with auto range
+raw = tk.BooleanVar()           # Stores the waveforms of C1/C2 of every point, can be analysed again later (see 'rawCapture.py')
+worker = None                   # Background thread of the running sweep
 
 # Load .dll
-if sys.platform.startswith("win"):
-    dwf = cdll.LoadLibrary("dwf.dll")
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+dwf = loadDwf()
 # endregion
 
 
@@ -56,8 +69,9 @@ else:
 
 # region Window Functions
 def connectFunction():
+    global serial
     connectButton.update()
-    dwf.FDwfDeviceOpen(c_int(-1), byref(hdwf))
+    serial = openDevice(dwf, hdwf)
 
     if hdwf.value == hdwfNone.value:
         dwf.FDwfGetLastErrorMsg(szerr)
@@ -67,6 +81,7 @@ def connectFunction():
         connectButton["state"] = tk.DISABLED
         disconnectButton["state"] = tk.NORMAL
         startButton["state"] = tk.NORMAL
+        resumeButton["state"] = tk.NORMAL
         setButton["state"] = tk.NORMAL
         infoOutput.insert(tk.INSERT, "AD2 connected\n")
         infoOutput.see("end")
@@ -78,6 +93,7 @@ def disconnectFunction():
     connectButton["state"] = tk.NORMAL
     disconnectButton["state"] = tk.DISABLED
     startButton["state"] = tk.DISABLED
+    resumeButton["state"] = tk.DISABLED
     setButton["state"] = tk.DISABLED
     infoOutput.insert(tk.INSERT, "AD2 disconnected\n")
     infoOutput.see("end")
@@ -92,18 +108,15 @@ def setFunction():
     global amp_end
     global amp_delta
     global resistance
-    freq_start = int(startFreqInput.get())
-    freq_end = int(endFreqInput.get())
-    freq_delta = int(deltaFreqInput.get())
+    freq_start = float(startFreqInput.get())
+    freq_end = float(endFreqInput.get())
+    freq_delta = float(deltaFreqInput.get())
     amp_start = int(startAmpInput.get())
     amp_end = int(endAmpInput.get())
     amp_delta = int(deltaAmpInput.get())
     resistance = int(resistanceInput.get())
     
-    dwf.FDwfDeviceAutoConfigureSet(hdwf, c_int(3))                          # Enabling dynamic adjustment of analog out settings like: frequency, amplitude...
-    dwf.FDwfAnalogImpedanceReset(hdwf)
-    dwf.FDwfAnalogImpedanceModeSet(hdwf, c_int(8))                          # 0 = W1-C1-DUT-C2-R-GND, 1 = W1-C1-R-C2-DUT-GND, 8 = AD IA adapter
-    dwf.FDwfAnalogImpedanceReferenceSet(hdwf, c_double(resistance))         # Sets the reference resistor value in Ohms
+    SweepEngine(dwf, hdwf).configure(currentPlan())                         # Mode, reference resistor...
     time.sleep(1)
 
     if (dec.get() == False):
@@ -116,80 +129,137 @@ def setFunction():
     infoOutput.see("end")
 
 
+# Builds the sweep plan from the current parameters
+def currentPlan():
+    return SweepPlan.linear(freq_start, freq_end, freq_delta, amp_start, amp_end, amp_delta, resistance, dec.get())
+
+
+# Asks the user to connect the open / short standard during a compensation measurement
+def compensationPrompt(text):
+    infoOutput.insert(tk.INSERT, text + "\n")
+    infoOutput.see("end")
+    messagebox.showinfo("Compensation", text)
+
+
+# Writes which pass is starting to the info box
+def passFunction(amp, direction):
+    infoOutput.insert(tk.INSERT, "Start Measurement " + direction + ": " + str(amp) + "mV \n")
+    infoOutput.see('end')                               # Allows scrolling in text widget
+
+
 def startFunction():
-    win.update()
-    initial = time.time()                               # Take time stamp
-
-    # region Measurement
-    dwf.FDwfAnalogImpedanceConfigure(hdwf, c_int(1))    # Measurement Start
-
-    # region For-loop Increasing
-    # ut.measurementFunction(hdwf, sts, infoOutput, amp_start, amp_end, amp_delta, freq_start, freq_end, freq_delta, resistance)
-    for amp in range(amp_start, amp_end + 1, amp_delta):                    # Runs all the amplitude range
-        infoOutput.insert(tk.INSERT, "Start Measurement Inc: " + str(amp) + "mV \n")
-        infoOutput.update()                                                 # Forces the GUI to update the text box
-        infoOutput.see('end')                                               # Allows scrolling in text widget 
-
-        extfile = open("impedance_" + str(amp) + "mV_" + str(resistance) + "Ohm_Inc.txt", "w")  # Open text-file to write measurement values
-        dwf.FDwfAnalogImpedanceAmplitudeSet(hdwf, c_double(float(amp/1000)))                    # Sets the stimulus amplitude (0V to peak signal)
-
-        for freq in range(freq_start, freq_end + 1, freq_delta):            # Runs all the frequency range increasing
-            dwf.FDwfAnalogImpedanceFrequencySet(hdwf, c_double(freq))       # Sets the stimulus frequency
-            time.sleep(0.01)                                                # Settle time of device under test (DUT), this value depends on the device!
-            dwf.FDwfAnalogImpedanceStatus(hdwf, None)                       # Ignore last capture since we changed the frequency
-
-            while True:
-                if dwf.FDwfAnalogImpedanceStatus(hdwf, byref(sts)) == 0:
-                    dwf.FDwfGetLastErrorMsg(szerr)
-                    print(str(szerr.value))
-                    quit()
-                if sts.value == 2:
-                    break
-
-            dwf.FDwfAnalogImpedanceStatusMeasure(hdwf, DwfAnalogImpedanceImpedance, byref(impedance))   # Read the DUT impedance value
-            dwf.FDwfAnalogImpedanceStatusMeasure(hdwf, DwfAnalogImpedanceImpedancePhase, byref(phase))  # Read the DUT phase value
-            extfile.write(str(freq) + "\t" + str(abs(impedance.value)) + "\t" + str((phase.value / math.pi) * 180.0) + "\n")    # Write frequency, impedance and phase value to file
-
-        extfile.close()
-    # endregion
-
-    # region For-loop Decreasing
-    if(dec.get() == True):       
-        for amp in range(amp_start, amp_end + 1, amp_delta):                    # Runs all the amplitude range
-            infoOutput.insert(tk.INSERT, "Start Measurement Dec: " + str(amp) + "mV \n")
-            infoOutput.update()                                                 # Forces the GUI to update the text box
-            infoOutput.see('end')                                               # Allows scrolling in text widget 
-
-            extfile = open("impedance_" + str(amp) + "mV_" + str(resistance) + "Ohm_Dec.txt", "w")  # Open text-file to write measurement values
-            dwf.FDwfAnalogImpedanceAmplitudeSet(hdwf, c_double(float(amp/1000)))                    # Sets the stimulus amplitude (0V to peak signal)
-
-            for freq in range(freq_end, freq_start - 1, -freq_delta):               # Runs all the frequency range decreasing
-                dwf.FDwfAnalogImpedanceFrequencySet(hdwf, c_double(freq))       # Sets the stimulus frequency
-                time.sleep(0.01)                                                # Settle time of device under test (DUT), this value depends on the device!
-                dwf.FDwfAnalogImpedanceStatus(hdwf, None)                       # Ignore last capture since we changed the frequency
-
-                while True:
-                    if dwf.FDwfAnalogImpedanceStatus(hdwf, byref(sts)) == 0:
-                        dwf.FDwfGetLastErrorMsg(szerr)
-                        print(str(szerr.value))
-                        quit()
-                    if sts.value == 2:
-                        break
-
-                dwf.FDwfAnalogImpedanceStatusMeasure(hdwf, DwfAnalogImpedanceImpedance, byref(impedance))   # Read the DUT impedance value
-                dwf.FDwfAnalogImpedanceStatusMeasure(hdwf, DwfAnalogImpedanceImpedancePhase, byref(phase))  # Read the DUT phase value
-                extfile.write(str(freq) + "\t" + str(abs(impedance.value)) + "\t" + str((phase.value / math.pi) * 180.0) + "\n")    # Write frequency, impedance and phase value to file
-
-            extfile.close()
-    # endregion
-
-    dwf.FDwfAnalogImpedanceConfigure(hdwf, c_int(0))    # Measurement End
-    # endregion
-
-    final = time.time()                                 # Take time stamp
-    infoOutput.insert(tk.INSERT, "Finished: " + str(round(final - initial, 2)) + "s\n")
-    infoOutput.update()
-    infoOutput.see("end")                               # Allows scrolling in text widget
+    plan = currentPlan()
+    if wide.get() and (dec.get() or rng.get()):                                     # One record of all tones with one reference resistor
+        infoOutput.insert(tk.INSERT, "Broadband mode has no 'Decrease' pass and no auto range, switch them off\n")
+        return
+    if raw.get() and rng.get():                                                     # The raw file stores the waveforms of one reference resistor
+        infoOutput.insert(tk.INSERT, "Raw mode has no auto range, switch it off\n")
+        return
+    if (wide.get() or raw.get()) and cmp.get():                                     # Only the point by point sweep corrects its results
+        infoOutput.insert(tk.INSERT, "Broadband and raw mode have no compensation, switch it off\n")
+        return
+    startSweep(plan, "impedance_" + str(resistance) + "Ohm_" + time.strftime("%Y%m%d_%H%M%S"), wide.get(), raw.get())
+
+
+# Continues the newest unfinished sweep of the working folder with the plan stored in its checkpoint (always point by point)
+def resumeFunction():
+    filename = findCheckpoint()
+    if filename is None:
+        infoOutput.insert(tk.INSERT, "No unfinished measurement to resume\n")
+        infoOutput.see("end")
+        return
+    infoOutput.insert(tk.INSERT, "Resume: " + filename + "\n")
+    startSweep(checkpointPlan(filename), os.path.splitext(filename)[0])
+
+
+# Configures the device for 'plan' and runs it on the sweep worker, all files are named 'name'...
+def startSweep(plan, name, broadband=False, waveforms=False):
+    global worker
+    writer = ResultWriter(name + ".npz", plan.pointCount(), {"mode": plan.mode, "decrease": plan.decrease})
+    engine = SweepEngine(dwf, hdwf, timer=SweepTimer(plan.pointCount()), ranging=AutoRange() if rng.get() else None)
+    engine.configure(plan)                                                          # Mode, reference resistor, auto ranging starts with the chosen resistor
+    if broadband:
+        worker = SweepWorker(BroadbandSweep(engine), plan, writer, txt.get())          # One record per amplitude, no checkpoint needed
+    elif waveforms:
+        worker = SweepWorker(RawSweep(engine, name + "_raw.npy"), plan, writer, txt.get())  # Waveforms of every point in the memory-mapped raw file
+    else:
+        compensation = Compensation(engine) if cmp.get() or rng.get() else None     # Every range needs its own open/short compensation, measured on the worker thread
+        worker = SweepWorker(engine, plan, writer, txt.get(), name + ".ckpt", compensation, serial)  # Collects frequency, complex impedance, amplitude... in the binary container (+ text files), every point is checkpointed
+
+    startButton["state"] = tk.DISABLED
+    resumeButton["state"] = tk.DISABLED
+    setButton["state"] = tk.DISABLED
+    disconnectButton["state"] = tk.DISABLED
+    pauseButton["state"] = tk.NORMAL
+    cancelButton["state"] = tk.NORMAL
+    livePlot.start(plan)
+    worker.start()
+    win.after(50, pollFunction)
+
+
+# Reads the messages of the sweep worker and updates the live plot, runs every 50ms on the Tk main thread while a sweep is running
+def pollFunction():
+    livePlot.update(worker.engine.current, worker.engine.index)          # The plot limits its own redraw rate
+    for message in worker.poll():
+        if message[0] == "pass":
+            passFunction(message[1], message[2])
+        elif message[0] == "prompt":
+            compensationPrompt(message[1])
+            worker.answer()
+        elif message[0] == "error":
+            infoOutput.insert(tk.INSERT, message[1] + "\n")
+        elif message[0] == "cancelled":
+            infoOutput.insert(tk.INSERT, "Measurement cancelled\n")
+        elif message[0] == "finished":
+            livePlot.update(worker.engine.current, worker.engine.index, force=True)
+            if worker.completed:
+                infoOutput.insert(tk.INSERT, "Saved: " + worker.writer.filename + "\n")
+                infoOutput.insert(tk.INSERT, "Finished: " + str(round(message[1], 2)) + "s\n")
+                timingFunction(worker.engine.timer, os.path.splitext(worker.writer.filename)[0] + "_timing.txt")
+            else:                                                       # Error or cancel: only the passes measured so far are in the file
+                infoOutput.insert(tk.INSERT, "Partial results saved: " + worker.writer.filename + " (" + str(worker.failure) + ")\n")
+                infoOutput.insert(tk.INSERT, "Stopped after: " + str(round(message[1], 2)) + "s\n")
+                if worker.checkpoint is not None:
+                    infoOutput.insert(tk.INSERT, "Continue with 'Resume Last'\n")
+            infoOutput.see("end")                       # Allows scrolling in text widget
+            startButton["state"] = tk.NORMAL
+            resumeButton["state"] = tk.NORMAL
+            setButton["state"] = tk.NORMAL
+            disconnectButton["state"] = tk.NORMAL
+            pauseButton["state"] = tk.DISABLED
+            pauseButton["text"] = "Pause"
+            cancelButton["state"] = tk.DISABLED
+            win.title("Impedance Analyzer")
+            return
+
+    infoOutput.see("end")
+    win.title("Impedance Analyzer - " + str(round(100 * worker.progress(), 1)) + "%")
+    win.after(50, pollFunction)
+
+
+# Writes the time per sweep stage to the info box and the full report (with histograms) to a text file
+def timingFunction(timer, filename):
+    for stage, row in timer.summary().items():
+        infoOutput.insert(tk.INSERT, stage + ": " + str(round(row["mean"], 2)) + "ms/point (" + str(round(row["share"], 1)) + "%)\n")
+    with open(filename, "w") as f:
+        f.write(timer.report())
+
+
+def pauseFunction():
+    if worker.engine.paused():
+        worker.resume()
+        pauseButton["text"] = "Pause"
+        infoOutput.insert(tk.INSERT, "Measurement resumed\n")
+    else:
+        worker.pause()
+        pauseButton["text"] = "Resume"
+        infoOutput.insert(tk.INSERT, "Measurement paused\n")
+    infoOutput.see("end")
+
+
+def cancelFunction():
+    worker.cancel()
+    cancelButton["state"] = tk.DISABLED
 
 
 def clearFunction():
@@ -198,6 +268,9 @@ def clearFunction():
 
 
 def quitFunction():
+    if worker is not None and worker.is_alive():
+        worker.cancel()
+        worker.join()                                   # The device must not be closed during a capture
     dwf.FDwfDeviceClose(hdwf)
     win.quit()
 # endregion
@@ -208,11 +281,11 @@ def quitFunction():
 # region Window Layout
 
 # region Main Window
-w = 560  # width for the Tk root
-h = 425  # height for the Tk root
+w = 1080  # width for the Tk root
+h = 505  # height for the Tk root
 ws = win.winfo_screenwidth()  # width of the screen
 hs = win.winfo_screenheight()  # height of the screen
-x = (ws / 2) - (w)
+x = (ws / 2) - (w / 2)
 y = (hs / 2) - (h)
 # set the dimensions of the screen and where it is placed
 win.geometry("%dx%d+%d+%d" % (w, h, x, y))
@@ -281,6 +354,21 @@ decreaseButton = Checkbutton(win, text = "Decrease (optional)", state=NORMAL, bg
 # decreaseButton = Radiobutton(win, text = "Decrease (optional)", state=NORMAL, bg="#F0F8FF", font=("arial", 12, "normal"), variable = dec)
 decreaseButton.grid(row=8, column=2, sticky=W+E)
 
+textButton = Checkbutton(win, text = "Text files (optional)", state=NORMAL, bg="#F0F8FF", font=("arial", 12, "normal"), variable = txt)
+textButton.grid(row=8, column=1, sticky=W)
+
+rangeButton = Checkbutton(win, text = "Auto range (optional)", state=NORMAL, bg="#F0F8FF", font=("arial", 12, "normal"), variable = rng)
+rangeButton.grid(row=8, column=3, padx=40, sticky=W)
+
+broadbandButton = Checkbutton(win, text = "Broadband (optional)", state=NORMAL, bg="#F0F8FF", font=("arial", 12, "normal"), variable = wide)
+broadbandButton.grid(row=10, column=1, sticky=W)
+
+rawButton = Checkbutton(win, text = "Raw waveforms (optional)", state=NORMAL, bg="#F0F8FF", font=("arial", 12, "normal"), variable = raw)
+rawButton.grid(row=3, column=3, padx=40, sticky=W)
+
+compensationButton = Checkbutton(win, text = "Compensation (optional)", state=NORMAL, bg="#F0F8FF", font=("arial", 12, "normal"), variable = cmp)
+compensationButton.grid(row=11, column=1, sticky=W)
+
 # Output boxes
 infoOutput = Text(win, width=54, height=10)
 infoOutput.grid(row=9, column=2, columnspan = 2, sticky=W)
@@ -340,6 +428,38 @@ quitButton = Button(
     font=("arial", 12, "normal"),
     command=quitFunction,)
 quitButton.grid(row=7, column=3, padx=40, sticky=W+E, ipadx=25)
+
+pauseButton = Button(
+    win,
+    text="Pause",
+    state=DISABLED,
+    bg="#F0F8FF",
+    font=("arial", 12, "normal"),
+    command=pauseFunction,)
+pauseButton.grid(row=10, column=2, padx=20, pady=5, sticky=W+E)
+
+cancelButton = Button(
+    win,
+    text="Cancel",
+    state=DISABLED,
+    bg="#F0F8FF",
+    font=("arial", 12, "normal"),
+    command=cancelFunction,)
+cancelButton.grid(row=10, column=3, padx=40, pady=5, sticky=W+E, ipadx=25)
+
+resumeButton = Button(
+    win,
+    text="Resume Last",
+    state=DISABLED,
+    bg="#F0F8FF",
+    font=("arial", 12, "normal"),
+    command=resumeFunction,)
+resumeButton.grid(row=11, column=3, padx=40, pady=5, sticky=W+E, ipadx=25)
+# endregion
+
+# region Live Plot
+livePlot = LivePlot(win)
+livePlot.widget.grid(row=1, column=4, rowspan=10, padx=10, pady=10, sticky=N+S+W+E)
 # endregion
 
 # endregion
@@ -0,0 +1,80 @@
+"""
+   Acquisition
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module waits for a finished impedance capture of the AD2 ('FDwfAnalogImpedanceStatus' == DwfStateDone)
+   -> Instead of spinning on the status, it sleeps for the expected capture time (periods / frequency) and then polls with back-off
+   -> The same wait serves the AnalogIn captures of the raw and broadband modes ('status=analogInStatus(dwf)')
+   -> Device errors and timeouts raise an 'AcquisitionError', so the caller can decide to retry, reconnect or stop
+"""
+
+from ctypes import *
+from dwfconstants import *
+
+import time
+
+
+# Error reported by the device while waiting for a capture
+class AcquisitionError(RuntimeError):
+    pass
+
+
+# No capture was finished within the timeout
+class AcquisitionTimeout(AcquisitionError):
+    pass
+
+
+# Status call of AnalogIn with the arguments of 'FDwfAnalogImpedanceStatus' (hdwf, psts), the data of a finished capture is read too
+def analogInStatus(dwf):
+    return lambda hdwf, psts: dwf.FDwfAnalogInStatus(hdwf, c_int(1), psts)
+
+
+class CaptureWait:
+    def __init__(self, dwf, timeout=2.0, min_interval=0.0001, max_interval=0.005, status=None):
+        self.dwf = dwf
+        self.status = status if status is not None else dwf.FDwfAnalogImpedanceStatus  # Status call of the instrument
+        self.timeout = timeout                                          # Hard timeout on top of the expected capture time [s]
+        self.min_interval = min_interval                                # First poll interval after the expected capture time [s]
+        self.max_interval = max_interval                                # Longest poll interval for short captures [s]
+        self.sts = c_byte()
+        self.szerr = create_string_buffer(512)
+        self.polls = 0                                                  # Number of status requests of all waits
+
+    # Expected capture time of the impedance analyzer [s]
+    def expectedTime(self, frequency, periods=16):
+        if not frequency:
+            return 0.0
+        return periods / frequency
+
+    # Waits until the running capture is done, returns the number of status requests
+    def wait(self, hdwf, frequency=None, periods=16):
+        return self.waitTime(hdwf, self.expectedTime(frequency, periods))
+
+    # Waits until the capture that needs 'expected' [s] is done, returns the number of status requests
+    # 'finished(state)' replaces the check for DwfStateDone (e.g. reads the samples of a record), 'delay' [s] is the first sleep (default 'expected')
+    def waitTime(self, hdwf, expected, finished=None, delay=None):
+        delay = expected if delay is None else delay
+        deadline = time.perf_counter() + expected + self.timeout
+        if delay > self.min_interval:
+            time.sleep(delay)                                           # Nothing can be finished before one full capture
+
+        interval = max(self.min_interval, delay / 4)
+        longest = max(self.max_interval, delay / 2)
+        polls = 0
+        while True:
+            polls += 1
+            if self.status(hdwf, byref(self.sts)) == 0:
+                self.polls += polls
+                self.dwf.FDwfGetLastErrorMsg(self.szerr)
+                raise AcquisitionError(str(self.szerr.value))
+            if self.sts.value == DwfStateDone.value if finished is None else finished(self.sts.value):
+                self.polls += polls
+                return polls
+
+            now = time.perf_counter()
+            if now >= deadline:
+                self.polls += polls
+                raise AcquisitionTimeout("No capture after " + str(round(expected + self.timeout, 3)) + "s")
+            time.sleep(min(interval, deadline - now))
+            interval = min(interval * 2, longest)                       # Back-off, the capture needs longer than expected
@@ -0,0 +1,69 @@
+"""
+   Adaptive Sweep
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module measures a frequency range with few points: a coarse linear pass first, then only the interesting intervals are refined
+   -> An interval is interesting if |Z| (in decades) or the phase (in 180 deg) change more than 'threshold' between its two points
+   -> Refining splits these intervals again and again until they are smaller than 'resolution' [Hz] or 'max_points' is reached
+   -> The coarse pass must be fine enough to hit the feature once, e.g. the crystal range fs...fp (5.4 kHz) needs a coarse step below that
+"""
+
+from sweepPlan import SweepPlan
+from sweepEngine import SweepResult, POINT_FIELDS
+
+import numpy as np
+
+
+# Joins two passes and sorts the points by frequency, every per-point array is kept (missing ones get their default)
+def mergeResults(first, second):
+    order = np.argsort(np.concatenate((first.frequency, second.frequency)), kind="stable")
+    result = SweepResult(first.amplitude, first.direction, first.resistance, np.concatenate((first.frequency, second.frequency))[order])
+    for name in POINT_FIELDS[1:]:
+        if getattr(first, name) is None and getattr(second, name) is None:
+            continue
+        setattr(result, name, np.concatenate((first.pointArray(name, getattr(second, name)), second.pointArray(name, getattr(first, name))))[order])
+    return result
+
+
+class AdaptiveSweep:
+    def __init__(self, engine, coarse_points=201, resolution=10.0, threshold=0.02, split=4, max_points=2000):
+        self.engine = engine                                            # Configured 'SweepEngine'
+        self.coarse_points = coarse_points                              # Points of the first, linear pass
+        self.resolution = resolution                                    # Smallest interval that is still split [Hz]
+        self.threshold = threshold                                      # Change of log10|Z| + phase/180deg that marks an interval as interesting
+        self.split = split                                              # Every interesting interval is split into this many parts per round
+        self.max_points = max_points                                    # Upper limit of measured points
+        self.rounds = 0
+
+    # Change of every interval between neighbouring points
+    def intervalScore(self, result):
+        magnitude = np.log10(np.maximum(result.impedance, 1e-12))
+        return np.abs(np.diff(magnitude)) + np.abs(np.diff(result.phase)) / 180.0
+
+    # New frequencies inside the intervals that have to be refined, at most 'budget' (the most interesting intervals first)
+    def refineFrequencies(self, result, budget):
+        width = np.diff(result.frequency)
+        score = self.intervalScore(result)
+        refine = np.flatnonzero((score > self.threshold) & (width > self.resolution))
+        refine = refine[np.argsort(-score[refine], kind="stable")][:budget // (self.split - 1)]
+        steps = np.arange(1, self.split) / self.split
+        return np.sort((result.frequency[refine, None] + width[refine, None] * steps).ravel())     # Measured in increasing order
+
+    # Measures 'freq_start' ... 'freq_end' [Hz] at amplitude 'amp' [mV], returns one 'SweepResult' sorted by frequency
+    def run(self, freq_start, freq_end, amp, resistance=1000):
+        plan = SweepPlan(np.linspace(freq_start, freq_end, self.coarse_points), [amp], resistance)
+        self.engine.start()
+        try:
+            result = self.engine.runPass(plan, amp, "Inc")
+            self.rounds = 0
+            while True:
+                frequencies = self.refineFrequencies(result, self.max_points - len(result.frequency))
+                if len(frequencies) == 0:
+                    break
+                self.rounds += 1
+                plan.frequencies = frequencies
+                result = mergeResults(result, self.engine.runPass(plan, amp, "Inc"))
+        finally:
+            self.engine.stop()
+        return result
@@ -0,0 +1,66 @@
+"""
+   Auto Range
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module selects the reference resistor during the sweep, so |Z| is always measured close to the reference (best accuracy)
+   -> Ranges are the references of the GUI (10 Ohm ... 1 MOhm), the border between two ranges is their geometric mean
+   -> Hysteresis: the range only changes when |Z| is 'hysteresis' times beyond the border, so |Z| near a border does not make it chatter
+   -> A point measured in the wrong range is measured again with the new reference, the following points start in the new range
+   -> The compensation is range dependent: 'RangeCompensation' applies the cached table of each reference to the points measured with it
+"""
+
+import numpy as np
+
+
+REFERENCES = [10, 100, 1000, 10000, 100000, 1000000]
+
+
+class AutoRange:
+    def __init__(self, references=REFERENCES, hysteresis=2.0):
+        self.references = sorted(float(reference) for reference in references)  # Available reference resistors [Ohm]
+        self.borders = np.sqrt(np.multiply(self.references[:-1], self.references[1:]))  # |Z| between two ranges [Ohm]
+        self.hysteresis = hysteresis                                    # Factor beyond the border before the range changes
+        self.current = 0                                                # Index of the active range
+        self.switches = 0                                               # Number of range changes
+
+    # Index of the range nearest to 'reference' [Ohm] (e.g. the reference of the plan to start with)
+    def nearest(self, reference):
+        return int(np.abs(np.log(np.divide(self.references, reference))).argmin())
+
+    # Range for the measured |Z| [Ohm], the current one as long as |Z| stays inside its band (with hysteresis)
+    def select(self, magnitude):
+        if not np.isfinite(magnitude):
+            return self.current
+        low = self.borders[self.current - 1] / self.hysteresis if self.current > 0 else 0.0
+        high = self.borders[self.current] * self.hysteresis if self.current < len(self.borders) else np.inf
+        if low <= magnitude <= high:
+            return self.current
+        return int(np.searchsorted(self.borders, magnitude))
+
+    def switch(self, index):
+        self.current = index
+        self.switches += 1
+
+    # Reference resistor of the active range [Ohm]
+    def reference(self):
+        return self.references[self.current]
+
+
+class RangeCompensation:
+    def __init__(self, tables):
+        self.tables = tables                                            # Reference [Ohm] -> 'CompensationTable'
+
+    # Compensates a 'SweepResult' in place, every range with its own table (one vectorised correction per range)
+    def apply(self, result):
+        Z = result.Z()
+        references = result.reference if result.reference is not None else np.full(len(Z), float(result.resistance))
+        for reference in np.unique(references):
+            section = references == reference
+            Z[section] = self.tables[float(reference)].correct(Z[section], result.frequency[section])
+        result.impedance = np.abs(Z)
+        result.phase = np.degrees(np.angle(Z))
+        if result.values is not None:
+            result.values["Resistance"] = Z.real
+            result.values["Reactance"] = Z.imag
+        return result
@@ -0,0 +1,38 @@
+"""
+   Averaging
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module averages several captures per sweep point without storing them (Welford update of mean and variance of complex Z)
+   -> Variance of complex Z = variance of the real part + variance of the imaginary part, the standard deviation is stored next to the mean
+   -> With a 'target' the averaging stops early as soon as the standard error of the mean is below 'target' * |Z|,
+      so clean points need 'min_captures' only and the full 'captures' are spent where the signal is noisy
+"""
+
+import math
+
+
+class WelfordAverage:
+    def __init__(self, captures=1, target=None, min_captures=3):
+        self.captures = captures                                        # Captures per point (the maximum if 'target' is set)
+        self.target = target                                            # Relative standard error of the mean to stop early, e.g. 1e-3 (None = always 'captures')
+        self.min_captures = max(min_captures, 2)                        # The variance needs at least two captures
+        self.total = 0                                                  # Number of captures of all points
+
+    # Averages 'count' captures at 'freq', the first one must already be read, returns mean Z [Ohm], standard deviation [Ohm] and captures
+    def measure(self, engine, freq, count=None):
+        count = count or self.captures
+        mean = engine.readout.impedance()
+        m2 = 0.0
+        n = 1
+        while n < count:
+            engine.capturePoint(freq)
+            Z = engine.readout.impedance()
+            n += 1
+            delta = Z - mean
+            mean += delta / n
+            m2 += (delta.conjugate() * (Z - mean)).real                 # Sum of the squared distances, real and imaginary part
+            if self.target is not None and n >= self.min_captures and m2 / (n - 1) / n <= (self.target * abs(mean)) ** 2:
+                break
+        self.total += n
+        return mean, math.sqrt(m2 / (n - 1)) if n > 1 else 0.0, n
@@ -0,0 +1,45 @@
+"""
+   Sweep Benchmark
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This programm runs the sweep engine against the simulated AD2 ('DwfSimulator'), so no hardware is needed
+   -> It prints the sweep throughput [points/s], the number of library calls per sweep point and the time per stage ('SweepTimer')
+   -> Usage: python benchmarkSweep.py [points] [realtime 0/1]
+"""
+
+from ctypes import *
+from dwfconstants import *
+from dwfBackend import loadDwf
+from sweepPlan import SweepPlan
+from sweepEngine import SweepEngine
+from sweepTimer import SweepTimer
+
+import sys
+import time
+
+
+points = int(sys.argv[1]) if len(sys.argv) > 1 else 201
+realtime = len(sys.argv) > 2 and sys.argv[2] == "1"
+
+dwf = loadDwf(simulate=True, realtime=realtime, seed=0)
+hdwf = c_int()
+dwf.FDwfDeviceOpen(c_int(-1), byref(hdwf))
+
+freq_delta = 1e6 / (points - 1)
+plan = SweepPlan.linear(3.5e6, 4.5e6, freq_delta, 100, 100, 100, 1000)
+engine = SweepEngine(dwf, hdwf, timer=SweepTimer(plan.pointCount()))
+engine.configure(plan)
+
+initial = time.perf_counter()
+results = engine.run(plan)
+final = time.perf_counter()
+dwf.FDwfDeviceClose(hdwf)
+
+count = plan.pointCount()
+print("Points: " + str(count) + "\tRealtime: " + str(realtime))
+print("Finished: " + str(round(final - initial, 3)) + "s\t" + str(round(count / (final - initial), 1)) + " points/s")
+for name, calls in sorted(dwf.calls.items()):
+    print(name + ": " + str(round(calls / count, 2)) + " calls/point")
+print("")
+print(engine.timer.report())
@@ -0,0 +1,254 @@
+"""
+   Broadband Sweep
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module is a fast screening mode: all frequencies of a plan are excited at once instead of one 'FDwfAnalogImpedanceFrequencySet' per point
+   -> W1 plays a custom waveform ('funcCustom'): a multisine with Schroeder phases (low crest factor) or a periodic linear chirp
+   -> C1 and C2 are recorded with AnalogIn in record mode ('acqmodeRecord'), triggered by W1, and a few whole stimulus periods are kept
+   -> Every tone sits exactly on an FFT bin (sample rate = integer x stimulus frequency), so one 'rfft' of the periods gives complex Z at all tones:
+      mode 0 (W1-C1-DUT-C2-R-GND): Z = R * (C1 - C2) / C2, mode 1 and 8 (W1-C1-R-C2-DUT-GND): Z = R * C2 / (C1 - C2)
+   -> The frequencies are rounded to the tone grid (multiples of the stimulus frequency), plans denser than the grid lose points
+   -> Limits: tones up to a quarter of the AWG buffer (4096 samples on the AD2) and a record rate the USB can stream ('max_rate');
+      each tone gets only a part of the amplitude, so the results are noisier than a point by point sweep (screening, not the final measurement)
+   -> 'iterPasses', 'run' and the controls are the same as in 'SweepEngine', so 'SweepWorker' and 'ResultWriter' work unchanged (no checkpoint)
+   -> Only "Inc" passes with one reference resistor and one amplitude: plans with 'decrease' or segment amplitudes and engines with auto ranging are rejected
+   -> The first pass is checked against a few points measured by the impedance analyzer itself ('check', 'tolerance'),
+      so a wrong mode or wiring fails loudly instead of giving plausible but wrong values
+"""
+
+from ctypes import *
+from dwfconstants import *
+from acquisition import AcquisitionError, CaptureWait, analogInStatus
+from sweepEngine import SweepResult, SweepCancelled
+from impedanceQuantities import deriveQuantities
+
+import math
+import time
+import numpy as np
+
+
+# Multisine with the tones 'bins' (cycles per waveform) and Schroeder phases, 'samples' values with peak 1
+def multisine(bins, samples):
+    bins = np.asarray(bins)
+    phases = -np.pi * np.arange(len(bins)) * (np.arange(len(bins)) + 1) / len(bins)
+    spectrum = np.zeros(samples // 2 + 1, dtype=np.complex128)
+    spectrum[bins] = np.exp(1j * phases)
+    waveform = np.fft.irfft(spectrum, samples)
+    return waveform / np.abs(waveform).max()
+
+
+# Linear chirp over one waveform from the lowest to the highest of 'bins', 'samples' values with peak 1
+def chirp(bins, samples):
+    low, high = max(int(np.min(bins)) - 2, 1), int(np.max(bins)) + 2     # A few bins more, the edges of a chirp get less power
+    high += (low + high) % 2                                            # (low + high) / 2 cycles per waveform, so it repeats without a step
+    t = np.arange(samples) / samples
+    return np.sin(2 * np.pi * (low * t + (high - low) * t ** 2 / 2))
+
+
+WAVEFORMS = {"multisine": multisine, "chirp": chirp}
+
+
+# Complex Z [Ohm] from the spectra of C1 and C2 (any shape) and the reference resistor [Ohm]
+def dividerImpedance(C1, C2, resistance, mode):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if mode == 0:
+            return resistance * (C1 - C2) / C2
+        return resistance * C2 / (C1 - C2)
+
+
+class BroadbandSweep:
+    def __init__(self, engine, waveform="multisine", periods=8, settle=1, resolution=None, max_rate=1e6, timeout=2.0, check=5, tolerance=0.1):
+        if waveform not in WAVEFORMS:
+            raise ValueError("Unknown waveform '" + str(waveform) + "', use " + " or ".join("'" + name + "'" for name in WAVEFORMS))
+        self.engine = engine                                            # 'SweepEngine' of the device (mode, reference resistor, cancel, timer)
+        self.dwf = engine.dwf
+        self.hdwf = engine.hdwf
+        self.waveform = waveform
+        self.periods = periods                                          # Stimulus periods per result, the spectra are averaged over them
+        self.settle = settle                                            # Periods thrown away at the start of the record (settle time of the DUT)
+        self.resolution = resolution                                    # Tone spacing = stimulus frequency [Hz] (None = from the plan)
+        self.max_rate = max_rate                                        # Highest record rate without lost samples [Hz]
+        self.capture = CaptureWait(self.dwf, timeout, status=analogInStatus(self.dwf))  # Polls the record with back-off, hard timeout on top of the record time [s]
+        self.check = check                                              # Tones of the first pass measured again point by point (0 = no check)
+        self.tolerance = tolerance                                      # Highest median relative difference to the point by point values
+        self.mismatch = None                                            # Median relative difference of the check
+        self.timer = engine.timer
+        self.points = 0
+        self.current = None                                             # 'SweepResult' of the last pass (for the live plot)
+        self.index = 0
+        self.channel = c_int(0)                                         # W1
+        self.available, self.lost, self.corrupted = c_int(), c_int(), c_int()
+        self.data = None                                                # Record of the running measurement (channel, sample) [V]
+        self.count = 0                                                  # Samples read into 'self.data'
+        self.bins = None                                                # Tones in FFT bins of one period
+        self.samples = 0                                                # Record samples per period
+        self.awg_samples = 0                                            # Samples of the custom waveform
+        self.rate = 0.0                                                 # Record rate [Hz]
+
+    # region Control (same as 'SweepEngine', a record is not interrupted)
+    def cancel(self):
+        self.engine.cancel()
+
+    def pause(self):
+        self.engine.pause()
+
+    def resume(self):
+        self.engine.resume()
+
+    def paused(self):
+        return self.engine.paused()
+    # endregion
+
+    # Tone grid for 'plan': AWG samples, record samples per period and the bins, the plan frequencies are rounded to the grid
+    def grid(self, plan):
+        minimum, maximum = c_int(), c_int()
+        self.dwf.FDwfAnalogOutNodeDataInfo(self.hdwf, self.channel, AnalogOutNodeCarrier, byref(minimum), byref(maximum))
+        awg_samples = maximum.value
+        frequencies = np.unique(plan.frequencies)
+        resolution = self.resolution
+        if resolution is None:
+            steps = np.diff(frequencies)
+            resolution = max(frequencies[-1] / (awg_samples // 4), steps.min() if len(steps) else frequencies[0])  # Not finer than needed
+        resolution = min(resolution, frequencies[0])
+        highest = int(round(frequencies[-1] / resolution))
+        if highest > awg_samples // 4:
+            raise ValueError("Too many tones: " + str(highest) + " bins, the AWG buffer allows " + str(awg_samples // 4))
+        samples = 2 ** int(math.ceil(math.log2(max(2.5 * (highest + 2), 8))))  # Record samples per period (Nyquist with margin, fast FFT)
+        if samples * resolution > self.max_rate:
+            raise ValueError("Highest frequency too high for the record mode: " + str(round(samples * resolution)) + " Hz > " + str(self.max_rate) + " Hz")
+        return awg_samples, samples, resolution
+
+    # Checks 'plan' and the engine and sets mode, reference resistor and the tone grid, returns the tone frequencies [Hz]
+    def configure(self, plan):
+        if plan.mode not in (0, 1, 8):
+            raise ValueError("Broadband mode supports the modes 0, 1 and 8, not " + str(plan.mode))
+        if plan.decrease:
+            raise ValueError("Broadband mode measures all frequencies at once, there is no 'Decrease' pass, switch it off")
+        if self.engine.ranging is not None:
+            raise ValueError("Broadband mode measures with one reference resistor, switch auto range off")
+        if plan.levels is not None:
+            raise ValueError("Broadband mode plays all tones with the amplitude of the pass, segment amplitudes are not supported")
+        self.engine.configure(plan)                                     # Mode and reference resistor (adapter relays)
+        self.engine.stop()                                              # The impedance analyzer must not drive W1 meanwhile
+        dwf, hdwf = self.dwf, self.hdwf
+        self.awg_samples, self.samples, resolution = self.grid(plan)
+
+        dwf.FDwfAnalogInFrequencySet(hdwf, c_double(self.samples * resolution))
+        rate = c_double()
+        dwf.FDwfAnalogInFrequencyGet(hdwf, byref(rate))                 # The device rounds the rate, the stimulus follows it
+        self.rate = rate.value
+        self.bins = np.unique(np.maximum(np.round(plan.frequencies / (self.rate / self.samples)), 1).astype(np.int64))
+        self.setup()
+        return self.bins * self.rate / self.samples
+
+    # Sets up W1 (custom waveform) and AnalogIn (record of C1 and C2, triggered by W1) for the tone grid
+    def setup(self):
+        dwf, hdwf = self.dwf, self.hdwf
+        data = (c_double * self.awg_samples)(*WAVEFORMS[self.waveform](self.bins, self.awg_samples))
+        dwf.FDwfAnalogOutNodeEnableSet(hdwf, self.channel, AnalogOutNodeCarrier, c_int(1))
+        dwf.FDwfAnalogOutNodeFunctionSet(hdwf, self.channel, AnalogOutNodeCarrier, funcCustom)
+        dwf.FDwfAnalogOutNodeDataSet(hdwf, self.channel, AnalogOutNodeCarrier, data, c_int(self.awg_samples))
+        dwf.FDwfAnalogOutNodeFrequencySet(hdwf, self.channel, AnalogOutNodeCarrier, c_double(self.rate / self.samples))  # Stimulus frequency = tone spacing [Hz]
+        dwf.FDwfAnalogOutNodeOffsetSet(hdwf, self.channel, AnalogOutNodeCarrier, c_double(0))
+
+        dwf.FDwfAnalogInFrequencySet(hdwf, c_double(self.rate))         # Already rounded by the device, again after a point by point check
+        dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(-1), c_int(1))     # C1 and C2
+        dwf.FDwfAnalogInAcquisitionModeSet(hdwf, acqmodeRecord)
+        dwf.FDwfAnalogInRecordLengthSet(hdwf, c_double((self.settle + self.periods) * self.samples / self.rate))
+        dwf.FDwfAnalogInTriggerSourceSet(hdwf, trigsrcAnalogOut1)       # The record starts with W1
+
+    # Runs one amplitude per pass ("Inc" only, all frequencies are measured at the same time, so there is no sweep direction),
+    # the first pass is checked against the point by point impedance analyzer
+    def iterPasses(self, plan, onPass=None):
+        self.engine.cancelled.clear()                                   # Before the setup, so a cancel during it is kept
+        frequencies = self.configure(plan)
+        self.points = 0
+        self.mismatch = None
+        try:
+            for amp in plan.amplitudes:
+                if onPass is not None:
+                    onPass(amp, "Inc")
+                result = self.measure(plan, amp, frequencies)
+                if self.check and self.mismatch is None:
+                    self.crossCheck(plan, amp, result)
+                yield result
+        finally:
+            self.dwf.FDwfAnalogOutConfigure(self.hdwf, self.channel, c_int(0))
+
+    # Measures 'check' tones of 'result' point by point with the impedance analyzer (independent of 'dividerImpedance'),
+    # raises a ValueError if the median relative difference is above 'tolerance' (wrong mode, wiring or adapter)
+    def crossCheck(self, plan, amp, result):
+        engine = self.engine
+        picks = np.unique(np.linspace(0, len(result.frequency) - 1, self.check).round().astype(np.int64))
+        Z = result.impedance[picks] * np.exp(1j * np.radians(result.phase[picks]))
+        if engine.cancelled.is_set():
+            raise SweepCancelled()
+        engine.setAmplitude(amp)
+        engine.config.configure(True)                                   # Not 'start()', it would clear a cancel of the running sweep
+        try:
+            reference = np.array([engine.measureZ(freq) for freq in result.frequency[picks]])
+        finally:
+            engine.stop()
+        self.setup()                                                    # The impedance analyzer changed W1 and AnalogIn
+        self.mismatch = float(np.median(np.abs(Z - reference) / np.abs(reference)))
+        if self.mismatch > self.tolerance:
+            raise ValueError("Broadband impedance differs by " + str(round(100 * self.mismatch, 1)) + " % from the point by point measurement "
+                             "(limit " + str(round(100 * self.tolerance, 1)) + " %), check the mode (" + str(plan.mode) + ") and the wiring")
+
+    def run(self, plan, onPass=None):
+        return list(self.iterPasses(plan, onPass))
+
+    # One record at the amplitude 'amp' [mV], returns the 'SweepResult' of all tones
+    def measure(self, plan, amp, frequencies):
+        self.engine.resumed.wait()                                      # Blocks only while the sweep is paused
+        if self.engine.cancelled.is_set():
+            raise SweepCancelled()
+        dwf, hdwf = self.dwf, self.hdwf
+        dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(-1), c_double(max(2.2 * amp / 1000, 0.5)))  # Peak to peak with margin
+        dwf.FDwfAnalogOutNodeAmplitudeSet(hdwf, self.channel, AnalogOutNodeCarrier, c_double(amp / 1000))
+        dwf.FDwfAnalogInConfigure(hdwf, c_int(1), c_int(1))             # Armed, waits for W1
+        dwf.FDwfAnalogOutConfigure(hdwf, self.channel, c_int(1))
+        record = self.record((self.settle + self.periods) * self.samples)
+        dwf.FDwfAnalogOutConfigure(hdwf, self.channel, c_int(0))
+
+        periods = record[:, self.settle * self.samples:].reshape(2, self.periods, self.samples)
+        spectra = np.fft.rfft(periods, axis=2)[:, :, self.bins]        # (channel, period, tone), one FFT for everything
+        Z = dividerImpedance(spectra[0].mean(axis=0), spectra[1].mean(axis=0), float(plan.resistance), plan.mode)
+        deviation = np.abs(dividerImpedance(spectra[0], spectra[1], float(plan.resistance), plan.mode) - Z)
+
+        result = SweepResult(amp, "Inc", plan.resistance, frequencies)
+        result.impedance = np.abs(Z)
+        result.phase = np.degrees(np.angle(Z))
+        result.timestamp[:] = time.time()
+        result.values = self.engine.readout.table(len(frequencies))
+        for name, column in deriveQuantities(Z, frequencies, result.values.dtype.names).items():
+            result.values[name] = column
+        result.deviation = np.sqrt((deviation ** 2).sum(axis=0) / max(self.periods - 1, 1))  # Over the periods, like the averaging of the point by point sweep
+        result.captures = np.full(len(frequencies), self.periods, dtype=np.int64)
+        self.current = result
+        self.index = len(frequencies)
+        self.points += len(plan.frequencies)                            # Progress counts the plan points, rounding to the grid may merge some
+        return result
+
+    # Reads 'samples' values of C1 and C2 in record mode, returns them as (2, samples) array [V]
+    def record(self, samples):
+        self.data = np.zeros((2, samples))
+        self.count = 0
+        self.capture.waitTime(self.hdwf, samples / self.rate, self.readChunk, delay=0)   # Polls from the start, the device buffer must not overflow
+        return self.data
+
+    # Reads the new samples of the running record ('finished' of 'CaptureWait.waitTime'), True when all samples are read
+    def readChunk(self, state):
+        if self.count == 0 and state in (DwfStateConfig.value, DwfStatePrefill.value, DwfStateArmed.value):
+            return False                                                # Waits for the trigger of W1
+        dwf, hdwf = self.dwf, self.hdwf
+        dwf.FDwfAnalogInStatusRecord(hdwf, byref(self.available), byref(self.lost), byref(self.corrupted))
+        if self.lost.value or self.corrupted.value:
+            raise AcquisitionError("Record samples lost, lower the frequencies or 'max_rate'")
+        n = min(self.available.value, self.data.shape[1] - self.count)
+        if n:
+            for channel in range(2):
+                dwf.FDwfAnalogInStatusData(hdwf, c_int(channel), self.data[channel, self.count:].ctypes.data_as(POINTER(c_double)), c_int(n))
+        self.count += n
+        return self.count >= self.data.shape[1]
@@ -0,0 +1,219 @@
+"""
+   Checkpoint
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module makes long amplitude ladders resumable: every measured point is appended to a checkpoint file right away
+   -> File: one JSON header line (the plan and the read quantities), then fixed size binary records
+      (pass, point, frequency, impedance, phase, timestamp, deviation, captures, reference, level + all read quantities), the file is only ever appended
+   -> Only complete records count, a record cut off by a crash is removed, so finished points are never measured again
+   -> On a device error the device is closed and opened again and the sweep continues at the failed point ('max_reconnects' times),
+      the same device (by its serial number) is opened into the same handle object, so the handle of the caller stays valid
+   -> After a crash of the program, 'ResumableSweep.resume()' rebuilds the plan from the file and continues where it stopped,
+      the device is configured from the stored plan (mode, reference resistor) before the first point
+   -> 'findCheckpoint' returns the newest unfinished checkpoint of a folder, so a sweep can be resumed without knowing the file name
+"""
+
+from acquisition import AcquisitionError
+from dwfBackend import enumerateDevices, openDevice
+from sweepEngine import SweepResult
+from sweepPlan import SweepPlan
+
+import os
+import json
+import time
+import numpy as np
+
+
+RECORD = [("pass", np.uint32), ("point", np.uint32), ("frequency", np.float64), ("impedance", np.float64), ("phase", np.float64),
+          ("timestamp", np.float64), ("deviation", np.float64), ("captures", np.uint32),
+          ("reference", np.float64), ("level", np.float64)]
+
+
+# Everything needed to build the same 'SweepPlan' again, as JSON compatible dict
+def planState(plan):
+    return {"frequencies": plan.frequencies.tolist(), "amplitudes": plan.amplitudes, "resistance": plan.resistance, "decrease": plan.decrease,
+            "mode": plan.mode, "periods": plan.periods, "levels": None if plan.levels is None else plan.levels.tolist(),
+            "averages": None if plan.averages is None else plan.averages.tolist()}
+
+
+def planFromState(state):
+    plan = SweepPlan(state["frequencies"], state["amplitudes"], state["resistance"], state["decrease"], state["mode"], state["periods"])
+    if state["levels"] is not None:
+        plan.levels = np.array(state["levels"], dtype=np.float64)
+    if state["averages"] is not None:
+        plan.averages = np.array(state["averages"])
+    return plan
+
+
+# Record type for the read quantities 'names' (see 'readout.py')
+def recordType(names):
+    return np.dtype(RECORD + [(name, np.float64) for name in names])
+
+
+# Header, all complete records and the file size they use
+def readCheckpoint(filename):
+    with open(filename, "rb") as f:
+        header = json.loads(f.readline())
+        offset = f.tell()
+    dtype = recordType(header["quantities"])
+    count = (os.path.getsize(filename) - offset) // dtype.itemsize
+    records = np.fromfile(filename, dtype=dtype, count=count, offset=offset)
+    return header, records, offset + count * dtype.itemsize
+
+
+# Plan stored in the checkpoint 'filename'
+def checkpointPlan(filename):
+    header, records, size = readCheckpoint(filename)
+    return planFromState(header["plan"])
+
+
+# Newest checkpoint 'prefix'*.ckpt in 'folder' with fewer points than its plan, None if there is none
+def findCheckpoint(folder=".", prefix="impedance_"):
+    names = [os.path.join(folder, name) for name in os.listdir(folder) if name.startswith(prefix) and name.endswith(".ckpt")]
+    for filename in sorted(names, key=os.path.getmtime, reverse=True):
+        try:
+            header, records, size = readCheckpoint(filename)
+        except (ValueError, KeyError):                                  # Not a checkpoint or the header was cut off
+            continue
+        if len(records) < planFromState(header["plan"]).pointCount():
+            return filename
+    return None
+
+
+class ResumableSweep:
+    def __init__(self, engine, plan, filename, reconnect=None, max_reconnects=3, device=None, fsync=False):
+        self.engine = engine                                            # Configured 'SweepEngine'
+        self.plan = plan
+        self.filename = filename                                        # Checkpoint file, continued if it exists
+        self.reconnect = reconnect or self.reopen                       # Returns the device handle to continue with after an error
+        self.max_reconnects = max_reconnects
+        self.device = device                                            # Serial number for 'reopen' (None = the device closed by 'reopen')
+        self.fsync = fsync                                              # True: every point is forced to the disk (survives a power loss)
+        self.reconnects = 0
+        self.names = engine.readout.names
+        self.record = np.zeros(1, dtype=recordType(self.names))        # Preallocated record, filled and written for every point
+        self.file = None
+        self.pass_index = 0
+
+    # Continues the sweep of an existing checkpoint file with the plan stored in it
+    @classmethod
+    def resume(cls, engine, filename, **options):
+        header, records, size = readCheckpoint(filename)
+        return cls(engine, planFromState(header["plan"]), filename, **options)
+
+    # Passes in the order of 'SweepEngine.iterPasses'
+    def passList(self):
+        return [(amp, direction) for direction in self.plan.directions() for amp in self.plan.amplitudes]
+
+    # Opens the checkpoint for appending, returns the records that are already measured
+    def open(self):
+        header = {"plan": planState(self.plan), "quantities": self.names}
+        if os.path.exists(self.filename):
+            stored, records, size = readCheckpoint(self.filename)
+            if json.dumps(stored) != json.dumps(header):
+                raise ValueError("'" + self.filename + "' is the checkpoint of another sweep plan")
+            with open(self.filename, "r+b") as f:
+                f.truncate(size)                                        # Removes a record that was cut off
+        else:
+            with open(self.filename, "wb") as f:
+                f.write(json.dumps(header).encode() + b"\n")
+            records = np.zeros(0, dtype=self.record.dtype)
+        self.file = open(self.filename, "ab")
+        return records
+
+    # Result of a pass with the points that are already in the checkpoint
+    def partialResult(self, amp, direction, rows):
+        result = SweepResult(amp, direction, self.plan.resistance, self.plan.passFrequencies(direction))
+        result.values = self.engine.readout.table(len(result.frequency))
+        points = rows["point"]
+        result.impedance[points] = rows["impedance"]
+        result.phase[points] = rows["phase"]
+        result.timestamp[points] = rows["timestamp"]
+        if np.any(rows["captures"] > 1):
+            result.deviation = np.zeros(len(result.frequency))
+            result.captures = np.ones(len(result.frequency), dtype=np.int64)
+            result.deviation[points] = rows["deviation"]
+            result.captures[points] = rows["captures"]
+        if np.any(rows["reference"] != self.plan.resistance):
+            result.reference = np.full(len(result.frequency), float(self.plan.resistance))
+            result.reference[points] = rows["reference"]
+        if self.plan.levels is not None:
+            result.level = np.full(len(result.frequency), float(amp))
+            result.level[points] = rows["level"]
+        for name in self.names:
+            result.values[name][points] = rows[name]
+        return result
+
+    # Appends point 'i' of the running pass ('onPoint' of 'SweepEngine.runPass')
+    def write(self, result, i):
+        record = self.record
+        record["pass"] = self.pass_index
+        record["point"] = i
+        record["frequency"] = result.frequency[i]
+        record["impedance"] = result.impedance[i]
+        record["phase"] = result.phase[i]
+        record["timestamp"] = result.timestamp[i]
+        record["deviation"] = result.deviation[i] if result.deviation is not None else 0.0
+        record["captures"] = result.captures[i] if result.captures is not None else 1
+        record["reference"] = result.reference[i] if result.reference is not None else self.plan.resistance
+        record["level"] = result.level[i] if result.level is not None else result.amplitude
+        for name in self.names:
+            record[name] = result.values[name][i]
+        self.file.write(record.tobytes())
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    # Closes the device and opens the same device again into the engine's handle object, so every holder of the handle stays valid
+    def reopen(self, attempts=5, delay=1.0):
+        dwf, hdwf = self.engine.dwf, self.engine.hdwf
+        if self.device is None:
+            opened = [device["serial"] for device in enumerateDevices(dwf) if device["opened"]]
+        dwf.FDwfDeviceClose(hdwf)
+        if self.device is None:
+            closed = [device["serial"] for device in enumerateDevices(dwf) if device["serial"] in opened and not device["opened"]]
+            if len(closed) != 1:
+                raise AcquisitionError("Device to open again is unknown, pass its serial number as 'device'")
+            self.device = closed[0]                                     # The device that was just closed is the engine's device
+        for attempt in range(attempts):
+            if openDevice(dwf, hdwf, self.device) is not None:
+                return hdwf
+            time.sleep(delay)
+        raise AcquisitionError("Device " + self.device + " could not be opened again")
+
+    # Runs (or continues) all passes and yields every result when its pass is complete, also the passes finished before
+    def iterPasses(self, onPass=None):
+        records = self.open()
+        engine = self.engine
+        engine.configure(self.plan)                                     # Mode and reference resistor of the stored plan, also after a restart
+        engine.start()
+        engine.points = len(records)
+        try:
+            for self.pass_index, (amp, direction) in enumerate(self.passList()):
+                rows = records[records["pass"] == self.pass_index]
+                result = self.partialResult(amp, direction, rows)
+                first = len(rows)
+                if first < len(result.frequency):
+                    if onPass is not None:
+                        onPass(amp, direction)
+                    while True:
+                        try:
+                            engine.runPass(self.plan, amp, direction, first, result, self.write)
+                            break
+                        except AcquisitionError:
+                            if self.reconnects >= self.max_reconnects:
+                                raise
+                            self.reconnects += 1
+                            first = engine.index                        # Continues with the failed point
+                            engine.attach(self.reconnect())
+                            engine.configure(self.plan)
+                            engine.config.configure(True)
+                yield result
+        finally:
+            engine.stop()
+            self.file.close()
+
+    # Runs (or continues) all passes and returns the list of results
+    def run(self, onPass=None):
+        return list(self.iterPasses(onPass))
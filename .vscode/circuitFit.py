@@ -0,0 +1,164 @@
+"""
+   Circuit Fit
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module fits lumped equivalent circuits to measured complex impedances Z(f)
+   -> Models: Butterworth-Van Dyke crystal ('BVD': R1, L1, C1, C0), series RLC ('SeriesRLC') and parallel RC ('ParallelRC')
+   -> Levenberg-Marquardt with analytic Jacobians, fitted in log-parameters (all values > 0) with residuals relative to |Z|
+   -> Many sweeps (amplitudes, Inc/Dec, repeats) are fitted together: every step is one NumPy operation over all sweeps
+"""
+
+import numpy as np
+
+
+# region Models
+# Every model has 'names', 'impedance(p, w)', 'jacobian(p, w)' (dZ/dp as (B, P, N)) and 'initialGuess(w, Z)'
+# p: parameters (B, P), w: angular frequency (B, N) or (N,), Z: complex impedance (B, N)
+class BVD:
+    names = ["R1", "L1", "C1", "C0"]
+
+    # Motional admittance 1/Zm and Z, computed with real arithmetic (faster than complex divisions)
+    @staticmethod
+    def parts(p, w):
+        R1, L1, C1, C0 = (p[:, i, None] for i in range(4))
+        Xm = w * L1 - 1 / (w * C1)                                      # Reactance of the motional branch
+        d = R1 ** 2 + Xm ** 2
+        Gm = R1 / d
+        Bm = -Xm / d
+        B = Bm + w * C0
+        e = Gm ** 2 + B ** 2
+        Ym = Gm + 1j * Bm
+        Z = Gm / e - 1j * (B / e)
+        return Ym, Z, C1
+
+    def impedance(self, p, w):
+        return self.parts(p, w)[1]
+
+    def jacobian(self, p, w):
+        Ym, Z, C1 = self.parts(p, w)
+        Z2 = Z * Z
+        ratio = Z2 * Ym * Ym                                            # (Z / Zm)^2
+        J = np.empty((len(p), 4, Z.shape[-1]), dtype=np.complex128)
+        J[:, 0] = ratio
+        J[:, 1] = ratio * (1j * w)
+        J[:, 2] = ratio * (1j / (w * C1 ** 2))
+        J[:, 3] = Z2 * (-1j * w)
+        return J
+
+    # Start values from the data: fs at min |Z|, fp at max |Z|, R1 = |Z(fs)|, C0 from the capacitive background
+    def initialGuess(self, w, Z):
+        w = np.broadcast_to(w, Z.shape)
+        rows = np.arange(len(Z))
+        magnitude = np.abs(Z)
+        ws = w[rows, magnitude.argmin(axis=1)]
+        wp = w[rows, magnitude.argmax(axis=1)]
+        wp = np.where(wp > ws, wp, ws * 1.001)
+        R1 = magnitude.min(axis=1)
+        C0 = np.abs(-1 / (w[:, 0] * Z[:, 0].imag))
+        C1 = C0 * ((wp / ws) ** 2 - 1)
+        L1 = 1 / (ws ** 2 * C1)
+        return np.column_stack((R1, L1, C1, C0))
+
+
+class SeriesRLC:
+    names = ["R", "L", "C"]
+
+    def impedance(self, p, w):
+        R, L, C = (p[:, i, None] for i in range(3))
+        return R + 1j * w * L + 1 / (1j * w * C)
+
+    def jacobian(self, p, w):
+        C = p[:, 2, None]
+        w = np.broadcast_to(w, (len(p), np.shape(w)[-1]))
+        return np.stack((np.ones(w.shape, dtype=complex), 1j * w, 1j / (w * C ** 2)), axis=1)
+
+    def initialGuess(self, w, Z):
+        w = np.broadcast_to(w, Z.shape)
+        rows = np.arange(len(Z))
+        w0 = w[rows, np.abs(Z).argmin(axis=1)]
+        C = np.abs(-1 / (w[:, 0] * Z[:, 0].imag))
+        return np.column_stack((np.abs(Z).min(axis=1), 1 / (w0 ** 2 * C), C))
+
+
+class ParallelRC:
+    names = ["R", "C"]
+
+    def impedance(self, p, w):
+        R, C = p[:, 0, None], p[:, 1, None]
+        return 1 / (1 / R + 1j * w * C)
+
+    def jacobian(self, p, w):
+        R = p[:, 0, None]
+        Z = self.impedance(p, w)
+        w = np.broadcast_to(w, Z.shape)
+        return np.stack((Z ** 2 / R ** 2, -Z ** 2 * 1j * w), axis=1)
+
+    def initialGuess(self, w, Z):
+        Y = 1 / Z
+        w = np.broadcast_to(w, Z.shape)
+        return np.column_stack((1 / np.abs(Y.real.mean(axis=1)), np.abs((Y.imag / w).mean(axis=1))))
+# endregion
+
+
+# Fits 'model' to the sweeps 'Z' (B, N) at 'freq' [Hz] ((N,) for all sweeps or (B, N)), returns parameters (B, P), cost (B,) and converged (B,)
+def fitSweeps(freq, Z, model=None, p0=None, max_iterations=100, tolerance=1e-9, chunk=64):
+    model = model or BVD()
+    Z = np.atleast_2d(np.asarray(Z, dtype=np.complex128))
+    w = 2 * np.pi * np.asarray(freq, dtype=np.float64)
+    p0 = model.initialGuess(w, Z) if p0 is None else np.atleast_2d(np.asarray(p0, dtype=np.float64))
+
+    params = np.zeros(p0.shape)
+    cost = np.zeros(len(Z))
+    converged = np.zeros(len(Z), dtype=bool)
+    for start in range(0, len(Z), chunk):                              # Chunks keep the Jacobian (B, P, N) small in memory
+        section = slice(start, start + chunk)
+        wc = w[section] if w.ndim == 2 else w
+        params[section], cost[section], converged[section] = levenbergMarquardt(model, wc, Z[section], p0[section], max_iterations, tolerance)
+    return params, cost, converged
+
+
+# Batched Levenberg-Marquardt in log-parameters, every sweep has its own damping, converged sweeps drop out of the computation
+def levenbergMarquardt(model, w, Z, p0, max_iterations, tolerance):
+    weight = 1 / np.abs(Z)                                              # Relative residuals: every decade of |Z| counts the same
+    theta = np.log(p0)
+    damping = np.full(len(Z), 1e-3)
+    converged = np.zeros(len(Z), dtype=bool)
+    identity = np.eye(theta.shape[1])
+
+    def residual(rows, theta):
+        wr = w[rows] if w.ndim == 2 else w
+        r = (Z[rows] - model.impedance(np.exp(theta), wr)) * weight[rows]
+        return r, np.einsum("bn,bn->b", r.real, r.real) + np.einsum("bn,bn->b", r.imag, r.imag)
+
+    r, cost = residual(slice(None), theta)
+    for iteration in range(max_iterations):
+        rows = np.flatnonzero(~converged)
+        if len(rows) == 0:
+            break
+        p = np.exp(theta[rows])
+        J = model.jacobian(p, w[rows] if w.ndim == 2 else w)
+        J *= p[:, :, None] * weight[rows, None, :]                      # dZ/dtheta = dZ/dp * p, relative
+        A = J.view(np.float64)                                          # (B, P, 2N): real and imaginary parts are the rows of the real Jacobian
+        JTJ = np.matmul(A, A.transpose(0, 2, 1))                        # Batched BLAS
+        JTr = np.matmul(A, np.ascontiguousarray(r[rows]).view(np.float64)[:, :, None])
+        diagonal = JTJ * identity
+        step = np.linalg.solve(JTJ + damping[rows, None, None] * diagonal, JTr)[:, :, 0]
+
+        r_new, cost_new = residual(rows, theta[rows] + step)
+        better = cost_new < cost[rows]
+        accepted = rows[better]
+        converged[accepted] = cost[accepted] - cost_new[better] <= tolerance * cost[accepted]
+        theta[accepted] += step[better]
+        r[accepted] = r_new[better]
+        cost[accepted] = cost_new[better]
+        damping[rows] = np.where(better, damping[rows] / 3, damping[rows] * 4)
+        converged[rows[~better & (damping[rows] > 1e10)]] = True       # No better step any more
+    return np.exp(theta), cost, converged
+
+
+# Fits passes with the same number of points (e.g. all amplitudes and directions of a 'SweepArchive' or a list of 'SweepResult')
+def fitPasses(passes, model=None, **options):
+    freq = np.array([np.asarray(view.frequency) for view in passes])
+    Z = np.array([np.asarray(view.Z() if callable(view.Z) else view.Z) for view in passes])
+    return fitSweeps(freq, Z, model, **options)
@@ -0,0 +1,157 @@
+"""
+   Compensation
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module measures open and short residuals of the test fixture on a coarse (logarithmic) frequency grid
+   -> Correction on the host after the sweep: Z = Zopen * (Zm - Zshort) / (Zopen - Zm), the same formula as 'FDwfAnalogImpedanceCompSet',
+      but with Zopen/Zshort interpolated to every frequency (real and imaginary part, over log frequency) and for whole arrays at once
+   -> The tables are cached on disk, one file per key (mode, reference resistor, amplitude), so a recalibration is only needed
+      when one of these settings changes or the sweep leaves the calibrated frequency range
+   -> With auto ranging every reference resistor has its own table, 'RangeCompensation' applies them per range
+   -> All missing tables of a plan (amplitudes x references) are measured in one session: the open and the short are connected only once
+   -> The device compensation stays off during the sweep ('SweepEngine.configure' resets it), so it is never applied twice
+"""
+
+from sweepPlan import SweepPlan
+from sweepEngine import SweepCancelled
+from sweepTimer import NoTimer
+from autoRange import RangeCompensation
+
+import os
+import numpy as np
+
+
+# Cache key of the settings a compensation belongs to
+def compensationKey(mode, resistance, amplitude):
+    return "mode" + str(mode) + "_" + str(int(resistance)) + "Ohm_" + str(int(amplitude)) + "mV"
+
+
+class CompensationTable:
+    def __init__(self, frequency, open, short, key=""):
+        self.frequency = np.asarray(frequency, dtype=np.float64)        # Calibration frequencies in increasing order [Hz]
+        self.open = np.asarray(open, dtype=np.complex128)               # Measured Z with open inputs [Ohm]
+        self.short = np.asarray(short, dtype=np.complex128)             # Measured Z with shorted inputs [Ohm]
+        self.key = key
+
+    # True if 'freq_start' ... 'freq_end' [Hz] lies inside the calibrated range
+    def covers(self, freq_start, freq_end):
+        return self.frequency[0] <= freq_start and freq_end <= self.frequency[-1]
+
+    # Zopen and Zshort at 'freq' [Hz] (any shape), interpolated over log frequency
+    def interpolate(self, freq):
+        x = np.log(np.asarray(freq, dtype=np.float64))
+        grid = np.log(self.frequency)
+        Zo = np.interp(x, grid, self.open.real) + 1j * np.interp(x, grid, self.open.imag)
+        Zs = np.interp(x, grid, self.short.real) + 1j * np.interp(x, grid, self.short.imag)
+        return Zo, Zs
+
+    # Compensated impedance of the measured 'Z' [Ohm] at 'freq' [Hz], 'Z' can hold many sweeps (..., N) on the same 'freq' (N,)
+    def correct(self, Z, freq):
+        Zo, Zs = self.interpolate(freq)
+        Z = np.asarray(Z, dtype=np.complex128)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return Zo * (Z - Zs) / (Zo - Z)
+
+    # Compensates a 'SweepResult' in place (impedance, phase and the resistance/reactance of 'values')
+    def apply(self, result):
+        Z = self.correct(result.Z(), result.frequency)
+        result.impedance = np.abs(Z)
+        result.phase = np.degrees(np.angle(Z))
+        if result.values is not None:
+            result.values["Resistance"] = Z.real
+            result.values["Reactance"] = Z.imag
+        return result
+
+    def save(self, filename):
+        np.savez(filename, frequency=self.frequency, open=self.open, short=self.short, key=np.array(self.key))
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as data:
+            return cls(data["frequency"], data["open"], data["short"], str(data["key"]))
+
+
+class Compensation:
+    def __init__(self, engine, folder="compensation", points=41, averages=10, prompt=input):
+        self.engine = engine                                            # 'SweepEngine' of the device
+        self.folder = folder                                            # Cache folder, one .npz file per key
+        self.points = points                                            # Calibration points over the frequency range (logarithmic)
+        self.averages = averages                                        # Captures per calibration point
+        self.prompt = prompt                                            # Asks the user to connect the open / short standard
+        self.measured = 0                                               # Number of calibrations in this session
+
+    def path(self, key):
+        return os.path.join(self.folder, key + ".npz")
+
+    # Cached table for the key, or None if there is none (or it does not cover 'freq_start' ... 'freq_end')
+    def cached(self, key, freq_start=None, freq_end=None):
+        if not os.path.exists(self.path(key)):
+            return None
+        table = CompensationTable.load(self.path(key))
+        if freq_start is not None and not table.covers(freq_start, freq_end):
+            return None
+        return table
+
+    # Table for one amplitude [mV] of 'plan', measured only if the cache has none for these settings and frequencies
+    def table(self, plan, amp):
+        return self.keyedTables(plan, [(amp, float(plan.resistance))])[amp, float(plan.resistance)]
+
+    # Tables of several reference resistors [Ohm] (auto ranging) for one amplitude [mV]: {reference: table}
+    def rangeTables(self, plan, amp, references):
+        tables = self.keyedTables(plan, [(amp, float(reference)) for reference in references])
+        return {reference: table for (level, reference), table in tables.items()}
+
+    # Tables for all amplitudes of 'plan': {amplitude: table}, with 'ranging' ('AutoRange') one 'RangeCompensation' per amplitude
+    def tables(self, plan, ranging=None):
+        references = [float(plan.resistance)] if ranging is None else [float(reference) for reference in ranging.references]
+        tables = self.keyedTables(plan, [(amp, reference) for amp in plan.amplitudes for reference in references])
+        if ranging is None:
+            return {amp: tables[amp, references[0]] for amp in plan.amplitudes}
+        return {amp: RangeCompensation({reference: tables[amp, reference] for reference in references}) for amp in plan.amplitudes}
+
+    # Tables for the (amplitude [mV], reference [Ohm]) pairs 'keys', all missing ones are measured together (every standard is connected once)
+    def keyedTables(self, plan, keys):
+        freq_start, freq_end = plan.frequencies.min(), plan.frequencies.max()
+        tables = {key: self.cached(compensationKey(plan.mode, key[1], key[0]), freq_start, freq_end) for key in keys}
+        missing = [key for key, table in tables.items() if table is None]
+        if missing:
+            tables.update(self.measure(plan, missing, freq_start, freq_end))
+        return tables
+
+    # Measures open and short of every (amplitude, reference) pair in 'keys' on a logarithmic grid and stores them in the cache
+    def measure(self, plan, keys, freq_start, freq_end):
+        frequencies = np.geomspace(freq_start, freq_end, self.points) if freq_end > freq_start else np.array([freq_start])
+        calibrations = {}
+        for amp, reference in sorted(keys, key=lambda key: (key[1], key[0])):  # One relay change per reference
+            calibration = SweepPlan(frequencies, [amp], reference, mode=plan.mode, periods=plan.periods)
+            calibration.averages = np.full(len(frequencies), self.averages)
+            calibrations[amp, reference] = calibration
+
+        engine = self.engine
+        ranging, engine.ranging = engine.ranging, None                  # Every table belongs to exactly one reference
+        timer, engine.timer = engine.timer, NoTimer()                   # The calibration is not part of the timing report of the sweep
+        try:
+            standards = {}
+            for standard in ("open", "short"):
+                self.prompt("Leave the inputs open to perform open compensation and press enter to continue." if standard == "open" else
+                            "Short the inputs to perform short compensation and press enter to continue.")
+                for key, calibration in calibrations.items():
+                    if engine.cancelled.is_set():                       # 'run' clears the flag when it starts, a cancel in between must not get lost
+                        raise SweepCancelled()
+                    engine.configure(calibration)                       # Also resets the device compensation
+                    standards[standard, key] = engine.run(calibration)[0].Z()
+            self.prompt("Connect the load and press enter to continue.")
+        finally:
+            engine.ranging = ranging
+            engine.timer = timer
+
+        tables = {}
+        os.makedirs(self.folder, exist_ok=True)
+        for amp, reference in calibrations:
+            key = compensationKey(plan.mode, reference, amp)
+            tables[amp, reference] = CompensationTable(frequencies, standards["open", (amp, reference)], standards["short", (amp, reference)], key)
+            tables[amp, reference].save(self.path(key))
+        engine.configure(plan)
+        self.measured += 1
+        return tables
@@ -0,0 +1,69 @@
+"""
+   Device Config
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module keeps the last value sent for every impedance analyzer setting and only sends settings that changed
+   -> Every 'FDwfAnalogImpedance*Set' call is a USB round trip, the same amplitude on every point costs time and restarts the capture
+   -> Immediate mode (AutoConfigure 3): every changed setting is applied by the device at once, like before
+   -> Batch mode (AutoConfigure 0): changed settings are collected and applied together with ONE 'FDwfAnalogImpedanceConfigure' in 'commit()'
+"""
+
+from ctypes import *
+
+
+# Setting name -> library function and ctypes type of the value
+SETTERS = {"mode": ("FDwfAnalogImpedanceModeSet", c_int), "reference": ("FDwfAnalogImpedanceReferenceSet", c_double),
+           "frequency": ("FDwfAnalogImpedanceFrequencySet", c_double), "amplitude": ("FDwfAnalogImpedanceAmplitudeSet", c_double),
+           "offset": ("FDwfAnalogImpedanceOffsetSet", c_double), "periods": ("FDwfAnalogImpedancePeriodSet", c_int)}
+
+
+class DeviceConfig:
+    def __init__(self, dwf, hdwf, batch=False):
+        self.dwf = dwf
+        self.hdwf = hdwf
+        self.batch = batch                                              # True: settings are applied in 'commit()' (AutoConfigure 0)
+        self.state = {}                                                 # Setting name -> last value sent to the device
+        self.pending = False                                            # Settings were sent but not applied yet (batch mode)
+        self.sent = 0                                                   # Number of setting calls sent to the device
+        self.skipped = 0                                                # Number of setting calls saved because the value did not change
+
+    # Selects immediate or batch mode on the device
+    def setup(self):
+        self.dwf.FDwfDeviceAutoConfigureSet(self.hdwf, c_int(0 if self.batch else 3))  # 3: dynamic adjustment of analog out settings like frequency, amplitude...
+
+    # Resets the impedance analyzer, the device values are unknown afterwards, so everything is sent again
+    def reset(self):
+        self.dwf.FDwfAnalogImpedanceReset(self.hdwf)
+        self.invalidate()
+
+    # Forgets the known device state (e.g. after another program used the device)
+    def invalidate(self):
+        self.state.clear()
+
+    # Sends 'value' for setting 'name' if it differs from the last value sent, returns True if it was sent
+    def set(self, name, value):
+        if self.state.get(name) == value:
+            self.skipped += 1
+            return False
+        function, ctype = SETTERS[name]
+        getattr(self.dwf, function)(self.hdwf, ctype(value))
+        self.state[name] = value
+        self.pending = True
+        self.sent += 1
+        return True
+
+    # Applies the collected settings in batch mode (starts the measurement with the new settings), returns True if a configure was sent
+    def commit(self):
+        if not (self.batch and self.pending):
+            self.pending = False
+            return False
+        self.dwf.FDwfAnalogImpedanceConfigure(self.hdwf, c_int(1))
+        self.pending = False
+        return True
+
+    # Starts (True) or ends (False) the measurement, pending settings are applied with the start
+    def configure(self, start):
+        self.dwf.FDwfAnalogImpedanceConfigure(self.hdwf, c_int(1 if start else 0))
+        if start:
+            self.pending = False
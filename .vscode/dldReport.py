@@ -0,0 +1,120 @@
+"""
+   DLD Report
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module reports the drive level dependency (DLD) of a crystal from the sweeps of the amplitude ladder (100 mV ... 1000 mV)
+   -> All sweeps of one direction are stacked into one (amplitude x frequency) array, the resonance values are taken from all rows at once
+   -> fs: maximum of the conductance G = Re(1/Z) (parabolic interpolation between the points), ESR = 1/G(fs)
+   -> Q = fs / bandwidth, the bandwidth is where G falls to G(fs)/2 (C0 only changes the susceptance, so G belongs to the motional branch alone)
+   -> The sweep needs a few points inside the bandwidth (fs/Q, about 30 Hz for a 4 MHz crystal with Q = 1e5)
+"""
+
+import numpy as np
+
+from hysteresis import onGrid
+
+
+DLD = [("amplitude", np.float64), ("power", np.float64), ("fs", np.float64), ("fs_shift", np.float64), ("ESR", np.float64),
+       ("Q", np.float64), ("bandwidth", np.float64)]
+
+
+# Stacks the passes of one direction into amplitude (A,), frequency (N,) and Z (A, N), sorted by amplitude
+def stackSweeps(passes, direction="Inc", grid=None):
+    selected = sorted((sweep for sweep in passes if sweep.direction == direction), key=lambda sweep: float(sweep.amplitude))
+    if not selected:
+        raise ValueError("No '" + direction + "' pass")
+    frequency = np.sort(np.asarray(selected[0].frequency, dtype=np.float64)) if grid is None else np.asarray(grid, dtype=np.float64)
+    amplitude = np.array([float(sweep.amplitude) for sweep in selected])
+    resistance = np.array([float(sweep.resistance) for sweep in selected])
+    return amplitude, resistance, frequency, np.array([onGrid(sweep, frequency) for sweep in selected])
+
+
+# Frequency where every row of 'y' (A, N) crosses 'level' (A,) on the way from index 'start' (A,) in steps of 'side' (-1 or +1)
+def levelCrossing(frequency, y, level, start, side):
+    index = np.arange(y.shape[1])
+    outside = (y < level[:, None]) & (side * (index - start[:, None]) > 0)
+    if side < 0:
+        outer = np.where(outside, index, -1).max(axis=1)
+        inner = outer + 1
+    else:
+        outer = np.where(outside, index, y.shape[1]).min(axis=1)
+        inner = outer - 1
+    found = (outer >= 0) & (outer < y.shape[1])
+    outer = np.clip(outer, 0, y.shape[1] - 1)
+    rows = np.arange(len(y))
+    y0, y1 = y[rows, inner], y[rows, outer]
+    f0, f1 = frequency[inner], frequency[outer]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = f0 + (level - y0) * (f1 - f0) / (y1 - y0)
+    return np.where(found, crossing, np.nan)                            # NaN if the sweep ends before 'level' is reached
+
+
+# fs [Hz], ESR [Ohm], Q and bandwidth [Hz] of every row of Z (A, N) at 'frequency' (N,) [Hz]
+def resonanceValues(frequency, Z):
+    G = (1 / Z).real
+    rows = np.arange(len(G))
+    peak = np.clip(G.argmax(axis=1), 1, G.shape[1] - 2)
+    left, middle, right = G[rows, peak - 1], G[rows, peak], G[rows, peak + 1]
+    curvature = left - 2 * middle + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = np.where(curvature < 0, 0.5 * (left - right) / curvature, 0.0)    # Vertex of the parabola through 3 points
+    offset = np.clip(offset, -1, 1)
+    step = np.where(offset < 0, frequency[peak] - frequency[peak - 1], frequency[peak + 1] - frequency[peak])
+    fs = frequency[peak] + offset * step
+    Gmax = middle - 0.25 * (left - right) * offset
+
+    lower = levelCrossing(frequency, G, Gmax / 2, peak, -1)
+    upper = levelCrossing(frequency, G, Gmax / 2, peak, 1)
+    bandwidth = upper - lower
+    return fs, 1 / Gmax, fs / bandwidth, bandwidth
+
+
+class DLDReport:
+    def __init__(self, passes, direction="Inc", grid=None):
+        self.direction = direction
+        self.amplitude, self.resistance, self.frequency, self.Z = stackSweeps(passes, direction, grid)
+        self.table = self.compute()
+
+    # One row per amplitude: drive power [uW], fs [Hz], fs shift against the lowest amplitude [ppm], ESR [Ohm], Q, bandwidth [Hz]
+    def compute(self):
+        fs, esr, Q, bandwidth = resonanceValues(self.frequency, self.Z)
+        table = np.zeros(len(fs), dtype=DLD)
+        table["amplitude"] = self.amplitude
+        current = self.amplitude / 1000 / (self.resistance + esr)       # Peak current at fs, the reference resistor is in series [A]
+        table["power"] = current ** 2 * esr / 2 * 1e6                   # Power in the crystal [uW]
+        table["fs"] = fs
+        table["fs_shift"] = (fs / fs[0] - 1) * 1e6
+        table["ESR"] = esr
+        table["Q"] = Q
+        table["bandwidth"] = bandwidth
+        return table
+
+    # Change over the whole ladder: fs shift [ppm] and ESR max / min, the two numbers of a DLD qualification
+    def variation(self):
+        return {"fs_shift": float(np.ptp(self.table["fs_shift"])), "ESR_ratio": float(self.table["ESR"].max() / self.table["ESR"].min())}
+
+    # Writes the table as a tab separated text file with a header line
+    def writeTable(self, filename):
+        np.savetxt(filename, np.column_stack([self.table[name] for name, dtype in DLD]), fmt="%.12g", delimiter="\t",
+                   header="amplitude [mV]\tpower [uW]\tfs [Hz]\tfs_shift [ppm]\tESR [Ohm]\tQ\tbandwidth [Hz]")
+
+    # fs shift, ESR and Q against the drive level, shown or saved as image if 'filename' is given
+    def plot(self, filename=None):
+        import matplotlib.pyplot as plt
+
+        fig, (ax1, ax2, ax3) = plt.subplots(3, sharex=True, figsize=(6, 7))
+        fig.suptitle('Drive level dependency (' + self.direction + ')')
+        ax1.plot(self.table["amplitude"], self.table["fs_shift"], "o-")
+        ax1.set_ylabel('fs shift [ppm]')
+        ax2.plot(self.table["amplitude"], self.table["ESR"], "o-")
+        ax2.set_ylabel('ESR [Ohm]')
+        ax3.plot(self.table["amplitude"], self.table["Q"], "o-")
+        ax3.set_ylabel('Q')
+        plt.xlabel('Amplitude [mV]')
+        if filename:
+            fig.savefig(filename)
+            plt.close(fig)
+        else:
+            plt.show()
+        return fig
@@ -0,0 +1,61 @@
+"""
+   DWF Backend
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module loads the device backend (the Digilent WaveForms library) for the current platform
+   -> Every program gets its 'dwf' object from here, so the sweep engine never has to know where it came from
+   -> With 'simulate=True' (or the environment variable DWF_SIMULATE=1) the hardware-free 'DwfSimulator' is returned instead
+   -> 'enumerateDevices' lists the connected devices, 'openDevice' opens one by its serial number and returns the serial number it opened,
+      so a program can open exactly the same device again after an error
+"""
+
+from ctypes import *
+from dwfconstants import *
+
+import os
+import sys
+
+
+# Loads the WaveForms runtime library for the current platform
+def loadDwf(simulate=None, **simulatorOptions):
+    if simulate is None:
+        simulate = os.environ.get("DWF_SIMULATE", "0") not in ("", "0")
+    if simulate:
+        from dwfSimulator import DwfSimulator
+        return DwfSimulator(**simulatorOptions)
+
+    if sys.platform.startswith("win"):
+        return cdll.LoadLibrary("dwf.dll")
+    elif sys.platform.startswith("darwin"):
+        return cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
+    else:
+        return cdll.LoadLibrary("libdwf.so")
+
+
+# Returns index, name, serial number and 'opened' state of every device found with the filter
+def enumerateDevices(dwf, enumfilter=enumfilterAll):
+    count = c_int()
+    dwf.FDwfEnum(enumfilter, byref(count))
+    name = create_string_buffer(64)
+    serial = create_string_buffer(16)
+    opened = c_int()
+    devices = []
+    for i in range(count.value):
+        dwf.FDwfEnumDeviceName(c_int(i), name)
+        dwf.FDwfEnumSN(c_int(i), serial)
+        dwf.FDwfEnumDeviceIsOpened(c_int(i), byref(opened))
+        devices.append({"index": i, "name": name.value.decode(), "serial": serial.value.decode(), "opened": bool(opened.value)})
+    return devices
+
+
+# Opens the free device with the serial number into 'hdwf' (None = first free device), returns its serial number or None
+def openDevice(dwf, hdwf, serial=None):
+    for device in enumerateDevices(dwf):
+        if device["opened"] or serial not in (None, device["serial"]):
+            continue
+        dwf.FDwfDeviceOpen(c_int(device["index"]), byref(hdwf))
+        if hdwf.value != hdwfNone.value:
+            return device["serial"]
+    hdwf.value = hdwfNone.value
+    return None
@@ -0,0 +1,574 @@
+"""
+   DWF Simulator
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module is a drop-in replacement for the WaveForms library ('dwf') that needs no AD2 and no Digilent runtime
+   -> It models a device under test (DUT), e.g. the 4 MHz quartz crystal of 'experiments/Circuit/xtosc.png'
+   -> Acquisition latency and measurement noise are modelled, the noise comes from a seeded generator so runs are reproducible
+   -> AnalogOut (sine or custom waveform on W1) and AnalogIn (single capture or record) are simulated for the broadband mode ('broadbandSweep.py')
+      and the raw mode ('rawCapture.py'): C1/C2 are the stimulus and the stimulus filtered by the voltage divider of DUT and reference resistor
+   -> Use it with 'loadDwf(simulate=True)' or by setting the environment variable DWF_SIMULATE=1
+"""
+
+from ctypes import *
+from impedanceQuantities import NAMES, deriveQuantities
+
+import math
+import time
+import numpy as np
+
+
+# region DUT Models
+# Butterworth-Van Dyke model of a quartz crystal: motional branch R1-L1-C1 parallel to the shunt capacitance C0
+# Default values are fitted to the 4 MHz crystal of 'experiments/Measurements/05-01' (fs = 3.999 MHz, fp = 4.0044 MHz)
+class QuartzCrystal:
+    def __init__(self, R1=25.0, L1=0.1247, C1=12.7e-15, C0=4.7e-12, dld=0.0):
+        self.R1 = R1                                                    # Motional resistance [Ohm]
+        self.L1 = L1                                                    # Motional inductance [H]
+        self.C1 = C1                                                    # Motional capacitance [F]
+        self.C0 = C0                                                    # Shunt capacitance [F]
+        self.dld = dld                                                  # Drive level dependency: relative increase of R1 per V^2 of stimulus
+
+    def impedance(self, freq, amplitude=0.0):
+        w = 2 * np.pi * np.asarray(freq, dtype=np.float64)
+        R1 = self.R1 * (1 + self.dld * amplitude ** 2)
+        Zm = R1 + 1j * w * self.L1 + 1 / (1j * w * self.C1)
+        Z0 = 1 / (1j * w * self.C0)
+        return Zm * Z0 / (Zm + Z0)
+
+
+class Resistor:
+    def __init__(self, R=1000.0):
+        self.R = R
+
+    def impedance(self, freq, amplitude=0.0):
+        return np.full(np.shape(freq), complex(self.R))
+
+
+class Capacitor:
+    def __init__(self, C=1e-9, ESR=0.0):
+        self.C = C
+        self.ESR = ESR
+
+    def impedance(self, freq, amplitude=0.0):
+        w = 2 * np.pi * np.asarray(freq, dtype=np.float64)
+        return self.ESR + 1 / (1j * w * self.C)
+
+
+# Open and short standards for the compensation (see 'compensation.py')
+class Open:
+    def impedance(self, freq, amplitude=0.0):
+        return np.full(np.shape(freq), complex(1e15))
+
+
+class Short:
+    def impedance(self, freq, amplitude=0.0):
+        return np.full(np.shape(freq), complex(0.0))
+
+
+# Parasitics of the test fixture: stray capacitance parallel to the DUT, lead resistance and inductance in series
+class Fixture:
+    def __init__(self, Cp=2e-12, Rs=0.05, Ls=20e-9):
+        self.Cp = Cp                                                    # Stray capacitance [F]
+        self.Rs = Rs                                                    # Lead resistance [Ohm]
+        self.Ls = Ls                                                    # Lead inductance [H]
+
+    def apply(self, Z, freq):
+        w = 2 * math.pi * freq
+        Zp = 1 / (1j * w * self.Cp) if self.Cp else None
+        if Zp is not None:
+            Z = Z * Zp / (Z + Zp)
+        return Z + self.Rs + 1j * w * self.Ls
+# endregion
+
+
+
+# Derived impedance quantities like the 'DwfAnalogImpedance*' enum (index = enum value), phases in [rad] like the device
+def measureQuantity(measure, Z, freq):
+    if not 0 <= measure < len(NAMES):
+        return 0.0
+    return float(deriveQuantities(Z, freq, [NAMES[measure]])[NAMES[measure]])
+
+
+# Writes 'value' into a ctypes object or into the object behind 'byref(...)' / a pointer
+def storeValue(ref, value):
+    if ref is None:
+        return
+    if hasattr(ref, "_obj"):                                            # byref(...) keeps the referenced object in '_obj'
+        ref = ref._obj
+    elif hasattr(ref, "contents"):                                      # POINTER(c_double), e.g. into a preallocated array
+        ref = ref.contents
+    ref.value = value
+
+
+# Reads the plain Python value of a ctypes argument ('c_int(3)', 'c_double(1.5)' or a plain number)
+def argValue(arg):
+    if hasattr(arg, "value"):
+        return arg.value
+    return arg
+
+
+
+class DwfSimulator:
+    def __init__(self, dut=None, devices=1, noise=0.002, phase_noise=0.002, call_latency=0.0002, transfer_time=0.008, realtime=True, seed=0, fail_after=None, fixture=None):
+        self.dut = dut if dut is not None else QuartzCrystal()          # Device under test, or a list with one DUT per device
+        self.fixture = fixture                                          # Optional 'Fixture' between the AD2 and the DUT
+        self.devices = devices                                          # Number of simulated AD2s
+        self.noise = noise                                              # Relative noise of |Z| at |Z| = reference resistor
+        self.phase_noise = phase_noise                                  # Phase noise [rad] at |Z| = reference resistor
+        self.call_latency = call_latency                                # USB round trip of every library call [s]
+        self.transfer_time = transfer_time                              # Fixed time of one capture (trigger, transfer, processing) [s]
+        self.realtime = realtime                                        # False: captures are finished immediately, only the host overhead is left
+        self.rng = np.random.default_rng(seed)
+        self.fail_after = fail_after                                    # Number of captures after which the device "disconnects" (None = never)
+        self.error = ""
+        self.opened = {}                                                # Handle -> device state
+        self.calls = {}                                                 # Number of calls per function, e.g. self.calls["FDwfAnalogImpedanceStatus"]
+
+    # region Helpers
+    def count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.realtime and self.call_latency > 0:
+            time.sleep(self.call_latency)
+
+    def device(self, hdwf):
+        return self.opened.get(argValue(hdwf))
+
+    def fail(self, message):
+        self.error = message
+        return 0
+
+    # Connects another DUT to an opened device (e.g. the open and short standards of a compensation)
+    def connect(self, hdwf, dut):
+        self.device(hdwf)["dut"] = dut
+
+    # Expected duration of one capture at the current settings [s]
+    def captureTime(self, dev):
+        return self.transfer_time + dev["periods"] / max(dev["frequency"], 1e-3)
+
+    # Throws away the running capture and starts a new one
+    def restartCapture(self, dev):
+        dev["capture_end"] = time.perf_counter() + self.captureTime(dev)
+        dev["value"] = None
+
+    # Simulated measurement of the DUT at the current settings
+    def acquire(self, dev):
+        Z = complex(dev["dut"].impedance(dev["frequency"], dev["amplitude"]))
+        if self.fixture is not None:
+            Z = self.fixture.apply(Z, dev["frequency"])
+        mismatch = 1 + abs(math.log10(max(abs(Z), 1e-12) / dev["reference"]))  # Accuracy gets worse the further |Z| is away from the reference resistor
+        gain = 1 + self.rng.normal(0, self.noise * mismatch)
+        angle = self.rng.normal(0, self.phase_noise * mismatch)
+        Z = Z * gain * complex(math.cos(angle), math.sin(angle))
+        if dev["open_comp"] is not None:
+            Zo, Zs = dev["open_comp"], dev["short_comp"]
+            Z = Zo * (Z - Zs) / (Zo - Z) if Zo != Z else Z
+        return Z
+
+    # Record of C1 and C2 for the running AWG: one period of the custom waveform through the divider, repeated for the record length
+    def record(self, dev):
+        awg, scope = dev["awg"], dev["scope"]
+        samples = max(int(round(scope["length"] * scope["rate"])), 1)
+        period = max(int(round(scope["rate"] / awg["frequency"])), 2)   # Samples per stimulus period
+        data = np.append(awg["data"], awg["data"][0])
+        v1 = awg["offset"] + awg["amplitude"] * np.interp(np.arange(period) * len(awg["data"]) / period, np.arange(len(data)), data)
+        freq = np.arange(period // 2 + 1) * scope["rate"] / period
+        Z = dev["dut"].impedance(freq[1:], awg["amplitude"])
+        if self.fixture is not None:
+            Z = self.fixture.apply(Z, freq[1:])
+        R = dev["reference"]
+        divider = np.zeros(len(freq), dtype=np.complex128)
+        divider[1:] = R / (Z + R) if dev["mode"] == 0 else Z / (Z + R)  # C2/C1 of W1-C1-DUT-C2-R-GND (mode 0) or W1-C1-R-C2-DUT-GND
+        v2 = np.fft.irfft(np.fft.rfft(v1) * divider, period)
+        record = np.tile(np.array([v1, v2]), -(-samples // period))[:, :samples]
+        return record + self.rng.normal(0, self.noise * awg["amplitude"], record.shape)
+
+    # Single capture of C1 and C2 ('buffer' samples) while W1 plays a sine, starts at a random phase of the stimulus
+    def capture(self, dev):
+        awg, scope = dev["awg"], dev["scope"]
+        Z = complex(dev["dut"].impedance(awg["frequency"], awg["amplitude"]))
+        if self.fixture is not None:
+            Z = self.fixture.apply(Z, awg["frequency"])
+        R = dev["reference"]
+        divider = R / (Z + R) if dev["mode"] == 0 else Z / (Z + R)
+        phase = 2 * np.pi * awg["frequency"] * np.arange(scope["buffer"]) / scope["rate"] + self.rng.uniform(0, 2 * np.pi)
+        record = awg["offset"] + awg["amplitude"] * np.array([np.sin(phase), abs(divider) * np.sin(phase + np.angle(divider))])
+        return record + self.rng.normal(0, self.noise * awg["amplitude"], record.shape)
+    # endregion
+
+    # region Device
+    def FDwfGetVersion(self, version):
+        storeValue(version, b"sim-3.16")
+        return 1
+
+    def FDwfGetLastErrorMsg(self, szerr):
+        storeValue(szerr, self.error.encode())
+        return 1
+
+    def FDwfEnum(self, enumfilter, pcDevice):
+        self.count("FDwfEnum")
+        storeValue(pcDevice, self.devices)
+        return 1
+
+    def FDwfEnumDeviceName(self, idxDevice, szDeviceName):
+        storeValue(szDeviceName, b"Analog Discovery 2")
+        return 1
+
+    def FDwfEnumSN(self, idxDevice, szSN):
+        storeValue(szSN, ("SN:SIM%06d" % argValue(idxDevice)).encode())
+        return 1
+
+    def FDwfEnumDeviceIsOpened(self, idxDevice, pfIsUsed):
+        storeValue(pfIsUsed, int(argValue(idxDevice) + 1 in self.opened))
+        return 1
+
+    def FDwfDeviceOpen(self, idxDevice, hdwf):
+        self.count("FDwfDeviceOpen")
+        idx = argValue(idxDevice)
+        if idx == -1:
+            idx = next((i for i in range(self.devices) if i + 1 not in self.opened), None)
+        if idx is None or idx >= self.devices or idx + 1 in self.opened:
+            storeValue(hdwf, 0)
+            return self.fail("Device not connected or already opened")
+        dut = self.dut[idx] if isinstance(self.dut, (list, tuple)) else self.dut
+        self.opened[idx + 1] = {"dut": dut, "auto": 1, "mode": 0, "reference": 1000.0, "frequency": 1000.0, "amplitude": 1.0, "offset": 0.0,
+                                "periods": 16, "running": False, "capture_end": 0.0, "value": None, "captures": 0,
+                                "open_comp": None, "short_comp": None, "pending": {},
+                                "awg": {"function": 1, "data": np.zeros(1), "frequency": 1000.0, "amplitude": 1.0, "offset": 0.0, "running": False},
+                                "scope": {"rate": 1e8, "mode": 0, "buffer": 8192, "length": 0.0, "trigger": 0, "armed": False, "record": None, "start": 0.0, "position": 0, "chunk": 0}}
+        storeValue(hdwf, idx + 1)
+        return 1
+
+    def FDwfDeviceClose(self, hdwf):
+        self.count("FDwfDeviceClose")
+        self.opened.pop(argValue(hdwf), None)
+        return 1
+
+    def FDwfDeviceCloseAll(self):
+        self.opened.clear()
+        return 1
+
+    def FDwfDeviceAutoConfigureSet(self, hdwf, fAutoConfigure):
+        self.count("FDwfDeviceAutoConfigureSet")
+        dev = self.device(hdwf)
+        if dev is None:
+            return self.fail("Invalid device handle")
+        dev["auto"] = argValue(fAutoConfigure)
+        return 1
+    # endregion
+
+    # region Analog Impedance
+    def FDwfAnalogImpedanceReset(self, hdwf):
+        self.count("FDwfAnalogImpedanceReset")
+        dev = self.device(hdwf)
+        if dev is None:
+            return self.fail("Invalid device handle")
+        dev.update({"mode": 0, "reference": 1000.0, "frequency": 1000.0, "amplitude": 1.0, "offset": 0.0, "periods": 16,
+                    "open_comp": None, "short_comp": None, "pending": {}})
+        return 1
+
+    def setParameter(self, name, hdwf):
+        self.count("FDwfAnalogImpedance" + name)
+        dev = self.device(hdwf)
+        if dev is None:
+            return self.fail("Invalid device handle")
+        return dev
+
+    # With AutoConfigure 0 the value waits for the next 'FDwfAnalogImpedanceConfigure', otherwise it is applied at once
+    def applyParameter(self, dev, name, value, restart=True):
+        if dev["auto"] == 0:
+            dev["pending"][name] = value
+            return
+        dev[name] = value
+        if restart:
+            self.restartCapture(dev)
+
+    def FDwfAnalogImpedanceModeSet(self, hdwf, mode):
+        dev = self.setParameter("ModeSet", hdwf)
+        if dev:
+            self.applyParameter(dev, "mode", argValue(mode), False)
+        return 1 if dev else 0
+
+    def FDwfAnalogImpedanceReferenceSet(self, hdwf, ohms):
+        dev = self.setParameter("ReferenceSet", hdwf)
+        if dev:
+            self.applyParameter(dev, "reference", float(argValue(ohms)))
+        return 1 if dev else 0
+
+    def FDwfAnalogImpedanceFrequencySet(self, hdwf, hz):
+        dev = self.setParameter("FrequencySet", hdwf)
+        if dev:
+            self.applyParameter(dev, "frequency", float(argValue(hz)))
+        return 1 if dev else 0
+
+    def FDwfAnalogImpedanceAmplitudeSet(self, hdwf, volts):
+        dev = self.setParameter("AmplitudeSet", hdwf)
+        if dev:
+            self.applyParameter(dev, "amplitude", float(argValue(volts)))
+        return 1 if dev else 0
+
+    def FDwfAnalogImpedanceOffsetSet(self, hdwf, volts):
+        dev = self.setParameter("OffsetSet", hdwf)
+        if dev:
+            self.applyParameter(dev, "offset", float(argValue(volts)), False)
+        return 1 if dev else 0
+
+    def FDwfAnalogImpedancePeriodSet(self, hdwf, cMinPeriods):
+        dev = self.setParameter("PeriodSet", hdwf)
+        if dev:
+            self.applyParameter(dev, "periods", int(argValue(cMinPeriods)))
+        return 1 if dev else 0
+
+    def FDwfAnalogImpedanceCompReset(self, hdwf):
+        dev = self.setParameter("CompReset", hdwf)
+        if dev:
+            dev["open_comp"] = dev["short_comp"] = None
+        return 1 if dev else 0
+
+    def FDwfAnalogImpedanceCompSet(self, hdwf, openResistance, openReactance, shortResistance, shortReactance):
+        dev = self.setParameter("CompSet", hdwf)
+        if dev:
+            dev["open_comp"] = complex(argValue(openResistance), argValue(openReactance))
+            dev["short_comp"] = complex(argValue(shortResistance), argValue(shortReactance))
+            if dev["open_comp"] == 0:
+                dev["open_comp"] = dev["short_comp"] = None
+        return 1 if dev else 0
+
+    def FDwfAnalogImpedanceConfigure(self, hdwf, fStart):
+        self.count("FDwfAnalogImpedanceConfigure")
+        dev = self.device(hdwf)
+        if dev is None:
+            return self.fail("Invalid device handle")
+        dev.update(dev["pending"])                                      # Settings collected with AutoConfigure 0
+        dev["pending"] = {}
+        dev["running"] = bool(argValue(fStart))
+        self.restartCapture(dev)
+        return 1
+
+    def FDwfAnalogImpedanceStatus(self, hdwf, psts):
+        self.count("FDwfAnalogImpedanceStatus")
+        dev = self.device(hdwf)
+        if dev is None:
+            return self.fail("Invalid device handle")
+        if psts is None:                                                # Ignore the running capture and force a new one
+            self.restartCapture(dev)
+            return 1
+        if self.fail_after is not None and dev["captures"] >= self.fail_after:
+            return self.fail("Device communication failed (simulated)")
+        if not dev["running"]:
+            storeValue(psts, 0)                                         # DwfStateReady
+            return 1
+        if self.realtime and time.perf_counter() < dev["capture_end"]:
+            storeValue(psts, 3)                                         # DwfStateRunning
+            return 1
+        if dev["value"] is None:
+            dev["value"] = self.acquire(dev)
+            dev["captures"] += 1
+        storeValue(psts, 2)                                             # DwfStateDone
+        return 1
+
+    def FDwfAnalogImpedanceStatusMeasure(self, hdwf, measure, value):
+        self.count("FDwfAnalogImpedanceStatusMeasure")
+        dev = self.device(hdwf)
+        if dev is None or dev["value"] is None:
+            return self.fail("No capture available")
+        storeValue(value, measureQuantity(argValue(measure), dev["value"], dev["frequency"]))
+        return 1
+
+    def FDwfAnalogImpedanceStatusInput(self, hdwf, idx, gain, radian):
+        self.count("FDwfAnalogImpedanceStatusInput")
+        dev = self.device(hdwf)
+        if dev is None or dev["value"] is None:
+            return self.fail("No capture available")
+        if argValue(idx) == 0:
+            storeValue(gain, 1.0)
+            storeValue(radian, 0.0)
+        else:
+            ratio = (dev["value"] + dev["reference"]) / dev["reference"]  # C1/C2 of the voltage divider DUT + reference resistor
+            storeValue(gain, abs(ratio))
+            storeValue(radian, math.atan2(ratio.imag, ratio.real))
+        return 1
+    # endregion
+
+    # region Analog Out
+    def awgParameter(self, name, hdwf, idxChannel):
+        self.count("FDwfAnalogOut" + name)
+        dev = self.device(hdwf)
+        if dev is None:
+            return self.fail("Invalid device handle")
+        if argValue(idxChannel) != 0:
+            return self.fail("Only W1 is simulated")
+        return dev["awg"]
+
+    def FDwfAnalogOutNodeEnableSet(self, hdwf, idxChannel, node, fEnable):
+        awg = self.awgParameter("NodeEnableSet", hdwf, idxChannel)
+        return 1 if awg else 0
+
+    def FDwfAnalogOutNodeFunctionSet(self, hdwf, idxChannel, node, func):
+        awg = self.awgParameter("NodeFunctionSet", hdwf, idxChannel)
+        if awg:
+            awg["function"] = argValue(func)
+        return 1 if awg else 0
+
+    def FDwfAnalogOutNodeDataInfo(self, hdwf, idxChannel, node, pnSamplesMin, pnSamplesMax):
+        awg = self.awgParameter("NodeDataInfo", hdwf, idxChannel)
+        storeValue(pnSamplesMin, 1)
+        storeValue(pnSamplesMax, 4096)                                  # AWG buffer of the AD2 (default configuration)
+        return 1 if awg else 0
+
+    def FDwfAnalogOutNodeDataSet(self, hdwf, idxChannel, node, rgdData, cdData):
+        awg = self.awgParameter("NodeDataSet", hdwf, idxChannel)
+        if awg:
+            awg["data"] = np.clip(np.ctypeslib.as_array(rgdData, (argValue(cdData),)), -1.0, 1.0).copy()
+        return 1 if awg else 0
+
+    def FDwfAnalogOutNodeFrequencySet(self, hdwf, idxChannel, node, hzFrequency):
+        awg = self.awgParameter("NodeFrequencySet", hdwf, idxChannel)
+        if awg:
+            awg["frequency"] = float(argValue(hzFrequency))
+        return 1 if awg else 0
+
+    def FDwfAnalogOutNodeAmplitudeSet(self, hdwf, idxChannel, node, vAmplitude):
+        awg = self.awgParameter("NodeAmplitudeSet", hdwf, idxChannel)
+        if awg:
+            awg["amplitude"] = float(argValue(vAmplitude))
+        return 1 if awg else 0
+
+    def FDwfAnalogOutNodeOffsetSet(self, hdwf, idxChannel, node, vOffset):
+        awg = self.awgParameter("NodeOffsetSet", hdwf, idxChannel)
+        if awg:
+            awg["offset"] = float(argValue(vOffset))
+        return 1 if awg else 0
+
+    # Starting W1 triggers an armed record with the trigger source 'trigsrcAnalogOut1'
+    def FDwfAnalogOutConfigure(self, hdwf, idxChannel, fStart):
+        awg = self.awgParameter("Configure", hdwf, idxChannel)
+        if not awg:
+            return 0
+        awg["running"] = bool(argValue(fStart))
+        scope = self.device(hdwf)["scope"]
+        if awg["running"] and awg["function"] == 30 and scope["mode"] == 3 and scope["trigger"] == 7 and scope["armed"]:
+            scope["record"] = self.record(self.device(hdwf))
+            scope["start"] = time.perf_counter()
+            scope["armed"] = False
+            self.device(hdwf)["captures"] += 1
+        return 1
+    # endregion
+
+    # region Analog In
+    def scopeParameter(self, name, hdwf):
+        self.count("FDwfAnalogIn" + name)
+        dev = self.device(hdwf)
+        if dev is None:
+            return self.fail("Invalid device handle")
+        return dev["scope"]
+
+    def FDwfAnalogInChannelEnableSet(self, hdwf, idxChannel, fEnable):
+        scope = self.scopeParameter("ChannelEnableSet", hdwf)
+        return 1 if scope else 0
+
+    def FDwfAnalogInChannelRangeSet(self, hdwf, idxChannel, voltsRange):
+        scope = self.scopeParameter("ChannelRangeSet", hdwf)
+        return 1 if scope else 0
+
+    def FDwfAnalogInAcquisitionModeSet(self, hdwf, acqmode):
+        scope = self.scopeParameter("AcquisitionModeSet", hdwf)
+        if scope:
+            scope["mode"] = argValue(acqmode)
+        return 1 if scope else 0
+
+    # The sample rate is 100 MHz divided by an integer, like on the AD2
+    def FDwfAnalogInFrequencySet(self, hdwf, hzFrequency):
+        scope = self.scopeParameter("FrequencySet", hdwf)
+        if scope:
+            scope["rate"] = 1e8 / max(round(1e8 / float(argValue(hzFrequency))), 1)
+        return 1 if scope else 0
+
+    def FDwfAnalogInFrequencyGet(self, hdwf, phzFrequency):
+        scope = self.scopeParameter("FrequencyGet", hdwf)
+        if scope:
+            storeValue(phzFrequency, scope["rate"])
+        return 1 if scope else 0
+
+    def FDwfAnalogInBufferSizeInfo(self, hdwf, pnSizeMin, pnSizeMax):
+        scope = self.scopeParameter("BufferSizeInfo", hdwf)
+        storeValue(pnSizeMin, 16)
+        storeValue(pnSizeMax, 8192)                                     # Scope buffer of the AD2 (default configuration)
+        return 1 if scope else 0
+
+    def FDwfAnalogInBufferSizeSet(self, hdwf, nSize):
+        scope = self.scopeParameter("BufferSizeSet", hdwf)
+        if scope:
+            scope["buffer"] = min(max(int(argValue(nSize)), 16), 8192)
+        return 1 if scope else 0
+
+    def FDwfAnalogInRecordLengthSet(self, hdwf, sLength):
+        scope = self.scopeParameter("RecordLengthSet", hdwf)
+        if scope:
+            scope["length"] = float(argValue(sLength))
+        return 1 if scope else 0
+
+    def FDwfAnalogInTriggerSourceSet(self, hdwf, trigsrc):
+        scope = self.scopeParameter("TriggerSourceSet", hdwf)
+        if scope:
+            scope["trigger"] = argValue(trigsrc)
+        return 1 if scope else 0
+
+    # Arms a new record (fStart), it starts with W1 (see 'FDwfAnalogOutConfigure'), a single capture without trigger starts at once
+    def FDwfAnalogInConfigure(self, hdwf, fReconfigure, fStart):
+        scope = self.scopeParameter("Configure", hdwf)
+        if not scope:
+            return 0
+        scope.update({"armed": bool(argValue(fStart)), "record": None, "position": 0, "chunk": 0})
+        dev = self.device(hdwf)
+        if scope["armed"] and scope["mode"] == 0 and scope["trigger"] == 0 and dev["awg"]["running"]:
+            scope["record"] = self.capture(dev)
+            scope["start"] = time.perf_counter()
+            scope["armed"] = False
+            dev["captures"] += 1
+        return 1
+
+    def FDwfAnalogInStatus(self, hdwf, fReadData, psts):
+        scope = self.scopeParameter("Status", hdwf)
+        if not scope:
+            return 0
+        if self.fail_after is not None and self.device(hdwf)["captures"] >= self.fail_after:
+            return self.fail("Device communication failed (simulated)")
+        if scope["record"] is None:
+            storeValue(psts, 1 if scope["armed"] else 0)                # DwfStateArmed (waits for W1) or DwfStateReady
+        elif scope["mode"] == 0:
+            finished = not self.realtime or time.perf_counter() >= scope["start"] + self.transfer_time + scope["buffer"] / scope["rate"]
+            storeValue(psts, 2 if finished else 3)
+        else:
+            storeValue(psts, 2 if scope["position"] >= scope["record"].shape[1] else 3)  # DwfStateDone or DwfStateRunning
+        return 1
+
+    # New samples since the last call, in realtime only those the record rate has produced so far
+    def FDwfAnalogInStatusRecord(self, hdwf, pcdDataAvailable, pcdDataLost, pcdDataCorrupt):
+        scope = self.scopeParameter("StatusRecord", hdwf)
+        if not scope:
+            return 0
+        available = 0
+        if scope["record"] is not None:
+            produced = scope["record"].shape[1]
+            if self.realtime:
+                produced = min(produced, int((time.perf_counter() - scope["start"]) * scope["rate"]))
+            scope["position"] += scope["chunk"]
+            available = max(produced - scope["position"], 0)
+            scope["chunk"] = available
+        storeValue(pcdDataAvailable, available)
+        storeValue(pcdDataLost, 0)
+        storeValue(pcdDataCorrupt, 0)
+        return 1
+
+    # Copies 'cdData' samples of the last chunk of channel 'idxChannel' (0 = C1, 1 = C2) into 'rgdVoltData'
+    def FDwfAnalogInStatusData(self, hdwf, idxChannel, rgdVoltData, cdData):
+        scope = self.scopeParameter("StatusData", hdwf)
+        if not scope or scope["record"] is None:
+            return self.fail("No record available")
+        count = argValue(cdData)
+        start = scope["position"]
+        np.ctypeslib.as_array(rgdVoltData, (count,))[:] = scope["record"][argValue(idxChannel), start:start + count]
+        return 1
+    # endregion
@@ -0,0 +1,111 @@
+"""
+   Hysteresis
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module compares the increasing ('Inc') and decreasing ('Dec') sweep of every amplitude
+   -> Both passes are put on one common, increasing frequency grid (the Dec pass is reversed, other grids are interpolated)
+   -> dZ = |Z_dec| - |Z_inc| [Ohm] and dphase = phase_dec - phase_inc [deg] for a whole amplitude ladder in one (A, N) array operation
+   -> Jumps (drive level effects, a nonlinear crystal "snaps" to another branch) are steps between neighbouring points
+      that are much larger than the normal point-to-point change of the same sweep
+"""
+
+import numpy as np
+
+
+SUMMARY = [("amplitude", np.float64), ("resistance", np.float64), ("max_dZ", np.float64), ("max_dZ_frequency", np.float64),
+           ("max_dphase", np.float64), ("max_dphase_frequency", np.float64), ("area", np.float64), ("fs_inc", np.float64),
+           ("fs_dec", np.float64), ("jumps_inc", np.int64), ("jumps_dec", np.int64)]
+
+
+# Complex impedance of a 'SweepResult' (method) or 'SweepView' (property)
+def complexValues(sweep):
+    return np.asarray(sweep.Z() if callable(sweep.Z) else sweep.Z)
+
+
+# Groups passes (from one or more archives, or 'SweepResult's) into (Inc, Dec) pairs with the same amplitude and resistance
+def pairPasses(passes):
+    found = {}
+    for sweep in passes:
+        found.setdefault((float(sweep.amplitude), float(sweep.resistance)), {})[sweep.direction] = sweep
+    return [(key, found[key]["Inc"], found[key]["Dec"]) for key in sorted(found) if "Inc" in found[key] and "Dec" in found[key]]
+
+
+# Z of one pass on the increasing frequency 'grid' [Hz], interpolated only if the pass was measured on other frequencies
+def onGrid(sweep, grid):
+    freq = np.asarray(sweep.frequency, dtype=np.float64)
+    Z = complexValues(sweep)
+    if freq[0] > freq[-1]:
+        freq, Z = freq[::-1], Z[::-1]
+    if len(freq) == len(grid) and np.array_equal(freq, grid):
+        return Z
+    return np.interp(grid, freq, Z.real) + 1j * np.interp(grid, freq, Z.imag)
+
+
+# Steps between neighbouring points that are 'factor' times larger than the steps right before and after them
+# (a resonance is steep but smooth, a jump is a single step) and than the median step of the sweep: (A, N-1) bool
+# Steps are measured in decades of |Z| plus phase / 180deg, so the test works on every impedance level
+def jumpMask(Z, factor=20.0):
+    step = np.abs(np.diff(np.log10(np.maximum(np.abs(Z), 1e-12)), axis=-1)) + np.abs(np.diff(np.angle(Z, deg=True), axis=-1)) / 180.0
+    padded = np.pad(step, [(0, 0)] * (step.ndim - 1) + [(1, 1)], mode="edge")
+    neighbours = np.maximum(padded[..., :-2], padded[..., 2:])
+    noise = np.median(step, axis=-1, keepdims=True)
+    return (step > factor * neighbours) & (step > factor * np.maximum(noise, 1e-9))
+
+
+class HysteresisAnalysis:
+    def __init__(self, passes, grid=None, factor=20.0):
+        self.pairs = pairPasses(passes)
+        if not self.pairs:
+            raise ValueError("No amplitude with both an 'Inc' and a 'Dec' pass")
+        first = np.asarray(self.pairs[0][1].frequency, dtype=np.float64)
+        self.frequency = np.sort(first) if grid is None else np.asarray(grid, dtype=np.float64)   # Common grid [Hz]
+        self.amplitude = np.array([key[0] for key, inc, dec in self.pairs])                       # [mV]
+        self.resistance = np.array([key[1] for key, inc, dec in self.pairs])                      # [Ohm]
+        self.Zinc = np.array([onGrid(inc, self.frequency) for key, inc, dec in self.pairs])     # (A, N)
+        self.Zdec = np.array([onGrid(dec, self.frequency) for key, inc, dec in self.pairs])
+        self.factor = factor
+
+    # |Z_dec| - |Z_inc| [Ohm], (A, N)
+    def deltaImpedance(self):
+        return np.abs(self.Zdec) - np.abs(self.Zinc)
+
+    # phase_dec - phase_inc [deg], wrapped to -180...180, (A, N)
+    def deltaPhase(self):
+        return np.degrees(np.angle(self.Zdec * np.conj(self.Zinc)))
+
+    # Frequencies [Hz] of the jumps of every amplitude: {amplitude: {"Inc": [...], "Dec": [...]}}
+    # A jump is reported at the middle of the two points it lies between
+    def jumps(self):
+        middle = (self.frequency[1:] + self.frequency[:-1]) / 2
+        masks = {"Inc": jumpMask(self.Zinc, self.factor), "Dec": jumpMask(self.Zdec, self.factor)}
+        return {amp: {direction: middle[mask[i]] for direction, mask in masks.items()} for i, amp in enumerate(self.amplitude)}
+
+    # One row per amplitude: largest dZ / dphase and where, area between the |Z| curves [Ohm*Hz], series resonance of both passes, number of jumps
+    def summary(self):
+        dZ = self.deltaImpedance()
+        dphase = self.deltaPhase()
+        rows = np.arange(len(dZ))
+        iZ = np.abs(dZ).argmax(axis=1)
+        iphase = np.abs(dphase).argmax(axis=1)
+
+        table = np.zeros(len(dZ), dtype=SUMMARY)
+        table["amplitude"] = self.amplitude
+        table["resistance"] = self.resistance
+        table["max_dZ"] = dZ[rows, iZ]
+        table["max_dZ_frequency"] = self.frequency[iZ]
+        table["max_dphase"] = dphase[rows, iphase]
+        table["max_dphase_frequency"] = self.frequency[iphase]
+        table["area"] = np.sum((np.abs(dZ[:, 1:]) + np.abs(dZ[:, :-1])) / 2 * np.diff(self.frequency), axis=1)     # Trapezoidal rule
+        table["fs_inc"] = self.frequency[np.abs(self.Zinc).argmin(axis=1)]
+        table["fs_dec"] = self.frequency[np.abs(self.Zdec).argmin(axis=1)]
+        table["jumps_inc"] = jumpMask(self.Zinc, self.factor).sum(axis=1)
+        table["jumps_dec"] = jumpMask(self.Zdec, self.factor).sum(axis=1)
+        return table
+
+    # Writes the summary as a tab separated text file with a header line
+    def writeSummary(self, filename):
+        table = self.summary()
+        np.savetxt(filename, np.column_stack([table[name] for name, dtype in SUMMARY]), fmt="%.12g", delimiter="\t",
+                   header="\t".join(name for name, dtype in SUMMARY))
+        return table
@@ -0,0 +1,84 @@
+"""
+   Impedance Quantities
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module computes all 14 quantities of the 'DwfAnalogImpedance*' enum from complex impedances on the host
+   -> Everything works on whole NumPy arrays (all points of a sweep, or many sweeps at once), so the device only has to deliver complex Z
+   -> Units: every quantity has an SI base unit (Ohm, S, F, H, rad, 1), results can be scaled to e.g. "kOhm", "pF", "uH" or "deg"
+"""
+
+import numpy as np
+
+
+# Quantity names in the order of the enum values (DwfAnalogImpedanceImpedance = 0 ... DwfAnalogImpedanceQuality = 13)
+NAMES = ["Impedance", "ImpedancePhase", "Resistance", "Reactance", "Admittance", "AdmittancePhase", "Conductance", "Susceptance",
+         "SeriesCapacitance", "ParallelCapacitance", "SeriesInductance", "ParallelInductance", "Dissipation", "Quality"]
+
+UNITS = {"Impedance": "Ohm", "ImpedancePhase": "rad", "Resistance": "Ohm", "Reactance": "Ohm", "Admittance": "S", "AdmittancePhase": "rad",
+         "Conductance": "S", "Susceptance": "S", "SeriesCapacitance": "F", "ParallelCapacitance": "F", "SeriesInductance": "H",
+         "ParallelInductance": "H", "Dissipation": "", "Quality": ""}
+
+PREFIXES = {"f": 1e-15, "p": 1e-12, "n": 1e-9, "u": 1e-6, "m": 1e-3, "": 1.0, "k": 1e3, "M": 1e6, "G": 1e9}
+
+
+# Complex impedance from |Z| [Ohm] and phase ([deg] or [rad])
+def complexImpedance(magnitude, phase, degrees=True):
+    phase = np.asarray(phase, dtype=np.float64)
+    if degrees:
+        phase = np.radians(phase)
+    return np.asarray(magnitude, dtype=np.float64) * np.exp(1j * phase)
+
+
+# Factor to convert a value in 'base' unit into 'unit', e.g. unitFactor("F", "pF") = 1e12
+def unitFactor(base, unit):
+    if unit is None or unit == base:
+        return 1.0
+    if base == "rad" and unit == "deg":
+        return 180.0 / np.pi
+    if unit.endswith(base) and unit[:len(unit) - len(base)] in PREFIXES:
+        return 1.0 / PREFIXES[unit[:len(unit) - len(base)]]
+    raise ValueError("Can't convert '" + base + "' into '" + unit + "'")
+
+
+# All (or the selected) quantities of the complex impedances 'Z' [Ohm] at 'freq' [Hz], in one vectorised pass
+# 'units' maps names to the wanted unit, e.g. {"SeriesCapacitance": "pF", "ImpedancePhase": "deg"}
+def deriveQuantities(Z, freq, names=None, units=None):
+    Z = np.asarray(Z, dtype=np.complex128)
+    w = 2 * np.pi * np.asarray(freq, dtype=np.float64)
+    names = NAMES if names is None else names
+    units = units or {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        R = Z.real
+        X = Z.imag
+        Y = 1 / Z
+        G = Y.real
+        B = Y.imag
+        values = {
+            "Impedance": np.abs(Z),
+            "ImpedancePhase": np.arctan2(X, R),
+            "Resistance": R,
+            "Reactance": X,
+            "Admittance": np.abs(Y),
+            "AdmittancePhase": np.arctan2(B, G),
+            "Conductance": G,
+            "Susceptance": B,
+            "SeriesCapacitance": -1 / (w * X),
+            "ParallelCapacitance": B / w,
+            "SeriesInductance": X / w,
+            "ParallelInductance": -1 / (w * B),
+            "Dissipation": np.abs(R / X),
+            "Quality": np.abs(X / R),
+        }
+
+    return {name: values[name] * unitFactor(UNITS[name], units.get(name)) for name in names}
+
+
+# Same as 'deriveQuantities', but as one NumPy structured array (e.g. for saving or for 'numpy.savetxt')
+def quantityTable(Z, freq, names=None, units=None):
+    values = deriveQuantities(Z, freq, names, units)
+    table = np.zeros(np.shape(Z), dtype=[(name, np.float64) for name in values])
+    for name, column in values.items():
+        table[name] = column
+    return table
@@ -0,0 +1,118 @@
+"""
+   Live Plot
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module shows impedance [Ohm] and phase [deg] of the running sweep inside the Tk window (FigureCanvasTkAgg)
+   -> New points are taken in batches from the running 'SweepResult' and drawn with blitting: only the curves are redrawn, not the axes
+   -> The redraw rate is capped ('fps'), so a 10,000 point sweep is shown in real time without slowing down the acquisition
+   -> A full redraw only happens when a new pass starts or the values leave the current axis limits
+"""
+
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+import time
+
+
+class LivePlot:
+    def __init__(self, master, fps=10, figsize=(5, 4)):
+        self.fps = fps                                                  # Maximum number of redraws per second
+        self.figure = Figure(figsize=figsize, dpi=100)
+        self.axZ, self.axPhase = self.figure.subplots(2, sharex=True)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()                       # Tk widget, to be placed with 'grid' or 'pack'
+        self.background = None
+        self.result = None                                              # 'SweepResult' of the pass that is drawn
+        self.count = 0                                                  # Number of drawn points of this pass
+        self.last = 0.0                                                 # Time of the last redraw
+        self.zLine, = self.axZ.plot([], [], animated=True)
+        self.phaseLine, = self.axPhase.plot([], [], animated=True)
+        self.setupAxes()
+        self.canvas.mpl_connect("draw_event", self.drawFunction)
+
+    def setupAxes(self):
+        self.axZ.set_yscale("log")
+        self.axZ.set_ylabel("Impedance [Ohm]")
+        self.axPhase.set_ylabel("Phase [deg]")
+        self.axPhase.set_xlabel("Frequency [Hz]")
+        self.axPhase.set_ylim(-95, 95)
+        self.axPhase.xaxis.set_major_locator(MaxNLocator(4))
+        self.figure.tight_layout()
+
+    # Starts a new sweep: removes the old curves and fixes the frequency axis
+    def start(self, plan):
+        for ax in (self.axZ, self.axPhase):
+            for line in ax.get_lines():
+                if line not in (self.zLine, self.phaseLine):
+                    line.remove()
+        self.zLine.set_data([], [])
+        self.phaseLine.set_data([], [])
+        self.axZ.set_xlim(plan.frequencies[0], plan.frequencies[-1] if len(plan.frequencies) > 1 else plan.frequencies[0] + 1)
+        self.axZ.set_ylim(1, 1e4)
+        self.axPhase.set_ylim(-95, 95)
+        self.result = None
+        self.count = 0
+        self.canvas.draw()
+
+    # Keeps a finished pass as a static curve in the background
+    def keepPass(self, result, count):
+        label = str(result.amplitude) + "mV " + result.direction
+        self.axZ.plot(result.frequency[:count], result.impedance[:count], linewidth=0.8, alpha=0.5, label=label)
+        self.axPhase.plot(result.frequency[:count], result.phase[:count], linewidth=0.8, alpha=0.5)
+
+    # Called with the running pass and its number of measured points, as often as wanted (the redraw rate is capped)
+    def update(self, result, count, force=False):
+        if result is None:
+            return
+        if result is not self.result:                                   # A new pass started
+            if self.result is not None:
+                self.keepPass(self.result, len(self.result.frequency))
+            self.result = result
+            self.count = 0
+            self.canvas.draw()
+
+        now = time.perf_counter()
+        if count == self.count or (not force and now - self.last < 1.0 / self.fps):
+            return
+        self.last = now
+        self.count = count
+
+        freq = result.frequency[:count]
+        impedance = result.impedance[:count]
+        phase = result.phase[:count]
+        self.zLine.set_data(freq, impedance)
+        self.phaseLine.set_data(freq, phase)
+
+        if self.expandLimits(impedance, phase) or self.background is None:
+            self.canvas.draw()                                          # Axes changed, draws everything and takes a new background
+        else:
+            self.canvas.restore_region(self.background)
+            self.drawLines()
+            self.canvas.blit(self.figure.bbox)
+
+    # Makes the y-axes larger if the new points don't fit, returns True if a limit changed
+    def expandLimits(self, impedance, phase):
+        changed = False
+        positive = impedance[impedance > 0]
+        if len(positive):
+            low, high = self.axZ.get_ylim()
+            if positive.min() < low or positive.max() > high:
+                self.axZ.set_ylim(min(low, positive.min() / 2), max(high, positive.max() * 2))
+                changed = True
+        if len(phase):
+            low, high = self.axPhase.get_ylim()
+            if phase.min() < low or phase.max() > high:
+                self.axPhase.set_ylim(min(low, phase.min() - 5), max(high, phase.max() + 5))
+                changed = True
+        return changed
+
+    def drawLines(self):
+        self.axZ.draw_artist(self.zLine)
+        self.axPhase.draw_artist(self.phaseLine)
+
+    # After every full redraw (also after resizing the window) the background without the live curves is stored
+    def drawFunction(self, event):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.drawLines()
@@ -0,0 +1,82 @@
+"""
+   Multi Device
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module finds all connected AD2s ('FDwfEnum' + 'enumfilter*') and runs independent sweeps on them at the same time
+   -> Every device gets its own 'SweepEngine' on its own worker thread and writes its own result container (file name with the serial number)
+   -> The WaveForms library releases the GIL during its calls and the sweep mostly waits for the device, so threads are enough to scale
+"""
+
+from ctypes import *
+from dwfconstants import *
+from dwfBackend import enumerateDevices
+from sweepEngine import SweepEngine
+from sweepWorker import SweepWorker
+from resultWriter import ResultWriter
+
+import os
+import time
+
+
+class MultiDeviceSweep:
+    def __init__(self, dwf, enumfilter=enumfilterAll, folder=".", engineOptions=None):
+        self.dwf = dwf
+        self.folder = folder                                            # Folder of the result containers
+        self.engineOptions = engineOptions or {}                        # Passed to every 'SweepEngine', e.g. {"settle": CyclesSettle()}
+        self.devices = [device for device in enumerateDevices(dwf, enumfilter) if not device["opened"]]
+        self.handles = {}                                               # Device index -> hdwf
+        self.workers = {}                                               # Device index -> 'SweepWorker'
+
+    # Opens all free devices, returns the list of opened devices
+    def open(self):
+        szerr = create_string_buffer(512)
+        for device in self.devices:
+            hdwf = c_int()
+            self.dwf.FDwfDeviceOpen(c_int(device["index"]), byref(hdwf))
+            if hdwf.value == hdwfNone.value:
+                self.dwf.FDwfGetLastErrorMsg(szerr)
+                device["error"] = str(szerr.value)
+            else:
+                self.handles[device["index"]] = hdwf
+        return [device for device in self.devices if device["index"] in self.handles]
+
+    # Starts the sweeps: 'plans' is one 'SweepPlan' for all devices or a dict device index -> plan
+    def start(self, plans):
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        for device in self.devices:
+            index = device["index"]
+            plan = plans.get(index) if isinstance(plans, dict) else plans
+            if index not in self.handles or plan is None:
+                continue
+            engine = SweepEngine(self.dwf, self.handles[index], **self.engineOptions)
+            engine.configure(plan)
+            serial = device["serial"].replace("SN:", "")
+            filename = os.path.join(self.folder, "impedance_" + serial + "_" + str(plan.resistance) + "Ohm_" + stamp + ".npz")
+            writer = ResultWriter(filename, plan.pointCount(), {"device": device["name"], "serial": device["serial"], "mode": plan.mode})
+            self.workers[index] = SweepWorker(engine, plan, writer)
+            self.workers[index].start()
+
+    # Progress of every device (0...1)
+    def progress(self):
+        return {index: worker.progress() for index, worker in self.workers.items()}
+
+    # Waits for all sweeps, returns device index -> list of messages ("pass", "result", "error", "finished"...)
+    def join(self):
+        messages = {}
+        for index, worker in self.workers.items():
+            worker.join()
+            messages[index] = worker.poll()
+        return messages
+
+    def cancel(self):
+        for worker in self.workers.values():
+            worker.cancel()
+
+    def close(self):
+        self.cancel()
+        for worker in self.workers.values():
+            worker.join()
+        for hdwf in self.handles.values():
+            self.dwf.FDwfDeviceClose(hdwf)
+        self.handles.clear()
@@ -0,0 +1,244 @@
+"""
+   Raw Capture
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module is an optional raw mode: instead of the 'FDwfAnalogImpedanceStatusMeasure' values, the sampled waveforms of C1 and C2
+      of every point are stored (W1 plays a sine, AnalogIn takes one single capture per point)
+   -> The waveforms go into a memory-mapped .npy file (one record per point: frequency, sample rate, samples, amplitude, reference, C1/C2 as float32),
+      so a sweep larger than the RAM is no problem and the file can be opened with 'np.load(filename, mmap_mode="r")'
+   -> 'demodulate' is a lock-in (= Goertzel for one frequency) on the host, batched over all points of a pass: window x waveform x exp(-j w n)
+   -> Window and number of periods are chosen at analysis time, so a stored sweep can be analysed again ('reanalyse') without measuring it again:
+      fewer periods = what a faster sweep would have given, windows with low leakage for captures that are not a whole number of periods
+   -> One reference resistor and one amplitude per pass: engines with auto ranging and plans with segment amplitudes are rejected
+"""
+
+from ctypes import *
+from dwfconstants import *
+from acquisition import AcquisitionError, CaptureWait, analogInStatus
+from sweepEngine import SweepResult, SweepCancelled
+from broadbandSweep import dividerImpedance
+from impedanceQuantities import deriveQuantities
+from sweepTimer import CONFIGURE, SETTLE, DISCARD, POLLING, READOUT, WRITE
+
+import math
+import time
+import numpy as np
+
+
+# Cosine sum coefficients of the windows: w[k] = sum_m (-1)^m a_m cos(2 pi m k / (n - 1))
+WINDOWS = {
+    "rect": [1.0],
+    "hann": [0.5, 0.5],
+    "hamming": [0.54, 0.46],
+    "blackman": [0.42, 0.5, 0.08],
+    "flattop": [0.21557895, 0.41663158, 0.277263158, 0.083578947, 0.006947368],
+}
+
+
+# Record of one point in the raw file
+def rawType(samples):
+    return np.dtype([("pass", np.uint32), ("direction", "U3"), ("amplitude", np.float64), ("reference", np.float64), ("mode", np.uint8),
+                     ("frequency", np.float64), ("rate", np.float64), ("samples", np.uint32), ("timestamp", np.float64),
+                     ("waveform", np.float32, (2, samples))])
+
+
+# Phasors of C1 and C2 for every record (lock-in at the stimulus frequency), 'periods' = only the last periods of every capture (None = all)
+def demodulate(records, window="hann", periods=None, chunk=256):
+    if window not in WINDOWS:
+        raise ValueError("Unknown window '" + str(window) + "', use " + ", ".join("'" + name + "'" for name in WINDOWS))
+    count = len(records)
+    phasors = np.zeros((2, count), dtype=np.complex128)
+    k = np.arange(records.dtype["waveform"].shape[1])
+    for first in range(0, count, chunk):                                # Limits the memory of the (points x samples) matrices
+        part = records[first:first + chunk]
+        cycles = part["frequency"] / part["rate"]                      # Stimulus periods per sample
+        end = part["samples"].astype(np.int64)
+        length = end if periods is None else np.minimum(end, np.round(periods / cycles).astype(np.int64))
+        start = (end - length)[:, None]
+        position = (k - start) / np.maximum(length - 1, 1)[:, None]     # 0...1 inside the used samples
+        weights = np.zeros((len(part), len(k)))
+        for m, a in enumerate(WINDOWS[window]):
+            weights += (-1) ** m * a * np.cos(2 * np.pi * m * position)
+        weights[(k < start) | (k >= end[:, None])] = 0.0
+        reference = weights * np.exp(-2j * np.pi * cycles[:, None] * k)
+        phasors[:, first:first + chunk] = np.einsum("pcn,pn->cp", part["waveform"], reference)
+    return phasors[0], phasors[1]
+
+
+# Complex Z [Ohm] of every record, see 'demodulate'
+def rawImpedance(records, window="hann", periods=None, chunk=256):
+    C1, C2 = demodulate(records, window, periods, chunk)
+    return dividerImpedance(C1, C2, records["reference"], records["mode"][0] if len(records) else 0)
+
+
+# Stored float as int if it is a whole number (amplitude [mV], reference [Ohm]), so the file names stay like 'impedance_100mV_1000Ohm_Inc.txt'
+def plainNumber(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+# 'SweepResult' of the records of one pass
+def rawResult(records, Z, names=("Resistance", "Reactance")):
+    result = SweepResult(plainNumber(records["amplitude"][0]), str(records["direction"][0]), plainNumber(records["reference"][0]), np.array(records["frequency"]))
+    result.impedance = np.abs(Z)
+    result.phase = np.degrees(np.angle(Z))
+    result.timestamp = np.array(records["timestamp"])
+    result.values = np.zeros(len(Z), dtype=[(name, np.float64) for name in names])
+    for name, column in deriveQuantities(Z, result.frequency, names).items():
+        result.values[name] = column
+    if np.any(records["reference"] != records["reference"][0]):
+        result.reference = np.array(records["reference"])
+    return result
+
+
+# Analyses a stored raw sweep again with another window / number of periods, returns one 'SweepResult' per pass
+# The passes are contiguous in the file, so every pass is a slice of the memory map and only 'chunk' waveforms are in memory at a time
+def reanalyse(filename, window="hann", periods=None, names=("Resistance", "Reactance"), chunk=256):
+    records = np.load(filename, mmap_mode="r")
+    passes = np.array(records["pass"])                                  # Small columns only, the waveforms stay in the file
+    measured = np.array(records["samples"]) > 0                         # Points of a sweep that was stopped are empty
+    borders = np.flatnonzero((np.diff(passes) != 0) | (np.diff(measured) != 0)) + 1
+    results = []
+    for first, end in zip(np.concatenate(([0], borders)), np.concatenate((borders, [len(records)]))):
+        if measured[first]:
+            part = records[first:end]
+            results.append(rawResult(part, rawImpedance(part, window, periods, chunk), names))
+    return results
+
+
+class RawSweep:
+    def __init__(self, engine, filename, samples=2048, periods=16, settle=2, window="hann", max_rate=1e8, timeout=2.0):
+        self.engine = engine                                            # 'SweepEngine' of the device (mode, reference resistor, cancel, timer)
+        self.dwf = engine.dwf
+        self.hdwf = engine.hdwf
+        self.filename = filename                                        # Raw file (.npy), written while the sweep runs
+        self.samples = samples                                          # Samples per channel and point (the AD2 buffer holds 8192)
+        self.periods = periods                                          # Stimulus periods per capture (fewer at high frequencies if 'max_rate' is reached)
+        self.settle = settle                                            # Periods of the stimulus before the capture starts
+        self.window = window                                            # Window of the demodulation during the sweep
+        self.max_rate = max_rate                                        # Highest sample rate of AnalogIn [Hz]
+        self.capture = CaptureWait(self.dwf, timeout, status=analogInStatus(self.dwf))  # Waits for the single capture like the impedance analyzer
+        self.timer = engine.timer
+        self.records = None                                             # Memory-mapped raw file
+        self.pass_index = 0
+        self.points = 0
+        self.current = None                                             # 'SweepResult' of the last pass (for the live plot)
+        self.index = 0
+        self.channel = c_int(0)                                         # W1
+        self.buffer = np.zeros((2, samples))                           # One capture, read from the device as double
+        self.pointers = [self.buffer[channel].ctypes.data_as(POINTER(c_double)) for channel in range(2)]
+        self.rate = c_double()
+        self.szerr = create_string_buffer(512)
+
+    # region Control (same as 'SweepEngine')
+    def cancel(self):
+        self.engine.cancel()
+
+    def pause(self):
+        self.engine.pause()
+
+    def resume(self):
+        self.engine.resume()
+
+    def paused(self):
+        return self.engine.paused()
+    # endregion
+
+    # Sets up W1 (sine) and AnalogIn (single capture of C1 and C2, no trigger) for 'plan' and creates the raw file
+    def configure(self, plan):
+        if plan.mode not in (0, 1, 8):
+            raise ValueError("Raw mode supports the modes 0, 1 and 8, not " + str(plan.mode))
+        if self.engine.ranging is not None:
+            raise ValueError("Raw mode stores the waveforms of one reference resistor, switch auto range off")
+        if plan.levels is not None:
+            raise ValueError("Raw mode plays every pass with one amplitude, segment amplitudes are not supported")
+        self.engine.configure(plan)                                     # Mode and reference resistor (adapter relays)
+        self.engine.stop()                                              # The impedance analyzer must not drive W1 meanwhile
+        dwf, hdwf = self.dwf, self.hdwf
+        dwf.FDwfAnalogOutNodeEnableSet(hdwf, self.channel, AnalogOutNodeCarrier, c_int(1))
+        dwf.FDwfAnalogOutNodeFunctionSet(hdwf, self.channel, AnalogOutNodeCarrier, funcSine)
+        dwf.FDwfAnalogOutNodeOffsetSet(hdwf, self.channel, AnalogOutNodeCarrier, c_double(0))
+        dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(-1), c_int(1))     # C1 and C2
+        dwf.FDwfAnalogInAcquisitionModeSet(hdwf, acqmodeSingle)
+        dwf.FDwfAnalogInTriggerSourceSet(hdwf, trigsrcNone)             # Starts at once, the phase of C2 is measured against C1
+        self.records = np.lib.format.open_memmap(self.filename, mode="w+", dtype=rawType(self.samples), shape=(plan.pointCount(),))
+
+    # Runs all passes of the plan and yields every result as soon as its pass is finished (like 'SweepEngine.iterPasses')
+    def iterPasses(self, plan, onPass=None):
+        self.engine.cancelled.clear()                                   # Before the setup, so a cancel during it is kept
+        self.configure(plan)
+        self.pass_index = 0
+        self.points = 0
+        try:
+            for direction in plan.directions():
+                for amp in plan.amplitudes:
+                    if onPass is not None:
+                        onPass(amp, direction)
+                    yield self.runPass(plan, amp, direction)
+                    self.pass_index += 1
+        finally:
+            self.dwf.FDwfAnalogOutConfigure(self.hdwf, self.channel, c_int(0))
+            self.records.flush()
+
+    def run(self, plan, onPass=None):
+        return list(self.iterPasses(plan, onPass))
+
+    # Captures the waveforms of one pass into the raw file and demodulates them all at once
+    def runPass(self, plan, amp, direction):
+        frequencies = plan.passFrequencies(direction)
+        first = self.points
+        records = self.records[first:first + len(frequencies)]
+        records["pass"] = self.pass_index
+        records["direction"] = direction
+        records["amplitude"] = amp
+        records["reference"] = float(plan.resistance)
+        records["mode"] = plan.mode
+        self.dwf.FDwfAnalogOutNodeAmplitudeSet(self.hdwf, self.channel, AnalogOutNodeCarrier, c_double(amp / 1000))
+        self.dwf.FDwfAnalogInChannelRangeSet(self.hdwf, c_int(-1), c_double(max(2.2 * amp / 1000, 0.5)))  # Peak to peak with margin
+
+        self.current = SweepResult(amp, direction, plan.resistance, frequencies)
+        self.index = 0                                                  # The points are only demodulated at the end of the pass
+        for i in range(len(frequencies)):
+            self.engine.resumed.wait()                                  # Blocks only while the sweep is paused
+            if self.engine.cancelled.is_set():
+                raise SweepCancelled()
+            self.timer.begin()
+            self.capturePoint(records[i:i + 1], frequencies[i])
+            self.points += 1
+            self.timer.lap(WRITE)
+            self.timer.end()
+
+        Z = rawImpedance(records, self.window)
+        result = rawResult(records, Z, self.engine.readout.names)
+        self.current = result
+        self.index = len(frequencies)
+        return result
+
+    # One capture at 'freq' [Hz] into 'record'
+    def capturePoint(self, record, freq):
+        dwf, hdwf = self.dwf, self.hdwf
+        dwf.FDwfAnalogOutNodeFrequencySet(hdwf, self.channel, AnalogOutNodeCarrier, c_double(freq))
+        dwf.FDwfAnalogOutConfigure(hdwf, self.channel, c_int(1))
+        dwf.FDwfAnalogInFrequencySet(hdwf, c_double(min(freq * self.samples / self.periods, self.max_rate)))
+        dwf.FDwfAnalogInFrequencyGet(hdwf, byref(self.rate))           # The device rounds the rate, the demodulation uses the real one
+        rate = self.rate.value
+        samples = min(self.samples, int(math.ceil(self.periods * rate / freq)))
+        dwf.FDwfAnalogInBufferSizeSet(hdwf, c_int(samples))
+        self.timer.lap(CONFIGURE)
+        time.sleep(self.settle / freq)                                  # Settle time of the DUT after the frequency change
+        self.timer.lap(SETTLE)
+        dwf.FDwfAnalogInConfigure(hdwf, c_int(1), c_int(1))
+        self.timer.lap(DISCARD)
+        self.timer.addPolls(self.capture.waitTime(hdwf, samples / rate))
+        self.timer.lap(POLLING)
+        for channel in range(2):
+            if dwf.FDwfAnalogInStatusData(hdwf, c_int(channel), self.pointers[channel], c_int(samples)) == 0:
+                dwf.FDwfGetLastErrorMsg(self.szerr)
+                raise AcquisitionError(str(self.szerr.value))
+        record["frequency"] = freq
+        record["rate"] = rate
+        record["samples"] = samples
+        record["timestamp"] = time.time()
+        record["waveform"][0, :, :samples] = self.buffer[:, :samples]
+        self.timer.lap(READOUT)
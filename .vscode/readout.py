@@ -0,0 +1,76 @@
+"""
+   Readout
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module reads a configurable set of 'DwfAnalogImpedance*' quantities after every capture
+   -> The values are written into ONE preallocated ctypes array, which is also visible as a NumPy structured row (no copies, no new objects per point)
+   -> The function pointer, its argtypes and the pointers into the array are prepared once, the loop only calls them
+   -> Default is Resistance + Reactance (= complex Z), every other quantity can be derived on the host after the sweep
+"""
+
+from ctypes import *
+from dwfconstants import *
+from acquisition import AcquisitionError
+
+import numpy as np
+
+
+# Name -> enum of all quantities of 'FDwfAnalogImpedanceStatusMeasure' (dwfconstants.py)
+QUANTITIES = {
+    "Impedance": DwfAnalogImpedanceImpedance,
+    "ImpedancePhase": DwfAnalogImpedanceImpedancePhase,
+    "Resistance": DwfAnalogImpedanceResistance,
+    "Reactance": DwfAnalogImpedanceReactance,
+    "Admittance": DwfAnalogImpedanceAdmittance,
+    "AdmittancePhase": DwfAnalogImpedanceAdmittancePhase,
+    "Conductance": DwfAnalogImpedanceConductance,
+    "Susceptance": DwfAnalogImpedanceSusceptance,
+    "SeriesCapacitance": DwfAnalogImpedanceSeriesCapactance,
+    "ParallelCapacitance": DwfAnalogImpedanceParallelCapacitance,
+    "SeriesInductance": DwfAnalogImpedanceSeriesInductance,
+    "ParallelInductance": DwfAnalogImpedanceParallelInductance,
+    "Dissipation": DwfAnalogImpedanceDissipation,
+    "Quality": DwfAnalogImpedanceQuality,
+}
+
+
+class ImpedanceReadout:
+    def __init__(self, dwf, hdwf, quantities=("Resistance", "Reactance")):
+        self.hdwf = hdwf
+        self.names = list(quantities)
+        for name in ("Resistance", "Reactance"):                        # Complex Z is always needed by the sweep engine
+            if name not in self.names:
+                self.names.append(name)
+        self.dtype = np.dtype([(name, np.float64) for name in self.names])
+        self.values = (c_double * len(self.names))()                   # Preallocated buffer of one point
+        self.row = np.frombuffer(self.values, dtype=self.dtype)[0]      # Same memory as NumPy structured row
+        self.codes = [c_int(QUANTITIES[name].value) for name in self.names]
+        self.pointers = [cast(addressof(self.values) + i * sizeof(c_double), POINTER(c_double)) for i in range(len(self.names))]
+        self.resistance = self.names.index("Resistance")
+        self.reactance = self.names.index("Reactance")
+
+        self.measure = dwf.FDwfAnalogImpedanceStatusMeasure             # Cached function pointer
+        if hasattr(self.measure, "argtypes"):                           # Real WaveForms library (the simulator is plain Python)
+            self.measure.argtypes = [c_int, c_int, POINTER(c_double)]
+            self.measure.restype = c_int
+        self.dwf = dwf
+        self.szerr = create_string_buffer(512)
+
+    # Reads all quantities of the last capture into 'self.values' / 'self.row'
+    def read(self):
+        measure = self.measure
+        hdwf = self.hdwf
+        for code, value in zip(self.codes, self.pointers):
+            if measure(hdwf, code, value) == 0:
+                self.dwf.FDwfGetLastErrorMsg(self.szerr)
+                raise AcquisitionError(str(self.szerr.value))
+        return self.row
+
+    # Complex impedance of the last read [Ohm]
+    def impedance(self):
+        return complex(self.values[self.resistance], self.values[self.reactance])
+
+    # Empty table for 'points' rows of this readout
+    def table(self, points):
+        return np.zeros(points, dtype=self.dtype)
@@ -0,0 +1,106 @@
+"""
+   Resonance Tracker
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module finds series (fs) and parallel (fp) resonance of a crystal with a few dozen captures instead of a full sweep
+   -> A short scan finds the brackets where the reactance X changes its sign (fs: - to +, fp: + to -)
+   -> Each bracket is closed with a regula falsi search (Illinois variant), X is almost linear around the resonances so it converges fast
+   -> ESR is R at fs, C0/C1/L1 and Q follow from fs, fp and one capture below fs (Butterworth-Van Dyke model)
+   -> 'track()' measures again around the last values, so drift over time (temperature, drive level...) is followed
+"""
+
+import math
+import time
+
+
+class ResonanceTracker:
+    def __init__(self, engine, amp=100, tolerance=1.0, scan_points=21, max_iterations=30):
+        self.engine = engine                                            # Configured 'SweepEngine'
+        self.amp = amp                                                  # Stimulus amplitude [mV]
+        self.tolerance = tolerance                                      # Frequency resolution of fs and fp [Hz]
+        self.scan_points = scan_points                                  # Points of the bracket scan
+        self.max_iterations = max_iterations
+        self.captures = 0                                               # Captures of the last measurement
+        self.last = None                                                # Last result
+        self.history = []                                               # All results, e.g. to follow the drift
+
+    def reactance(self, freq):
+        self.captures += 1
+        return self.engine.measureZ(freq).imag
+
+    # Regula falsi (Illinois) between 'lo' and 'hi', where X has different signs
+    def zeroCrossing(self, lo, xlo, hi, xhi):
+        side = 0
+        freq = lo
+        for i in range(self.max_iterations):
+            last = freq
+            freq = (lo * xhi - hi * xlo) / (xhi - xlo)
+            if hi - lo < self.tolerance or abs(freq - last) < self.tolerance / 2:
+                break
+            x = self.reactance(freq)
+            if (x > 0) == (xhi > 0):
+                hi, xhi = freq, x
+                if side == 1:
+                    xlo /= 2                                            # Illinois: the same side twice, halve the other value
+                side = 1
+            else:
+                lo, xlo = freq, x
+                if side == -1:
+                    xhi /= 2
+                side = -1
+        return freq
+
+    # Finds fs and fp between 'freq_start' and 'freq_end' [Hz], returns a dict with fs, fp, ESR, C0, C1, L1, Q
+    def locate(self, freq_start, freq_end):
+        self.captures = 0
+        self.engine.start()
+        try:
+            self.engine.setAmplitude(self.amp)
+            step = (freq_end - freq_start) / (self.scan_points - 1)
+            scan = [(freq_start + i * step, self.reactance(freq_start + i * step)) for i in range(self.scan_points)]
+
+            fs = fp = None
+            for (lo, xlo), (hi, xhi) in zip(scan[:-1], scan[1:]):
+                if fs is None and xlo < 0 <= xhi:
+                    fs = self.zeroCrossing(lo, xlo, hi, xhi)
+                elif fs is not None and xlo > 0 >= xhi:
+                    fp = self.zeroCrossing(lo, xlo, hi, xhi)
+                    break
+            if fs is None or fp is None:
+                raise ValueError("No resonance between " + str(freq_start) + "Hz and " + str(freq_end) + "Hz")
+
+            self.captures += 2
+            esr = self.engine.measureZ(fs).real
+            below = fs - 2 * (fp - fs)
+            susceptance = (1 / self.engine.measureZ(below)).imag
+        finally:
+            self.engine.stop()
+
+        self.last = self.model(fs, fp, esr, below, susceptance)
+        self.history.append(self.last)
+        return self.last
+
+    # Butterworth-Van Dyke parameters from fs, fp, ESR and the susceptance B at a frequency below fs
+    def model(self, fs, fp, esr, below, susceptance):
+        ratio = (fp / fs) ** 2 - 1                                      # C1 / C0
+        w = 2 * math.pi * below
+        C0 = susceptance / (w * (1 + ratio / (1 - (below / fs) ** 2)))
+        C1 = ratio * C0
+        L1 = 1 / ((2 * math.pi * fs) ** 2 * C1)
+        return {"time": time.time(), "fs": fs, "fp": fp, "ESR": esr, "C0": C0, "C1": C1, "L1": L1,
+                "Q": 2 * math.pi * fs * L1 / esr, "captures": self.captures}
+
+    # Measures again around the last result, the window grows if the resonances moved out of it
+    def track(self, window=None, max_window=1e5):
+        if self.last is None:
+            raise ValueError("'locate' has to be called before 'track'")
+        span = self.last["fp"] - self.last["fs"]
+        window = window or span
+        while True:
+            try:
+                return self.locate(self.last["fs"] - window, self.last["fp"] + window)
+            except ValueError:
+                if window >= max_window:
+                    raise
+                window *= 4
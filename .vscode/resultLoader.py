@@ -0,0 +1,187 @@
+"""
+   Result Loader
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module opens measurement archives for the analysis without parsing or copying them
+   -> The columns of an uncompressed .npz container are memory-mapped (numpy.memmap), HDF5 datasets are read on access
+   -> |Z|, phase and frequency windows of a single pass are only computed for the part that is actually used
+   -> Classic text files ('impedance_100mV_1000Ohm_Inc(1).txt') are converted ONCE into a .npz container next to them and loaded from there
+"""
+
+import os
+import re
+import json
+import struct
+import zipfile
+import numpy as np
+
+from resultWriter import ResultWriter, DIRECTIONS, h5py
+from sweepEngine import SweepResult
+
+
+# Memory-maps one array of an uncompressed .npz file, compressed members are read into memory
+def memmapMember(filename, name):
+    with zipfile.ZipFile(filename) as container:
+        info = container.getinfo(name + ".npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            return np.load(filename)[name]
+
+    with open(filename, "rb") as f:
+        f.seek(info.header_offset)
+        local = f.read(30)                                              # Local file header of the zip member
+        name_length, extra_length = struct.unpack("<HH", local[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode="r", shape=shape, offset=offset, order="F" if fortran else "C")
+
+
+
+# One pass (one amplitude, one direction) of an archive, all columns are views into the file
+class SweepView:
+    def __init__(self, archive, amplitude, resistance, direction, section):
+        self.archive = archive
+        self.amplitude = amplitude                                      # Stimulus amplitude [mV]
+        self.resistance = resistance                                    # Reference resistor [Ohm]
+        self.direction = direction                                      # "Inc" or "Dec"
+        self.section = section                                          # Slice of the points in the archive columns
+
+    def __len__(self):
+        return self.section.stop - self.section.start
+
+    def column(self, name):
+        return self.archive.column(name)[self.section]
+
+    @property
+    def frequency(self):                                                # Frequency [Hz]
+        return self.column("frequency")
+
+    @property
+    def Z(self):                                                        # Complex impedance [Ohm]
+        return self.column("impedance")
+
+    @property
+    def impedance(self):                                                # Impedance [Ohm]
+        return np.abs(self.Z)
+
+    @property
+    def phase(self):                                                    # Phase [deg]
+        return np.degrees(np.angle(self.Z))
+
+    @property
+    def deviation(self):                                                # Standard deviation of Z over the averaged captures [Ohm]
+        return self.column("deviation")
+
+    @property
+    def reference(self):                                                # Reference resistor of every point [Ohm]
+        return self.column("reference")
+
+    @property
+    def level(self):                                                    # Stimulus amplitude of every point [mV], older containers: the pass amplitude
+        if not self.archive.has("level"):
+            return np.full(len(self), float(self.amplitude))
+        return self.column("level")
+
+    # Points between 'freq_start' and 'freq_end' [Hz], found by binary search so only the window is read
+    def window(self, freq_start, freq_end):
+        freq = self.frequency
+        if self.direction == "Dec":
+            first = len(freq) - np.searchsorted(freq[::-1], freq_end, side="right")
+            last = len(freq) - np.searchsorted(freq[::-1], freq_start, side="left")
+        else:
+            first = np.searchsorted(freq, freq_start, side="left")
+            last = np.searchsorted(freq, freq_end, side="right")
+        start = self.section.start
+        return SweepView(self.archive, self.amplitude, self.resistance, self.direction, slice(start + first, start + last))
+
+
+
+class SweepArchive:
+    def __init__(self, filename):
+        self.filename = filename
+        self.columns = {}                                               # Opened columns, every column is mapped on first access
+        self.h5 = None
+        if os.path.splitext(filename)[1] in (".h5", ".hdf5"):
+            self.h5 = h5py.File(filename, "r")
+            self.metadata = json.loads(self.h5.attrs["metadata"])
+        else:
+            with np.load(filename) as container:
+                self.metadata = json.loads(str(container["metadata"]))
+        self.passes = [SweepView(self, amp, res, DIRECTIONS[direction], slice(start, start + count))
+                       for amp, res, direction, start, count in self.passTable()]
+
+    def column(self, name):
+        if name not in self.columns:
+            if self.h5 is not None:
+                self.columns[name] = self.h5[name]
+            else:
+                self.columns[name] = memmapMember(self.filename, name)
+        return self.columns[name]
+
+    # True if the container has the column 'name' (older containers have fewer columns)
+    def has(self, name):
+        if self.h5 is not None:
+            return name in self.h5
+        with zipfile.ZipFile(self.filename) as container:
+            return name + ".npy" in container.namelist()
+
+    # [amplitude, resistance, direction, start, count] of every pass, from the metadata or from the columns of older containers
+    def passTable(self):
+        if "passes" in self.metadata:
+            return self.metadata["passes"]
+        keys = np.column_stack((self.column("amplitude")[:], self.column("resistance")[:], self.column("direction")[:]))
+        starts = np.concatenate(([0], np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1))
+        counts = np.diff(np.append(starts, len(keys)))
+        return [[keys[s][0], keys[s][1], int(keys[s][2]), int(s), int(c)] for s, c in zip(starts, counts) if c > 0]
+
+    # Pass with the given amplitude [mV] and direction
+    def sweep(self, amplitude, direction="Inc"):
+        for view in self.passes:
+            if view.amplitude == amplitude and view.direction == direction:
+                return view
+        raise KeyError(str(amplitude) + "mV " + direction)
+
+    def close(self):
+        self.columns.clear()
+        if self.h5 is not None:
+            self.h5.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+
+# Converts a classic text file into a container (only if the container is missing or older than the text file)
+def ingestText(filename, cache=None):
+    if cache is None:
+        cache = os.path.splitext(filename)[0] + ".npz"
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(filename):
+        return cache
+
+    match = re.search(r"impedance_(\d+)mV_(\d+)Ohm_(Inc|Dec)", os.path.basename(filename))
+    amplitude, resistance, direction = (int(match.group(1)), int(match.group(2)), match.group(3)) if match else (0, 0, "Inc")
+    data = np.loadtxt(filename, ndmin=2)
+    result = SweepResult(amplitude, direction, resistance, data[:, 0])
+    result.impedance = data[:, 1]
+    result.phase = data[:, 2]
+
+    with ResultWriter(cache, len(data), {"source": os.path.basename(filename)}) as writer:
+        writer.add(result)
+    return cache
+
+
+# Opens a container (.npz / .h5) or a classic text file (.txt, converted once)
+def openArchive(filename):
+    if os.path.splitext(filename)[1] == ".txt":
+        filename = ingestText(filename)
+    return SweepArchive(filename)
@@ -0,0 +1,117 @@
+"""
+   Result Writer
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module collects the sweep results in preallocated NumPy columns and writes them as ONE binary container per run
+   -> Columns: frequency [Hz], impedance (complex Z) [Ohm], amplitude [mV], resistance [Ohm], direction (0 = Inc, 1 = Dec), timestamp [s],
+      deviation (standard deviation of Z over the averaged captures) [Ohm], captures per point, reference (per point with auto ranging) [Ohm]
+      and level (stimulus amplitude of every point, differs from the pass amplitude only with segment amplitudes) [mV]
+   -> The container is an uncompressed .npz file (or HDF5 with the ending .h5 if h5py is installed), the metadata is stored as JSON
+   -> 'exportText' converts a container back to the classic 'impedance_<amp>mV_<res>Ohm_<Inc/Dec>.txt' files
+"""
+
+import os
+import json
+import time
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+COLUMNS = {"frequency": np.float64, "impedance": np.complex128, "amplitude": np.float64, "resistance": np.float64, "direction": np.uint8, "timestamp": np.float64,
+           "deviation": np.float64, "captures": np.uint32, "reference": np.float64, "level": np.float64}
+DIRECTIONS = ["Inc", "Dec"]
+
+
+class ResultWriter:
+    def __init__(self, filename, capacity=0, metadata=None):
+        self.filename = filename
+        self.metadata = dict(metadata or {})
+        self.metadata.setdefault("created", time.strftime("%Y-%m-%d %H:%M:%S"))
+        self.count = 0                                                  # Number of points written
+        self.passes = []                                                # [amplitude, resistance, direction, start, count] of every pass
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+        if os.path.splitext(filename)[1] in (".h5", ".hdf5") and h5py is None:
+            raise ImportError("h5py is needed to write '" + filename + "', use a .npz file instead")
+
+    # Makes room for 'points' more points (doubles the columns, so appending stays cheap)
+    def reserve(self, points):
+        needed = self.count + points
+        capacity = len(self.columns["frequency"])
+        if needed > capacity:
+            capacity = max(needed, 2 * capacity)
+            for name in self.columns:
+                self.columns[name] = np.resize(self.columns[name], capacity)
+
+    # Appends the points of one pass ('SweepResult')
+    def add(self, result):
+        n = len(result.frequency)
+        self.reserve(n)
+        section = slice(self.count, self.count + n)
+        self.columns["frequency"][section] = result.frequency
+        self.columns["impedance"][section] = result.Z()
+        self.columns["amplitude"][section] = result.amplitude
+        self.columns["resistance"][section] = result.resistance
+        self.columns["direction"][section] = DIRECTIONS.index(result.direction)
+        self.columns["timestamp"][section] = result.timestamp
+        self.columns["deviation"][section] = result.deviation if result.deviation is not None else 0.0
+        self.columns["captures"][section] = result.captures if result.captures is not None else 1
+        self.columns["reference"][section] = result.reference if result.reference is not None else result.resistance
+        self.columns["level"][section] = result.level if result.level is not None else result.amplitude
+        self.passes.append([float(result.amplitude), float(result.resistance), DIRECTIONS.index(result.direction), self.count, n])
+        self.count += n
+
+    # Writes the container to disk
+    def close(self):
+        columns = {name: column[:self.count] for name, column in self.columns.items()}
+        self.metadata["points"] = self.count
+        self.metadata["passes"] = self.passes
+        if os.path.splitext(self.filename)[1] in (".h5", ".hdf5"):
+            with h5py.File(self.filename, "w") as container:
+                for name, column in columns.items():
+                    container.create_dataset(name, data=column)
+                container.attrs["metadata"] = json.dumps(self.metadata)
+        else:
+            np.savez(self.filename, metadata=np.array(json.dumps(self.metadata)), **columns)   # Uncompressed, so the columns can be memory-mapped later
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+
+# Reads all columns and the metadata of a container into memory
+def readContainer(filename):
+    if os.path.splitext(filename)[1] in (".h5", ".hdf5"):
+        with h5py.File(filename, "r") as container:
+            columns = {name: container[name][()] for name in COLUMNS if name in container}          # Older containers have fewer columns
+            metadata = json.loads(container.attrs["metadata"])
+    else:
+        with np.load(filename) as container:
+            columns = {name: container[name] for name in COLUMNS if name in container.files}
+            metadata = json.loads(str(container["metadata"]))
+    return columns, metadata
+
+
+# Converts a container into the classic text files, one per amplitude, resistance and direction
+def exportText(filename, folder="."):
+    columns, metadata = readContainer(filename)
+    keys = np.column_stack((columns["amplitude"], columns["resistance"], columns["direction"]))
+    change = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1   # Start index of every pass
+    names = []
+    for section in np.split(np.arange(len(keys)), change):
+        if len(section) == 0:
+            continue
+        amp, res, direction = keys[section[0]]
+        name = os.path.join(folder, "impedance_" + str(int(amp)) + "mV_" + str(int(res)) + "Ohm_" + DIRECTIONS[int(direction)] + ".txt")
+        Z = columns["impedance"][section]
+        np.savetxt(name, np.column_stack((columns["frequency"][section], np.abs(Z), np.degrees(np.angle(Z)))), fmt=("%.12g", "%.17g", "%.17g"), delimiter="\t")
+        names.append(name)
+    return names
@@ -0,0 +1,56 @@
+"""
+   Settle Policy
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module decides how long the device under test (DUT) gets to settle after every frequency change
+   -> 'FixedSettle': always the same time (the old 'time.sleep(0.01)')
+   -> 'CyclesSettle': a number of stimulus periods at the current frequency, so MHz points don't wait for thousands of periods
+   -> 'ConvergenceSettle': repeats captures until |Z| changes less than a tolerance
+   -> Every policy returns the measurement of the point: impedance [Ohm] and phase [deg]
+"""
+
+import time
+
+
+class FixedSettle:
+    def __init__(self, seconds=0.01):
+        self.seconds = seconds                                          # Settle time [s], this value depends on the DUT!
+
+    def measure(self, engine, freq):
+        time.sleep(self.seconds)
+        return engine.capturePoint(freq)
+
+
+class CyclesSettle:
+    def __init__(self, cycles=1000, minimum=0.0, maximum=0.01):
+        self.cycles = cycles                                            # Number of stimulus periods to wait
+        self.minimum = minimum                                          # Shortest settle time [s]
+        self.maximum = maximum                                          # Longest settle time [s], for very low frequencies
+
+    def delay(self, freq):
+        return min(max(self.cycles / freq, self.minimum), self.maximum)
+
+    def measure(self, engine, freq):
+        delay = self.delay(freq)
+        if delay > 0:
+            time.sleep(delay)
+        return engine.capturePoint(freq)
+
+
+class ConvergenceSettle:
+    def __init__(self, tolerance=0.001, max_captures=10):
+        self.tolerance = tolerance                                      # Relative change of |Z| between two captures
+        self.max_captures = max_captures                                # Gives up after this many captures and returns the last one
+        self.captures = 0                                               # Number of captures of all points
+
+    def measure(self, engine, freq):
+        last = engine.capturePoint(freq)
+        self.captures += 1
+        for i in range(self.max_captures - 1):
+            point = engine.capturePoint(freq)
+            self.captures += 1
+            if abs(point[0] - last[0]) <= self.tolerance * abs(last[0]):
+                return point
+            last = point
+        return last
@@ -0,0 +1,267 @@
+"""
+   Sweep Engine
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module performs the amplitude x frequency sweep of a 'SweepPlan' on a device backend ('dwf' + 'hdwf')
+   -> It has no GUI dependency, so it can be called from the GUI, from a script or from a batch job
+   -> The results of every pass are returned as NumPy arrays: frequency [Hz], impedance [Ohm] and phase [deg]
+"""
+
+from ctypes import *
+from dwfconstants import *
+from acquisition import CaptureWait, AcquisitionTimeout
+from settlePolicy import FixedSettle
+from readout import ImpedanceReadout
+from deviceConfig import DeviceConfig
+from averaging import WelfordAverage
+from sweepTimer import NoTimer, CONFIGURE, SETTLE, DISCARD, POLLING, READOUT, WRITE
+from impedanceQuantities import complexImpedance, deriveQuantities
+
+import math
+import time
+import threading
+import numpy as np
+
+
+# The sweep was stopped with 'SweepEngine.cancel()'
+class SweepCancelled(Exception):
+    pass
+
+
+# Per-point arrays of a 'SweepResult', everything that joins or reorders points goes through this list
+POINT_FIELDS = ["frequency", "impedance", "phase", "timestamp", "values", "deviation", "captures", "reference", "level"]
+
+# Value of an optional per-point array that was not measured
+POINT_DEFAULTS = {"deviation": lambda result: 0.0, "captures": lambda result: 1, "reference": lambda result: float(result.resistance),
+                  "level": lambda result: float(result.amplitude)}
+
+
+# Results of one pass (one amplitude, one direction)
+class SweepResult:
+    def __init__(self, amplitude, direction, resistance, frequency):
+        self.amplitude = amplitude                                      # Stimulus amplitude [mV]
+        self.direction = direction                                      # "Inc" or "Dec"
+        self.resistance = resistance                                    # Reference resistor [Ohm]
+        self.frequency = frequency                                      # Frequency [Hz]
+        self.impedance = np.zeros(len(frequency))                       # Impedance [Ohm]
+        self.phase = np.zeros(len(frequency))                           # Phase [deg]
+        self.timestamp = np.zeros(len(frequency))                       # Time of every point [s since epoch]
+        self.values = None                                              # All read quantities as NumPy structured array (see 'readout.py')
+        self.deviation = None                                           # Standard deviation of complex Z over the captures of every point [Ohm] (only with averaging)
+        self.captures = None                                            # Captures of every point (only with averaging)
+        self.reference = None                                           # Reference resistor of every point [Ohm] (only with auto ranging)
+        self.level = None                                               # Stimulus amplitude of every point [mV] (only with segment amplitudes)
+
+    # Complex impedance [Ohm]
+    def Z(self):
+        return complexImpedance(self.impedance, self.phase)
+
+    # Per-point array 'name' (see 'POINT_FIELDS'), filled with its default if it was not measured (zeros of the type of 'like' for the values)
+    def pointArray(self, name, like=None):
+        column = getattr(self, name)
+        if column is not None:
+            return column
+        if name in POINT_DEFAULTS:
+            return np.full(len(self.frequency), POINT_DEFAULTS[name](self))
+        return np.zeros(len(self.frequency), dtype=like.dtype)
+
+    # Derived quantities (admittance, Cs/Cp, Ls/Lp, D, Q...), see 'impedanceQuantities.deriveQuantities'
+    def quantities(self, names=None, units=None):
+        return deriveQuantities(self.Z(), self.frequency, names, units)
+
+    # File name of the classic text output, e.g. 'impedance_100mV_1000Ohm_Inc.txt'
+    def fileName(self):
+        return "impedance_" + str(self.amplitude) + "mV_" + str(self.resistance) + "Ohm_" + self.direction + ".txt"
+
+    # Writes frequency, impedance and phase value to a tab separated text file
+    def writeText(self, filename=None):
+        if filename is None:
+            filename = self.fileName()
+        np.savetxt(filename, np.column_stack((self.frequency, self.impedance, self.phase)), fmt=("%.12g", "%.17g", "%.17g"), delimiter="\t")
+
+
+class SweepEngine:
+    def __init__(self, dwf, hdwf, timeout=2.0, retries=1, settle=None, quantities=("Resistance", "Reactance"), batch=False, timer=None, averaging=None, ranging=None):
+        self.dwf = dwf                                                  # Device backend (WaveForms library)
+        self.hdwf = hdwf                                                # Device handle
+        self.settle = settle if settle is not None else FixedSettle()   # Settle policy after every frequency change (see 'settlePolicy.py')
+        self.capture = CaptureWait(dwf, timeout)                        # Waits for the finished capture without busy polling
+        self.retries = retries                                          # New captures after a timeout before the error is raised
+        self.periods = 16                                               # Periods per capture of the current plan
+        self.readout = ImpedanceReadout(dwf, hdwf, quantities)          # Reads R, X (+ optional quantities) into one preallocated buffer
+        self.config = DeviceConfig(dwf, hdwf, batch)                    # Sends only changed settings, batch = apply them with one configure
+        self.fresh = False                                              # A configure just started a new capture, no need to restart it
+        self.timer = timer if timer is not None else NoTimer()          # 'SweepTimer' to see where the time of every point goes
+        self.averaging = averaging if averaging is not None else WelfordAverage()   # Captures per point, see 'averaging.py'
+        self.ranging = ranging                                          # Optional 'AutoRange', selects the reference resistor per point
+        self.points = 0                                                 # Number of measured points of the current run
+        self.current = None                                             # 'SweepResult' of the running pass (filled up to 'self.index')
+        self.index = 0
+        self.cancelled = threading.Event()
+        self.resumed = threading.Event()                                # Cleared while the sweep is paused
+        self.resumed.set()
+
+    # region Control (thread safe, e.g. from the GUI while the sweep runs on a worker thread)
+    def cancel(self):
+        self.cancelled.set()
+        self.resumed.set()                                              # A paused sweep has to wake up to stop
+
+    def pause(self):
+        self.resumed.clear()
+
+    def resume(self):
+        self.resumed.set()
+
+    def paused(self):
+        return not self.resumed.is_set()
+    # endregion
+
+    # Configures the impedance analyzer for the plan (mode and reference resistor)
+    def configure(self, plan):
+        self.config.setup()                                                             # Immediate (AutoConfigure 3) or batch mode (AutoConfigure 0)
+        self.config.reset()
+        self.config.set("mode", plan.mode)                                              # 0 = W1-C1-DUT-C2-R-GND, 1 = W1-C1-R-C2-DUT-GND, 8 = AD IA adapter
+        self.config.set("reference", float(plan.resistance))                            # Sets the reference resistor value in Ohms
+        if plan.periods is not None:
+            self.config.set("periods", plan.periods)                                    # Minimum number of stimulus periods per capture
+        if self.ranging is not None:
+            self.ranging.current = self.ranging.nearest(plan.resistance)                # Auto ranging starts with the reference of the plan
+
+    # Runs all passes of the plan and returns the list of results
+    def run(self, plan, onPass=None):
+        return list(self.iterPasses(plan, onPass))
+
+    # Runs all passes of the plan and yields every result as soon as its pass is finished
+    # 'onPass(amplitude, direction)' is called before each pass starts
+    def iterPasses(self, plan, onPass=None):
+        self.start()
+        try:
+            for direction in plan.directions():
+                for amp in plan.amplitudes:                                             # Runs all the amplitude range
+                    if onPass is not None:
+                        onPass(amp, direction)
+                    yield self.runPass(plan, amp, direction)
+        finally:
+            self.stop()
+
+    # Starts the measurement, 'runPass' can be called as often as needed until 'stop'
+    def start(self):
+        self.points = 0
+        self.cancelled.clear()
+        self.config.configure(True)                                                     # Measurement Start
+
+    def stop(self):
+        self.config.configure(False)                                                    # Measurement End
+
+    # Runs the frequency range of one amplitude in one direction
+    # 'first' and 'result' continue a pass that was stopped at point 'first', 'onPoint(result, i)' is called after every point
+    def runPass(self, plan, amp, direction, first=0, result=None, onPoint=None):
+        self.periods = plan.periods or 16
+        if result is None:
+            result = SweepResult(amp, direction, plan.resistance, plan.passFrequencies(direction))
+            result.values = self.readout.table(len(result.frequency))
+        self.index = first
+        self.setAmplitude(amp)
+        levels = plan.passAmplitudes(amp, direction)                    # Segment amplitudes [mV], None = 'amp' everywhere
+        if levels is not None and result.level is None:
+            result.level = np.full(len(result.frequency), float(amp))
+        averages = plan.passAverages(direction)                         # Captures per point of the segments, None = 'self.averaging.captures'
+        captures = self.averaging.captures
+        if (averages is not None or captures > 1) and result.deviation is None:
+            result.deviation = np.zeros(len(result.frequency))
+            result.captures = np.ones(len(result.frequency), dtype=np.int64)
+        if self.ranging is not None:
+            if result.reference is None:
+                result.reference = np.full(len(result.frequency), float(plan.resistance))
+            self.config.set("reference", self.ranging.reference())                      # The device always measures in the active range
+        level = amp
+
+        self.current = result
+        for i in range(first, len(result.frequency)):
+            freq = result.frequency[i]
+            self.resumed.wait()                                         # Blocks only while the sweep is paused
+            if self.cancelled.is_set():
+                raise SweepCancelled()
+            self.timer.begin()
+            if levels is not None and levels[i] != level:              # Only at segment borders
+                level = levels[i]
+                self.setAmplitude(level)
+            if levels is not None:
+                result.level[i] = level
+            result.impedance[i], result.phase[i] = self.measurePoint(freq)
+            if self.ranging is not None:
+                result.impedance[i], result.phase[i] = self.rangePoint(freq, result.impedance[i], result.phase[i])
+                result.reference[i] = self.ranging.reference()
+            result.values[i] = self.readout.row
+            if averages is not None:
+                captures = averages[i]
+            if captures > 1:
+                Z, result.deviation[i], result.captures[i] = self.averaging.measure(self, freq, captures)
+                result.impedance[i], result.phase[i] = abs(Z), math.degrees(math.atan2(Z.imag, Z.real))
+                result.values["Resistance"][i], result.values["Reactance"][i] = Z.real, Z.imag
+            result.timestamp[i] = time.time()
+            self.index = i + 1
+            self.points += 1
+            if onPoint is not None:
+                onPoint(result, i)
+            self.timer.lap(WRITE)
+            self.timer.end()
+
+        return result
+
+    # Continues with a new handle of the same device (e.g. after it was opened again), all settings are sent again
+    def attach(self, hdwf):
+        self.hdwf = hdwf
+        self.readout.hdwf = hdwf
+        self.config.hdwf = hdwf
+        self.config.invalidate()
+
+    # Changes the reference resistor while |Z| is outside the band of the active range and measures the point again
+    def rangePoint(self, freq, impedance, phase):
+        for attempt in range(len(self.ranging.references)):
+            index = self.ranging.select(impedance)
+            if index == self.ranging.current:
+                break
+            self.ranging.switch(index)
+            self.config.set("reference", self.ranging.reference())
+            impedance, phase = self.measurePoint(freq)
+        return impedance, phase
+
+    # Sets the stimulus amplitude [mV]
+    def setAmplitude(self, amp):
+        self.config.set("amplitude", amp / 1000)                                        # Sets the stimulus amplitude (0V to peak signal), only if it changed
+
+    # Measures impedance [Ohm] and phase [deg] at one frequency
+    def measurePoint(self, freq):
+        self.config.set("frequency", float(freq))                                       # Sets the stimulus frequency
+        self.fresh = self.config.commit()                                               # Batch mode: applies frequency (+ amplitude) with one configure
+        self.timer.lap(CONFIGURE)
+        return self.settle.measure(self, freq)                                         # Settle time of device under test (DUT), this value depends on the device!
+
+    # Measures the complex impedance [Ohm] at one frequency
+    def measureZ(self, freq):
+        self.measurePoint(freq)
+        return self.readout.impedance()
+
+    # Takes a new capture at the current settings and reads impedance [Ohm] and phase [deg]
+    def capturePoint(self, freq):
+        self.timer.lap(SETTLE)                                                          # Everything since the configure was settling
+        for attempt in range(self.retries + 1):
+            if not self.fresh:
+                self.dwf.FDwfAnalogImpedanceStatus(self.hdwf, None)                    # Ignore last capture since we changed the frequency
+            self.fresh = False
+            self.timer.lap(DISCARD)
+            try:
+                self.timer.addPolls(self.capture.wait(self.hdwf, freq, self.periods))
+                self.timer.lap(POLLING)
+                break
+            except AcquisitionTimeout:
+                self.timer.lap(POLLING)
+                if attempt == self.retries:
+                    raise
+
+        self.readout.read()                                                             # Read resistance, reactance... of the DUT
+        self.timer.lap(READOUT)
+        Z = self.readout.impedance()
+        return abs(Z), math.degrees(math.atan2(Z.imag, Z.real))
@@ -0,0 +1,121 @@
+"""
+   Sweep Plan
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module describes WHAT has to be measured: frequencies [Hz], amplitudes [mV], reference resistor [Ohm] and directions
+   -> The frequency axis is computed once as a NumPy array, the sweep engine only walks through it
+   -> Plans: linear (also sub-Hz steps), logarithmic, arbitrary lists and segments (each with its own density, amplitude and averaging)
+"""
+
+import math
+import numpy as np
+
+
+# One part of a segmented plan: 'points' between 'freq_start' and 'freq_end' [Hz] (both included), linear or logarithmic
+# 'amplitude' [mV] replaces the amplitude of the pass inside this segment (None = amplitude of the pass), 'averages' captures per point
+class Segment:
+    def __init__(self, freq_start, freq_end, points, spacing="lin", amplitude=None, averages=1):
+        if spacing not in ("lin", "log"):
+            raise ValueError("Unknown spacing '" + str(spacing) + "', use 'lin' or 'log'")
+        if freq_end < freq_start or points < 1:
+            raise ValueError("Segment needs freq_start <= freq_end and at least one point")
+        self.freq_start = freq_start
+        self.freq_end = freq_end
+        self.points = int(points)
+        self.spacing = spacing
+        self.amplitude = amplitude
+        self.averages = int(averages)
+
+    def frequencies(self):
+        if self.points == 1:
+            return np.array([self.freq_start], dtype=np.float64)
+        if self.spacing == "log":
+            return np.geomspace(self.freq_start, self.freq_end, self.points)
+        return np.linspace(self.freq_start, self.freq_end, self.points)
+
+
+class SweepPlan:
+    def __init__(self, frequencies, amplitudes, resistance=1000, decrease=False, mode=8, periods=None):
+        self.frequencies = np.asarray(frequencies, dtype=np.float64)    # Frequency axis in increasing order [Hz]
+        self.amplitudes = [int(amp) for amp in amplitudes]             # Stimulus amplitudes [mV]
+        self.resistance = resistance                                    # Reference resistor [Ohm]
+        self.decrease = decrease                                        # Runs the whole amplitude range a second time with decreasing frequency
+        self.mode = mode                                                # 0 = W1-C1-DUT-C2-R-GND, 1 = W1-C1-R-C2-DUT-GND, 8 = AD IA adapter
+        self.periods = periods                                          # Minimum stimulus periods per capture (None = device default)
+        self.levels = None                                              # Amplitude of every point [mV] (NaN = amplitude of the pass), None = no segment amplitudes
+        self.averages = None                                            # Captures of every point, None = one capture everywhere
+
+    # Linear sweep like in the GUI: 'freq_start' to 'freq_end' with 'freq_delta', amplitudes 'amp_start' to 'amp_end' with 'amp_delta'
+    # 'freq_end' is included if it lies on the grid, the steps can be smaller than 1 Hz
+    @classmethod
+    def linear(cls, freq_start, freq_end, freq_delta, amp_start, amp_end, amp_delta, resistance=1000, decrease=False):
+        count = int(math.floor((freq_end - freq_start) / freq_delta + 1e-9)) + 1
+        frequencies = freq_start + np.arange(count) * float(freq_delta)  # No accumulated rounding errors like repeated additions
+        amplitudes = range(amp_start, amp_end + 1, amp_delta)
+        return cls(frequencies, amplitudes, resistance, decrease)
+
+    # Logarithmic sweep with 'freq_steps' points from 'freq_start' to 'freq_end' (the old 'freq_end * pow(10.0, ...)' loop)
+    @classmethod
+    def logarithmic(cls, freq_start, freq_end, freq_steps, amplitudes, resistance=1000, decrease=False):
+        return cls(np.geomspace(freq_start, freq_end, freq_steps), amplitudes, resistance, decrease)
+
+    # Arbitrary frequencies [Hz], sorted and without duplicates
+    @classmethod
+    def fromList(cls, frequencies, amplitudes, resistance=1000, decrease=False):
+        return cls(np.unique(np.asarray(frequencies, dtype=np.float64)), amplitudes, resistance, decrease)
+
+    # Plan of several 'Segment's, a point shared by two neighbouring segments is measured once (with the settings of the first)
+    @classmethod
+    def segmented(cls, segments, amplitudes, resistance=1000, decrease=False):
+        segments = sorted(segments, key=lambda segment: segment.freq_start)
+        for first, second in zip(segments[:-1], segments[1:]):
+            if second.freq_start < first.freq_end:
+                raise ValueError("Segments " + str(first.freq_start) + "..." + str(first.freq_end) + "Hz and "
+                                 + str(second.freq_start) + "..." + str(second.freq_end) + "Hz overlap")
+
+        parts = [segment.frequencies() for segment in segments]
+        for i in range(1, len(parts)):
+            if parts[i][0] == parts[i - 1][-1]:
+                parts[i] = parts[i][1:]
+        plan = cls(np.concatenate(parts), amplitudes, resistance, decrease)
+        if any(segment.amplitude is not None for segment in segments):
+            plan.levels = np.concatenate([np.full(len(part), np.nan if segment.amplitude is None else float(segment.amplitude))
+                                          for segment, part in zip(segments, parts)])
+        if any(segment.averages > 1 for segment in segments):
+            plan.averages = np.concatenate([np.full(len(part), segment.averages) for segment, part in zip(segments, parts)])
+        return plan
+
+    # Directions of the passes: always "Inc", plus "Dec" if the decrease option is set
+    def directions(self):
+        if self.decrease:
+            return ["Inc", "Dec"]
+        return ["Inc"]
+
+    # Frequency axis in the order it is measured for one direction
+    def passFrequencies(self, direction):
+        if direction == "Dec":
+            return self.frequencies[::-1]
+        return self.frequencies
+
+    # Amplitude of every point of a pass with amplitude 'amp' [mV] in measuring order, None if it is 'amp' everywhere
+    def passAmplitudes(self, amp, direction):
+        if self.levels is None:
+            return None
+        levels = np.where(np.isnan(self.levels), amp, self.levels)
+        return levels[::-1] if direction == "Dec" else levels
+
+    # Captures of every point in measuring order, None if every point has one capture
+    def passAverages(self, direction):
+        if self.averages is None:
+            return None
+        return self.averages[::-1] if direction == "Dec" else self.averages
+
+    # Total number of sweep points of the whole plan
+    def pointCount(self):
+        return len(self.frequencies) * len(self.amplitudes) * len(self.directions())
+
+    # Total number of captures of the whole plan (points with averaging count more than once)
+    def captureCount(self):
+        captures = len(self.frequencies) if self.averages is None else int(self.averages.sum())
+        return captures * len(self.amplitudes) * len(self.directions())
@@ -0,0 +1,122 @@
+"""
+   Sweep Timer
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module measures where the time of every sweep point goes (time.perf_counter_ns, stored in a preallocated NumPy array)
+   -> Stages: configure (frequency/amplitude), settle (sleep of the settle policy), discard (restart of the capture),
+      polling (waiting for the capture, the number of status requests is counted too), readout and write (checkpoint, callbacks)
+   -> The engine calls 'lap(stage)' at the end of every stage, so the stages of a point always add up to its total time
+   -> 'report()' gives the summary per stage (total, share, mean, median, p95, max) and a log-scaled histogram as text
+"""
+
+import time
+import numpy as np
+
+
+STAGES = ["configure", "settle", "discard", "polling", "readout", "write"]
+CONFIGURE, SETTLE, DISCARD, POLLING, READOUT, WRITE = range(len(STAGES))
+
+
+# Used when no timing is wanted, every call does nothing
+class NoTimer:
+    def begin(self):
+        pass
+
+    def lap(self, stage):
+        pass
+
+    def addPolls(self, polls):
+        pass
+
+    def end(self):
+        pass
+
+    def addPass(self, stage, nanoseconds):
+        pass
+
+
+class SweepTimer:
+    def __init__(self, capacity=0):
+        self.durations = np.zeros((capacity, len(STAGES)), dtype=np.int64)  # Duration of every stage of every point [ns]
+        self.polls = np.zeros(capacity, dtype=np.int64)                 # Status requests of every point
+        self.count = 0                                                  # Number of timed points
+        self.last = 0                                                   # End of the last stage [ns]
+        self.active = False                                             # Laps outside of a point (e.g. single captures of the tracker) are ignored
+        self.passes = dict.fromkeys(STAGES, 0)                          # Work done once per pass, e.g. writing a result file [ns]
+
+    # Starts the timing of a new point
+    def begin(self):
+        if self.count >= len(self.durations):                           # Doubles the arrays, so appending stays cheap
+            capacity = max(2 * len(self.durations), 1024)
+            self.durations = np.resize(self.durations, (capacity, len(STAGES)))
+            self.durations[self.count:] = 0
+            self.polls = np.resize(self.polls, capacity)
+            self.polls[self.count:] = 0
+        self.active = True
+        self.last = time.perf_counter_ns()
+
+    # Adds the time since the last lap to 'stage' of the current point
+    def lap(self, stage):
+        if not self.active:
+            return
+        now = time.perf_counter_ns()
+        self.durations[self.count, stage] += now - self.last
+        self.last = now
+
+    def addPolls(self, polls):
+        if self.active:
+            self.polls[self.count] += polls
+
+    # Finishes the current point
+    def end(self):
+        self.active = False
+        self.count += 1
+
+    # Adds work that is done once per pass (not per point)
+    def addPass(self, stage, nanoseconds):
+        self.passes[STAGES[stage]] += nanoseconds
+
+    # Summary per stage in [ms]: total [s], share of the sweep time [%], mean, median, p95 and max per point
+    def summary(self):
+        durations = self.durations[:self.count] / 1e6
+        columns = dict(zip(STAGES, durations.T))
+        columns["point"] = durations.sum(axis=1)
+        total = columns["point"].sum()
+        rows = {}
+        for stage, column in columns.items():
+            if self.count == 0:
+                rows[stage] = dict.fromkeys(["total", "share", "mean", "median", "p95", "max"], 0.0)
+                continue
+            rows[stage] = {"total": column.sum() / 1e3, "share": 100 * column.sum() / total if total else 0.0, "mean": column.mean(),
+                           "median": np.median(column), "p95": np.percentile(column, 95), "max": column.max()}
+        return rows
+
+    # Histogram of the stage durations per point in log-spaced bins [us], returns bin edges and one count array per stage
+    def histogram(self, bins=12):
+        durations = np.maximum(self.durations[:self.count] / 1e3, 0.1)
+        edges = np.geomspace(0.1, max(durations.max() if self.count else 1.0, 1.0) * 1.001, bins + 1)
+        return edges, {stage: np.histogram(durations[:, i], edges)[0] for i, stage in enumerate(STAGES)}
+
+    # Summary table, polling statistics and histogram as text
+    def report(self, width=40):
+        lines = ["Points: " + str(self.count) + "\t" + "Status requests/point: " + str(round(self.polls[:self.count].mean(), 2) if self.count else 0)]
+        lines.append("%-10s %10s %7s %10s %10s %10s %10s" % ("stage", "total [s]", "share", "mean [ms]", "median", "p95", "max"))
+        for stage, row in self.summary().items():
+            lines.append("%-10s %10.3f %6.1f%% %10.4f %10.4f %10.4f %10.4f" % (stage, row["total"], row["share"], row["mean"], row["median"], row["p95"], row["max"]))
+        for stage, nanoseconds in self.passes.items():
+            if nanoseconds:
+                lines.append("%-10s %10.3f (once per pass)" % (stage, nanoseconds / 1e9))
+
+        edges, counts = self.histogram()
+        for stage in STAGES:
+            if not counts[stage].any():
+                continue
+            lines.append("")
+            lines.append(stage + " [us]")
+            scale = width / counts[stage].max()
+            used = np.flatnonzero(counts[stage])
+            section = slice(used[0], used[-1] + 1)                      # Only the bins between the first and the last used one
+            for low, high, count in zip(edges[:-1][section], edges[1:][section], counts[stage][section]):
+                lines.append("%9.1f - %9.1f | %-*s %d" % (low, high, width, "#" * int(round(count * scale)), count))
+        return "\n".join(lines)
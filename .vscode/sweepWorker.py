@@ -0,0 +1,117 @@
+"""
+   Sweep Worker
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> This module runs a 'SweepEngine' on a background thread, so the Tk event loop never blocks during a sweep
+   -> The worker reports through a thread-safe queue, the GUI polls it with 'win.after' (Tk widgets must only be touched by the main thread)
+   -> Messages: ("pass", amp, direction), ("result", SweepResult), ("prompt", text), ("error", text), ("cancelled",), ("finished", seconds)
+   -> "finished" is always the last message, 'completed' tells if the whole plan was measured, otherwise 'failure' says why not
+   -> With a 'Compensation' every result is corrected on the host before it is written (see 'compensation.py'), its tables are taken
+      on the worker thread, missing ones are measured there; the prompts are sent as ("prompt", text) and the sweep waits for 'answer()'
+   -> With a 'checkpoint' file every point is saved at once, the sweep survives device errors and can be resumed (see 'checkpoint.py')
+   -> Only passes are reported, the per-point progress is read directly from 'engine.points', so the sweep has no extra cost per point
+"""
+
+from sweepEngine import SweepCancelled
+from checkpoint import ResumableSweep
+from sweepTimer import WRITE
+
+import time
+import queue
+import threading
+
+
+class SweepWorker(threading.Thread):
+    def __init__(self, engine, plan, writer=None, writeText=False, checkpoint=None, compensation=None, device=None):
+        threading.Thread.__init__(self, daemon=True)
+        self.engine = engine
+        self.plan = plan
+        self.writer = writer                                            # Optional 'ResultWriter', closed when the sweep ends
+        self.writeText = writeText                                      # Additionally writes the classic text files
+        self.checkpoint = checkpoint                                    # Optional checkpoint file, continued if it exists
+        self.compensation = compensation                                # Optional 'Compensation', its tables are applied to every result
+        self.device = device                                            # Serial number of the device, opened again after a device error
+        if compensation is not None:
+            compensation.prompt = self.prompt                           # Tk dialogs only on the main thread
+        self.messages = queue.Queue()
+        self.answered = threading.Event()                               # Set by the GUI when the user confirmed a prompt
+        self.calibrating = False                                        # True while missing compensation tables are measured
+        self.completed = False                                          # True only if every pass was measured and written
+        self.failure = None                                             # Why the sweep stopped early ("cancelled" or the error text)
+
+    def run(self):
+        initial = time.time()
+        try:
+            tables = None
+            if self.compensation is not None:
+                self.calibrating = True
+                tables = self.compensation.tables(self.plan, self.engine.ranging)   # Cached, missing ones are measured now (once)
+                self.calibrating = False
+            if self.checkpoint is not None:
+                passes = ResumableSweep(self.engine, self.plan, self.checkpoint, device=self.device).iterPasses(self.passFunction)
+            else:
+                passes = self.engine.iterPasses(self.plan, self.passFunction)
+            for result in passes:
+                if tables is not None:
+                    tables[result.amplitude].apply(result)
+                written = time.perf_counter_ns()
+                if self.writer is not None:
+                    self.writer.add(result)
+                if self.writeText:
+                    result.writeText()
+                self.engine.timer.addPass(WRITE, time.perf_counter_ns() - written)
+                self.messages.put(("result", result))
+            self.completed = True
+        except SweepCancelled:
+            self.failure = "cancelled"
+            self.messages.put(("cancelled",))
+        except (RuntimeError, ValueError) as err:
+            self.failure = str(err)
+            self.messages.put(("error", str(err)))
+        except BaseException as err:
+            self.failure = type(err).__name__ + ": " + str(err)         # Still reported, the GUI must not show it as a saved measurement
+            raise
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+            self.messages.put(("finished", time.time() - initial))
+
+    def passFunction(self, amp, direction):
+        self.messages.put(("pass", amp, direction))
+
+    # Asks the user through the GUI thread and waits for 'answer()' (prompt of the 'Compensation')
+    def prompt(self, text):
+        self.answered.clear()
+        self.messages.put(("prompt", text))
+        self.answered.wait()
+        if self.engine.cancelled.is_set():
+            raise SweepCancelled()
+
+    def answer(self):
+        self.answered.set()
+
+    # Fraction of the plan that is measured (0...1)
+    def progress(self):
+        if self.calibrating:
+            return 0.0
+        return self.engine.points / max(self.plan.pointCount(), 1)
+
+    # Returns all messages that are waiting, never blocks
+    def poll(self):
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def cancel(self):
+        self.engine.cancel()
+        self.answered.set()                                             # A waiting prompt has to wake up to stop
+
+    def pause(self):
+        self.engine.pause()
+
+    def resume(self):
+        self.engine.resume()
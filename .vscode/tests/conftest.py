@@ -0,0 +1,47 @@
+"""
+   Test Setup
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Regression tests of the sweep modules, they run on the simulated AD2 ('dwfSimulator.py'), no hardware or WaveForms installation needed
+   -> Run from the repository folder: python -m pytest -q
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # The modules are flat files next to this folder
+
+from ctypes import *
+from dwfBackend import loadDwf
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+
+import pytest
+import numpy as np
+
+
+# Opens a simulated device and returns (dwf, hdwf), the options go to 'DwfSimulator' (dut, fixture, seed, fail_after, realtime...)
+@pytest.fixture
+def device():
+    def openDevice(**options):
+        options.setdefault("realtime", False)                           # Captures finish at once, the tests only check the logic
+        dwf = loadDwf(simulate=True, **options)
+        hdwf = c_int()
+        dwf.FDwfDeviceOpen(c_int(-1), byref(hdwf))
+        return dwf, hdwf
+    return openDevice
+
+
+# Median relative difference of a host-computed 'result' (broadband, raw) to a point by point sweep of 'dut' at the same frequencies
+@pytest.fixture
+def steppedDifference(device):
+    def difference(dut, plan, result):
+        dwf, hdwf = device(dut=dut, seed=7)
+        stepped = SweepPlan(result.frequency, [result.amplitude], plan.resistance, mode=plan.mode)
+        engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+        engine.configure(stepped)
+        reference = engine.run(stepped)[0]
+        return np.median(np.abs(result.Z() - reference.Z()) / np.abs(reference.Z()))
+    return difference
@@ -0,0 +1,57 @@
+"""
+   Acquisition Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> A capture that never finishes ends with 'AcquisitionTimeout' after the short timeout, not after the capture time
+   -> A capture that hangs once is started again and the point is still measured
+"""
+
+from acquisition import AcquisitionTimeout
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from dwfSimulator import Resistor, storeValue
+
+import time
+import pytest
+import numpy as np
+
+
+def testTimeout(device):
+    dwf, hdwf = device(dut=Resistor(470), realtime=True, transfer_time=5.0, call_latency=0)
+    plan = SweepPlan([1e5], [100])
+    engine = SweepEngine(dwf, hdwf, timeout=0.05, retries=1, settle=FixedSettle(0))
+    engine.configure(plan)
+    engine.start()
+    initial = time.perf_counter()
+    with pytest.raises(AcquisitionTimeout):
+        engine.runPass(plan, 100, "Inc")
+    engine.stop()
+    assert time.perf_counter() - initial < 1.0                          # Two short waits, not the 5s capture
+
+
+def testRetryAfterTimeout(device):
+    dwf, hdwf = device(dut=Resistor(470))
+    status = dwf.FDwfAnalogImpedanceStatus
+    stalled = {"restarts": 0, "polls": 0}
+
+    def stallFirstCapture(handle, psts):                               # The first capture hangs until the engine starts a new one
+        if psts is None:
+            stalled["restarts"] += 1
+        elif stalled["restarts"] == 1:
+            stalled["polls"] += 1
+            storeValue(psts, 3)                                         # DwfStateRunning
+            return 1
+        return status(handle, psts)
+
+    dwf.FDwfAnalogImpedanceStatus = stallFirstCapture
+    plan = SweepPlan([1e5, 2e5], [100])
+    engine = SweepEngine(dwf, hdwf, timeout=0.05, retries=1, settle=FixedSettle(0))
+    engine.configure(plan)
+    engine.start()
+    result = engine.runPass(plan, 100, "Inc")
+    engine.stop()
+    assert stalled["polls"] > 0
+    assert stalled["restarts"] == 3                                     # Two points + one retry
+    assert np.allclose(result.impedance, 470, rtol=0.03)
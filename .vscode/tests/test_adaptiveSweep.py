@@ -0,0 +1,55 @@
+"""
+   Adaptive Sweep Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> The refinement puts the points around the resonance of a crystal and finds fs with a fraction of the points of a dense sweep
+   -> Merging two passes keeps every per-point array
+"""
+
+from sweepEngine import SweepEngine, SweepResult, POINT_FIELDS
+from settlePolicy import FixedSettle
+from adaptiveSweep import AdaptiveSweep, mergeResults
+from dwfSimulator import QuartzCrystal
+
+import math
+import numpy as np
+
+
+def testRefinesAroundResonance(device):
+    crystal = QuartzCrystal()
+    fs = 1 / (2 * math.pi * math.sqrt(crystal.L1 * crystal.C1))
+    fp = fs * math.sqrt(1 + crystal.C1 / crystal.C0)
+    dwf, hdwf = device(dut=crystal)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    sweep = AdaptiveSweep(engine, coarse_points=101, resolution=10.0, max_points=600)
+    result = sweep.run(3.95e6, 4.05e6, 100)
+
+    assert sweep.rounds > 0
+    assert len(result.frequency) <= 600
+    assert np.all(np.diff(result.frequency) > 0)
+    assert len(result.impedance) == len(result.phase) == len(result.frequency)
+    feature = (result.frequency > fs - 2e3) & (result.frequency < fp + 2e3)
+    assert np.count_nonzero(feature) > len(result.frequency) / 2         # 9% of the range holds most of the points
+    assert abs(result.frequency[np.argmin(result.impedance)] - fs) < 20   # A dense 10 Hz sweep would need 10000 points
+
+
+def testMergeKeepsEveryPointArray():
+    first = SweepResult(100, "Inc", 1000, np.array([1.0, 3.0]))
+    second = SweepResult(100, "Inc", 1000, np.array([2.0]))
+    first.impedance[:] = [10, 30]
+    second.impedance[:] = [20]
+    second.reference = np.array([10.0])
+    second.captures = np.array([4])
+    second.deviation = np.array([0.5])
+    second.level = np.array([50.0])
+
+    merged = mergeResults(first, second)
+    assert np.all(merged.frequency == [1, 2, 3])
+    assert np.all(merged.impedance == [10, 20, 30])
+    assert np.all(merged.reference == [1000, 10, 1000])
+    assert np.all(merged.captures == [1, 4, 1])
+    assert np.all(merged.deviation == [0, 0.5, 0])
+    assert np.all(merged.level == [100, 50, 100])
+    assert merged.values is None                                        # Measured by neither pass
+    assert set(POINT_FIELDS) <= set(vars(merged))
@@ -0,0 +1,109 @@
+"""
+   Auto Range Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Auto ranging starts with the reference resistor of the plan and follows |Z| over several decades
+   -> Every range switch is sent to the device, the points are more accurate than with one fixed reference
+   -> The worker measures the missing compensation tables of all ranges with one prompt per standard, outside of the sweep timing,
+      and a cancel during a prompt ends the sweep before any capture
+"""
+
+from dwfSimulator import Capacitor, Resistor, Open, Short
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from autoRange import AutoRange
+from sweepWorker import SweepWorker
+from sweepTimer import SweepTimer
+from compensation import Compensation
+
+import os
+import time
+import numpy as np
+
+
+def relativeError(result, dut):
+    Z = dut.impedance(result.frequency)
+    return np.abs(result.Z() - Z) / np.abs(Z)
+
+
+def testStartsWithPlanResistor(device):
+    dwf, hdwf = device(dut=Resistor(1200))
+    plan = SweepPlan.logarithmic(1e3, 1e4, 10, [100], 1000)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0), ranging=AutoRange())
+    engine.configure(plan)
+    assert engine.ranging.reference() == 1000
+
+    result = engine.run(plan)[0]
+    assert engine.ranging.switches == 0                                 # |Z| is in the band of the chosen resistor, no switch at all
+    assert np.all(result.reference == 1000)
+    assert dwf.opened[hdwf.value]["reference"] == 1000
+
+
+def testFollowsImpedance(device):
+    capacitor = Capacitor(C=100e-9, ESR=0.5)
+    plan = SweepPlan.logarithmic(100, 1e6, 40, [100], 1000)
+
+    dwf, hdwf = device(dut=capacitor)
+    fixed = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    fixed.configure(plan)
+    reference = fixed.run(plan)[0]
+
+    dwf, hdwf = device(dut=capacitor)
+    ranging = AutoRange()
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0), ranging=ranging)
+    engine.configure(plan)
+    result = engine.run(plan)[0]
+
+    assert len(np.unique(result.reference)) >= 4                        # 16 kOhm ... 1.6 Ohm
+    assert ranging.switches == np.count_nonzero(np.diff(result.reference)) + (result.reference[0] != plan.resistance)
+    band = np.abs(np.log10(result.impedance / result.reference))
+    assert np.all(band <= np.log10(np.sqrt(10) * ranging.hysteresis) + 1e-9)   # Every point is measured inside its range
+    assert relativeError(result, capacitor).max() < relativeError(reference, capacitor).max()
+
+
+# Worker of an auto ranging sweep with compensation, returns (dwf, hdwf, engine, worker)
+def makeWorker(device, dut, plan, folder):
+    dwf, hdwf = device(dut=dut)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0), timer=SweepTimer(plan.pointCount()), ranging=AutoRange())
+    engine.configure(plan)
+    return dwf, hdwf, engine, SweepWorker(engine, plan, compensation=Compensation(engine, folder))
+
+
+def testCompensatedWorker(device, tmp_path):
+    dut = Resistor(50)
+    plan = SweepPlan.linear(1e5, 1e6, 50000, 100, 300, 100)
+    dwf, hdwf, engine, worker = makeWorker(device, dut, plan, str(tmp_path))
+    prompts = []
+    worker.start()
+    while worker.is_alive() or not worker.messages.empty():
+        for message in worker.poll():
+            if message[0] == "prompt":                                  # Answered here, like the GUI does on its own thread
+                prompts.append(message[1])
+                dwf.connect(hdwf, Open() if "open" in message[1] else Short() if "Short" in message[1] else dut)
+                worker.answer()
+        time.sleep(0.005)
+    worker.join()
+
+    assert worker.completed
+    assert len(prompts) == 3                                            # Open, short and load once for 3 amplitudes x 6 ranges
+    assert len(os.listdir(str(tmp_path))) == len(plan.amplitudes) * len(engine.ranging.references)
+    assert engine.timer.count == plan.pointCount()                      # The calibration is not in the timing report
+
+
+def testCancelDuringCalibration(device, tmp_path):
+    plan = SweepPlan.linear(1e5, 1e6, 50000, 100, 300, 100)
+    dwf, hdwf, engine, worker = makeWorker(device, Resistor(50), plan, str(tmp_path))
+    worker.start()
+    messages = []
+    while not any(message[0] == "prompt" for message in messages):
+        messages += worker.poll()
+        time.sleep(0.005)
+    worker.cancel()
+    worker.join(2)
+
+    assert not worker.is_alive()
+    assert worker.failure == "cancelled"
+    assert [message[0] for message in worker.poll()] == ["cancelled", "finished"]
+    assert dwf.opened[hdwf.value]["captures"] == 0
@@ -0,0 +1,47 @@
+"""
+   Averaging Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Without a target every point gets all captures, the standard deviation matches the simulated noise
+   -> With a target the averaging stops as soon as the standard error is small enough, so noisy points get more captures than clean ones
+"""
+
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from averaging import WelfordAverage
+from dwfSimulator import Resistor, Capacitor
+
+import math
+import numpy as np
+
+
+def measure(device, dut, plan, averaging):
+    dwf, hdwf = device(dut=dut)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0), averaging=averaging)
+    engine.configure(plan)
+    return engine.run(plan)[0]
+
+
+def testFixedCaptures(device):
+    averaging = WelfordAverage(40)
+    plan = SweepPlan.linear(1e4, 2e4, 1000, 100, 100, 100)
+    result = measure(device, Resistor(1000), plan, averaging)
+
+    assert np.all(result.captures == 40)
+    assert averaging.total == 40 * len(plan.frequencies)
+    assert np.allclose(result.deviation, 1000 * 0.002 * math.sqrt(2), rtol=0.3)     # Simulated noise: 0.2% in gain and in phase
+    assert np.allclose(result.impedance, 1000, rtol=0.002)
+
+
+def testTargetStopsEarly(device):
+    averaging = WelfordAverage(200, target=1e-3)
+    plan = SweepPlan.logarithmic(1e3, 1e7, 9, [100], resistance=100)
+    result = measure(device, Capacitor(10e-9), plan, averaging)      # |Z| = 16k...1.6 Ohm, the noise grows away from the reference
+
+    assert np.all((result.captures >= 3) & (result.captures < 200))
+    assert np.all(result.deviation / np.sqrt(result.captures) <= 1e-3 * result.impedance * 1.0001)
+    assert min(result.captures[0], result.captures[-1]) > 2 * min(result.captures[3:6])
+    assert averaging.total == result.captures.sum()
+    assert np.allclose(result.impedance, 1 / (2 * math.pi * result.frequency * 10e-9), rtol=0.005)
@@ -0,0 +1,69 @@
+"""
+   Broadband Sweep Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Z from one multisine record per amplitude is compared with a point by point sweep of the same DUT (independent of 'dividerImpedance')
+   -> A wrong divider formula is caught by the cross-check, options the record cannot honour are rejected
+   -> A cancel during the setup or before the cross-check ends the sweep
+"""
+
+from sweepEngine import SweepEngine, SweepCancelled
+from sweepPlan import SweepPlan, Segment
+from autoRange import AutoRange
+from dwfSimulator import Capacitor
+
+import broadbandSweep
+import pytest
+
+
+@pytest.mark.parametrize("mode", [0, 8])
+def testMatchesSteppedSweep(device, steppedDifference, mode):
+    capacitor = Capacitor(C=100e-9, ESR=10)
+    plan = SweepPlan.logarithmic(1e3, 1e5, 100, [100, 1000], 1000)
+    plan.mode = mode
+    dwf, hdwf = device(dut=capacitor, seed=1)
+    sweep = broadbandSweep.BroadbandSweep(SweepEngine(dwf, hdwf))
+    results = sweep.run(plan)
+    assert sweep.mismatch < sweep.tolerance
+    assert sweep.points == plan.pointCount()                            # Progress reaches 100%
+    assert steppedDifference(capacitor, plan, results[-1]) < 0.03
+
+
+def testWrongDivider(device, monkeypatch):
+    correct = broadbandSweep.dividerImpedance
+    monkeypatch.setattr(broadbandSweep, "dividerImpedance", lambda C1, C2, resistance, mode: correct(C1, C2, resistance, 1 - min(mode, 1)))
+    dwf, hdwf = device(dut=Capacitor(C=100e-9, ESR=10))
+    with pytest.raises(ValueError, match="point by point"):
+        broadbandSweep.BroadbandSweep(SweepEngine(dwf, hdwf)).run(SweepPlan.logarithmic(1e3, 1e5, 50, [100], 1000))
+
+
+def testRejectedOptions(device):
+    dwf, hdwf = device()
+    plan = SweepPlan.logarithmic(1e3, 1e5, 50, [100], 1000, decrease=True)
+    with pytest.raises(ValueError, match="Decrease"):
+        broadbandSweep.BroadbandSweep(SweepEngine(dwf, hdwf)).run(plan)
+    plan.decrease = False
+    with pytest.raises(ValueError, match="auto range"):
+        broadbandSweep.BroadbandSweep(SweepEngine(dwf, hdwf, ranging=AutoRange())).run(plan)
+    plan = SweepPlan.segmented([Segment(1e3, 1e4, 10, amplitude=50), Segment(2e4, 1e5, 10)], [100])
+    with pytest.raises(ValueError, match="segment amplitudes"):
+        broadbandSweep.BroadbandSweep(SweepEngine(dwf, hdwf)).run(plan)
+
+
+@pytest.mark.parametrize("step, points", [("configure", 0), ("measure", 50)])
+def testCancel(device, step, points):
+    dwf, hdwf = device(dut=Capacitor(C=100e-9, ESR=10))
+    sweep = broadbandSweep.BroadbandSweep(SweepEngine(dwf, hdwf))
+    original = getattr(sweep, step)
+
+    def cancelDuring(*args):                                            # The cancel arrives while the setup or the first record is running
+        value = original(*args)
+        sweep.cancel()
+        return value
+
+    setattr(sweep, step, cancelDuring)
+    with pytest.raises(SweepCancelled):
+        sweep.run(SweepPlan.logarithmic(1e3, 1e5, 50, [100, 200, 300], 1000))
+    assert sweep.points == points                                       # No record after the cancel
+    assert "FDwfAnalogImpedanceStatus" not in dwf.calls                 # and no cross-check
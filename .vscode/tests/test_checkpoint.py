@@ -0,0 +1,106 @@
+"""
+   Checkpoint Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> A sweep stopped by a device error is continued from its checkpoint, finished points are not measured again
+   -> Reconnect during the sweep, cut off records, checkpoints of another plan and 'findCheckpoint'
+   -> The reconnect opens the same device again into the handle of the caller, also when another device is free
+"""
+
+from ctypes import *
+from dwfBackend import openDevice, enumerateDevices
+from acquisition import AcquisitionError
+from dwfSimulator import Resistor
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan, Segment
+from settlePolicy import FixedSettle
+from checkpoint import ResumableSweep, readCheckpoint, findCheckpoint, checkpointPlan
+
+import os
+import pytest
+import numpy as np
+
+
+def makePlan():
+    plan = SweepPlan.segmented([Segment(1e3, 2e3, 5, amplitude=50), Segment(3e3, 4e3, 5)], [100, 200], decrease=True)
+    plan.mode = 1
+    return plan
+
+
+def testResumeAfterCrash(device, tmp_path):
+    filename = str(tmp_path / "impedance_1000Ohm_test.ckpt")
+    plan = makePlan()
+    dwf, hdwf = device(dut=Resistor(470), fail_after=25)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    with pytest.raises(AcquisitionError):
+        ResumableSweep(engine, plan, filename, max_reconnects=0).run()
+    header, records, size = readCheckpoint(filename)
+    assert 0 < len(records) < plan.pointCount()
+    with open(filename, "ab") as f:
+        f.write(b"cut")                                                 # Record cut off by the crash
+
+    dwf, hdwf = device(dut=Resistor(470))                               # New program: the engine is not configured
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    results = ResumableSweep.resume(engine, filename).run()
+
+    assert dwf.opened[hdwf.value]["mode"] == 1                          # Configured from the stored plan
+    assert dwf.opened[hdwf.value]["captures"] == plan.pointCount() - len(records)
+    assert [(result.amplitude, result.direction) for result in results] == [(100, "Inc"), (200, "Inc"), (100, "Dec"), (200, "Dec")]
+    for result in results:
+        assert np.allclose(result.impedance, 470, rtol=0.03)
+        assert np.all(result.level == plan.passAmplitudes(result.amplitude, result.direction))
+    assert os.path.getsize(filename) == readCheckpoint(filename)[2]
+    assert findCheckpoint(str(tmp_path)) is None                        # Complete now
+
+
+def testReconnect(device, tmp_path):
+    plan = SweepPlan.linear(1e3, 5e3, 100, 100, 100, 100)
+    dwf, hdwf = device(dut=Resistor(470), fail_after=20)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+    sweep = ResumableSweep(engine, plan, str(tmp_path / "sweep.ckpt"), max_reconnects=3)
+    results = sweep.run()
+    assert sweep.reconnects == 2
+    assert np.all(results[0].impedance > 0)
+    assert len(readCheckpoint(sweep.filename)[1]) == plan.pointCount()
+
+
+@pytest.mark.parametrize("serial", [None, "SN:SIM000001"])
+def testReopenSameDevice(device, tmp_path, serial):
+    dwf, first = device(dut=Resistor(470), devices=2, fail_after=15)
+    hdwf = c_int()
+    assert openDevice(dwf, hdwf, "SN:SIM000001") == "SN:SIM000001"
+    dwf.FDwfDeviceClose(first)                                          # The first device is free, -1 would open it
+    plan = SweepPlan.linear(1e3, 5e3, 100, 100, 100, 100)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+    sweep = ResumableSweep(engine, plan, str(tmp_path / "sweep.ckpt"), device=serial)
+    results = sweep.run()
+
+    assert sweep.reconnects == 2
+    assert sweep.device == "SN:SIM000001"
+    assert engine.hdwf is hdwf and hdwf.value == 2                      # Still valid for the caller
+    assert [entry["opened"] for entry in enumerateDevices(dwf)] == [False, True]
+    assert np.allclose(results[0].impedance, 470, rtol=0.03)
+
+
+def testOtherPlan(device, tmp_path):
+    filename = str(tmp_path / "sweep.ckpt")
+    dwf, hdwf = device(dut=Resistor(470))
+    ResumableSweep(SweepEngine(dwf, hdwf, settle=FixedSettle(0)), makePlan(), filename).run()
+    with pytest.raises(ValueError):
+        ResumableSweep(SweepEngine(dwf, hdwf), SweepPlan.linear(1e3, 2e3, 100, 100, 100, 100), filename).run()
+
+
+def testFindCheckpoint(device, tmp_path):
+    plan = makePlan()
+    dwf, hdwf = device(dut=Resistor(470), fail_after=7)
+    with pytest.raises(AcquisitionError):
+        ResumableSweep(SweepEngine(dwf, hdwf, settle=FixedSettle(0)), plan, str(tmp_path / "impedance_a.ckpt"), max_reconnects=0).run()
+    (tmp_path / "impedance_broken.ckpt").write_bytes(b"\x00\xff")      # Not a checkpoint
+    (tmp_path / "other.ckpt").write_bytes(b"")
+
+    filename = findCheckpoint(str(tmp_path))
+    assert filename == str(tmp_path / "impedance_a.ckpt")
+    assert checkpointPlan(filename).pointCount() == plan.pointCount()
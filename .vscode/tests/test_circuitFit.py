@@ -0,0 +1,43 @@
+"""
+   Circuit Fit Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> The models recover their own parameters from exact data, the BVD fit recovers the simulated crystal from measured sweeps
+"""
+
+from dwfSimulator import QuartzCrystal
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from circuitFit import BVD, SeriesRLC, ParallelRC, fitSweeps, fitPasses
+
+import pytest
+import numpy as np
+
+
+@pytest.mark.parametrize("model, params, freq", [
+    (BVD(), [25.0, 0.1247, 12.7e-15, 4.7e-12], np.linspace(3.98e6, 4.02e6, 400)),
+    (SeriesRLC(), [5.0, 1e-3, 1e-9], np.geomspace(1e4, 1e6, 200)),
+    (ParallelRC(), [1e4, 1e-9], np.geomspace(1e3, 1e6, 200)),
+])
+def testExactData(model, params, freq):
+    Z = model.impedance(np.array([params]), 2 * np.pi * freq)
+    fitted, cost, converged = fitSweeps(freq, Z, model)
+    assert converged[0]
+    assert np.allclose(fitted[0], params, rtol=1e-4)
+
+
+def testMeasuredCrystal(device):
+    crystal = QuartzCrystal()
+    dwf, hdwf = device(dut=crystal)
+    plan = SweepPlan.linear(3.98e6, 4.02e6, 200, 100, 300, 100, decrease=True)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+    results = engine.run(plan)
+
+    fitted, cost, converged = fitPasses(results)                       # All amplitudes and directions in one batch
+    assert np.all(converged)
+    ratio = fitted / np.array([crystal.R1, crystal.L1, crystal.C1, crystal.C0])
+    assert np.all(np.abs(ratio[:, 0] - 1) < 0.08)                       # R1 is only a small part of |Z| off resonance
+    assert np.all(np.abs(ratio[:, 1:] - 1) < 0.002)
@@ -0,0 +1,83 @@
+"""
+   Compensation Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> 'CompensationTable.correct' removes the simulated fixture from whole arrays of sweeps
+   -> Measured tables take the fixture out of a sweep with a high and with a low impedance
+   -> Cached tables are used again, only missing ones are measured and every standard is asked for once
+"""
+
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from compensation import Compensation, CompensationTable
+from dwfSimulator import Resistor, Capacitor, Open, Short, Fixture
+
+import os
+import pytest
+import numpy as np
+
+
+# Engine with 'dut' behind a fixture and a 'Compensation' whose prompts connect the standards, returns (engine, compensation, prompts)
+def makeCompensation(device, dut, folder):
+    dwf, hdwf = device(dut=dut, fixture=Fixture(Cp=20e-12, Rs=0.5, Ls=200e-9))
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    prompts = []
+
+    def connect(text):
+        prompts.append(text)
+        dwf.connect(hdwf, Open() if "open" in text else Short() if "Short" in text else dut)
+
+    return engine, Compensation(engine, folder, prompt=connect), prompts
+
+
+# Table of the exact open and short standards behind 'fixture' on the grid 'freq'
+def fixtureTable(fixture, freq):
+    return CompensationTable(freq, fixture.apply(Open().impedance(freq), freq), fixture.apply(Short().impedance(freq), freq))
+
+
+def testCorrect():
+    fixture = Fixture(Cp=20e-12, Rs=0, Ls=0)                             # Only the stray capacitance, the open/short model is exact then
+    freq = np.geomspace(1e3, 1e6, 50)
+    duts = np.array([Resistor(10e3).impedance(freq), Capacitor(1e-9).impedance(freq)])
+    measured = fixture.apply(duts, freq)
+
+    assert np.max(np.abs(measured / duts - 1)) > 0.5
+    assert np.allclose(fixtureTable(fixture, freq).correct(measured, freq), duts, rtol=1e-9)      # Both sweeps at once
+    assert np.allclose(fixtureTable(fixture, np.geomspace(1e3, 1e6, 41)).correct(measured, freq), duts, rtol=0.01)   # Interpolated, default grid
+
+
+@pytest.mark.parametrize("R, reference", [(10e3, 10000), (5, 10)])
+def testFixtureRemoved(device, tmp_path, R, reference):
+    dut = Resistor(R)
+    engine, compensation, prompts = makeCompensation(device, dut, str(tmp_path))
+    plan = SweepPlan.logarithmic(1e4, 1e6, 30, [100], resistance=reference)
+    tables = compensation.tables(plan)
+    engine.configure(plan)
+    result = engine.run(plan)[0]
+    error = np.abs(result.Z() / dut.impedance(result.frequency) - 1)
+    assert np.max(error) > 0.2
+
+    tables[100].apply(result)
+    error = np.abs(result.Z() / dut.impedance(result.frequency) - 1)
+    assert np.max(error) < 0.02
+    assert len(prompts) == 3
+
+
+def testCache(device, tmp_path):
+    engine, compensation, prompts = makeCompensation(device, Resistor(1000), str(tmp_path))
+    plan = SweepPlan.logarithmic(1e4, 1e5, 10, [100, 200])
+    compensation.tables(plan)
+    assert len(prompts) == 3                                            # Open, short and load once for both amplitudes
+    assert sorted(os.listdir(str(tmp_path))) == ["mode8_1000Ohm_100mV.npz", "mode8_1000Ohm_200mV.npz"]
+
+    engine, compensation, prompts = makeCompensation(device, Resistor(1000), str(tmp_path))
+    tables = compensation.tables(plan)
+    assert prompts == [] and compensation.measured == 0
+    assert tables[200].key == "mode8_1000Ohm_200mV"
+
+    compensation.tables(SweepPlan.logarithmic(1e4, 1e5, 10, [100, 300]))
+    assert len(prompts) == 3 and compensation.measured == 1             # Only 300mV was missing
+    compensation.tables(SweepPlan.logarithmic(1e4, 1e6, 10, [100]))
+    assert compensation.measured == 2                                   # The cached table does not cover 1MHz
@@ -0,0 +1,59 @@
+"""
+   Device Config Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Settings that did not change are not sent again, also across passes
+   -> Batch mode applies the settings of every point with ONE configure and the captures still use the new settings
+"""
+
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from deviceConfig import DeviceConfig
+from dwfSimulator import Capacitor
+
+import math
+import numpy as np
+
+
+# Runs the plan after its configuration, returns the engine, the results and the setting/configure calls of the sweep
+def measure(device, plan, batch):
+    dwf, hdwf = device(dut=Capacitor(100e-9))
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0), batch=batch)
+    engine.configure(plan)
+    dwf.calls.clear()
+    results = engine.run(plan)
+    calls = {name: count for name, count in dwf.calls.items() if name.endswith("Set") or name.endswith("Configure")}
+    return engine, results, calls
+
+
+def testSkipsUnchangedSettings(device):
+    dwf, hdwf = device()
+    config = DeviceConfig(dwf, hdwf)
+    assert config.set("frequency", 1e3)
+    assert not config.set("frequency", 1e3)
+    assert config.set("frequency", 2e3)
+    config.invalidate()
+    assert config.set("frequency", 2e3)                                 # The device state is unknown again
+    assert dwf.calls["FDwfAnalogImpedanceFrequencySet"] == 3
+    assert (config.sent, config.skipped) == (3, 1)
+
+
+def testImmediateMode(device):
+    plan = SweepPlan.linear(1e3, 1.9e3, 100, 100, 100, 100, resistance=100, decrease=True)
+    engine, results, calls = measure(device, plan, False)
+
+    assert calls == {"FDwfAnalogImpedanceFrequencySet": 19, "FDwfAnalogImpedanceAmplitudeSet": 1, "FDwfAnalogImpedanceConfigure": 2}
+    assert engine.config.skipped == 2                                   # The amplitude and the turning point of the Dec pass
+
+
+def testBatchMode(device):
+    plan = SweepPlan.linear(1e3, 1.9e3, 100, 100, 200, 100, resistance=100)
+    engine, results, calls = measure(device, plan, True)
+
+    assert engine.dwf.opened[engine.hdwf.value]["auto"] == 0
+    assert calls == {"FDwfAnalogImpedanceFrequencySet": 20, "FDwfAnalogImpedanceAmplitudeSet": 2, "FDwfAnalogImpedanceConfigure": 22}   # Start, stop + one per point
+    for result in results:
+        assert np.allclose(result.impedance, 1 / (2 * math.pi * result.frequency * 100e-9), rtol=0.03)
+        assert np.allclose(result.phase, -90, atol=2)
@@ -0,0 +1,61 @@
+"""
+   Raw Capture Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Z demodulated on the host from the stored waveforms is compared with a point by point sweep of the same DUT
+   -> 'reanalyse' gives the same values from the raw file, options the raw file cannot honour are rejected
+   -> A cancel during the setup or a pass ends the sweep
+"""
+
+from sweepEngine import SweepEngine, SweepCancelled
+from sweepPlan import SweepPlan, Segment
+from autoRange import AutoRange
+from rawCapture import RawSweep, reanalyse
+from dwfSimulator import QuartzCrystal, Resistor
+
+import pytest
+import numpy as np
+
+
+def testMatchesSteppedSweep(device, steppedDifference, tmp_path):
+    crystal = QuartzCrystal()
+    filename = str(tmp_path / "raw.npy")
+    plan = SweepPlan.linear(3.99e6, 4.01e6, 500, 100, 200, 100, 1000, decrease=True)
+    dwf, hdwf = device(dut=crystal, seed=1)
+    results = RawSweep(SweepEngine(dwf, hdwf), filename).run(plan)
+    assert [(result.amplitude, result.direction) for result in results] == [(100, "Inc"), (200, "Inc"), (100, "Dec"), (200, "Dec")]
+    assert steppedDifference(crystal, plan, results[1]) < 0.01
+
+    again = reanalyse(filename)                                         # Same window and periods as the sweep
+    assert len(again) == len(results)
+    for result, stored in zip(results, again):
+        assert np.all(stored.frequency == result.frequency)
+        assert np.allclose(stored.Z(), result.Z(), rtol=1e-9)
+
+
+def testRejectedOptions(device, tmp_path):
+    dwf, hdwf = device()
+    plan = SweepPlan.logarithmic(1e3, 1e5, 50, [100], 1000)
+    with pytest.raises(ValueError, match="auto range"):
+        RawSweep(SweepEngine(dwf, hdwf, ranging=AutoRange()), str(tmp_path / "raw.npy")).run(plan)
+    plan = SweepPlan.segmented([Segment(1e3, 1e4, 10, amplitude=50), Segment(2e4, 1e5, 10)], [100])
+    with pytest.raises(ValueError, match="segment amplitudes"):
+        RawSweep(SweepEngine(dwf, hdwf), str(tmp_path / "raw.npy")).run(plan)
+
+
+@pytest.mark.parametrize("step, points", [("configure", 0), ("runPass", 11)])
+def testCancel(device, tmp_path, step, points):
+    dwf, hdwf = device(dut=Resistor(470))
+    sweep = RawSweep(SweepEngine(dwf, hdwf), str(tmp_path / "raw.npy"))
+    original = getattr(sweep, step)
+
+    def cancelDuring(*args):                                            # The cancel arrives while the setup or the first pass is running
+        value = original(*args)
+        sweep.cancel()
+        return value
+
+    setattr(sweep, step, cancelDuring)
+    with pytest.raises(SweepCancelled):
+        sweep.run(SweepPlan.linear(1e4, 2e4, 1000, 100, 300, 100))
+    assert sweep.points == points
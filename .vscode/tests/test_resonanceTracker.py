@@ -0,0 +1,57 @@
+"""
+   Resonance Tracker Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> 'locate' finds fs and fp of the simulated crystal within the tolerance and its BVD parameters within 1%, with a few dozen captures
+   -> 'track' follows a resonance that moved
+"""
+
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from resonanceTracker import ResonanceTracker
+from dwfSimulator import QuartzCrystal
+
+import math
+import pytest
+
+
+# Series and parallel resonance of the BVD model
+def resonances(crystal):
+    fs = 1 / (2 * math.pi * math.sqrt(crystal.L1 * crystal.C1))
+    return fs, fs * math.sqrt(1 + crystal.C1 / crystal.C0)
+
+
+def makeTracker(device, crystal):
+    dwf, hdwf = device(dut=crystal)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(SweepPlan([4e6], [100], resistance=100))
+    return dwf, hdwf, ResonanceTracker(engine)
+
+
+def testLocate(device):
+    crystal = QuartzCrystal()
+    fs, fp = resonances(crystal)
+    dwf, hdwf, tracker = makeTracker(device, crystal)
+    found = tracker.locate(3.99e6, 4.02e6)
+
+    assert found["fs"] == pytest.approx(fs, abs=tracker.tolerance)
+    assert found["fp"] == pytest.approx(fp, abs=tracker.tolerance)
+    for name in ("ESR", "C0", "C1", "L1"):
+        assert found[name] == pytest.approx(getattr(crystal, "R1" if name == "ESR" else name), rel=0.01)
+    assert found["captures"] < 60                                       # A sweep with 1 Hz steps would need 30000
+
+
+def testTrack(device):
+    crystal = QuartzCrystal()
+    dwf, hdwf, tracker = makeTracker(device, crystal)
+    tracker.locate(3.99e6, 4.02e6)
+    moved = QuartzCrystal(L1=crystal.L1 * (1 - 2e-3))                  # fs moves up by 4kHz
+    dwf.connect(hdwf, moved)
+    fs, fp = resonances(moved)
+    found = tracker.track()
+
+    assert found["fs"] == pytest.approx(fs, abs=tracker.tolerance)
+    assert found["fp"] == pytest.approx(fp, abs=tracker.tolerance)
+    assert len(tracker.history) == 2
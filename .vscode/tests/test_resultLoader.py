@@ -0,0 +1,75 @@
+"""
+   Result Loader Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> 'SweepArchive' maps the columns of a container and gives every pass (and frequency window) the values that were written
+   -> Classic text files: a real measurement is converted once, read back and exported to text again
+"""
+
+from dwfSimulator import QuartzCrystal
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan, Segment
+from settlePolicy import FixedSettle
+from averaging import WelfordAverage
+from resultWriter import ResultWriter, exportText
+from resultLoader import SweepArchive, openArchive, ingestText
+
+import os
+import shutil
+import numpy as np
+
+
+LEGACY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "experiments", "Measurements", "05-01")
+
+
+def testArchive(device, tmp_path):
+    dwf, hdwf = device(dut=QuartzCrystal())
+    plan = SweepPlan.segmented([Segment(3.99e6, 4.0e6, 20, amplitude=50), Segment(4.001e6, 4.01e6, 20)], [100, 200], decrease=True)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0), averaging=WelfordAverage(3))
+    engine.configure(plan)
+    results = engine.run(plan)
+    filename = str(tmp_path / "sweep.npz")
+    with ResultWriter(filename, metadata={"mode": plan.mode}) as writer:
+        for result in results:
+            writer.add(result)
+
+    with SweepArchive(filename) as archive:
+        assert archive.metadata["mode"] == plan.mode
+        assert archive.metadata["points"] == plan.pointCount()
+        assert len(archive.passes) == 4
+        for result in results:
+            view = archive.sweep(result.amplitude, result.direction)
+            assert isinstance(view.column("frequency"), np.memmap)
+            assert np.all(view.frequency == result.frequency)
+            assert np.allclose(view.Z, result.Z(), rtol=1e-12)
+            assert np.allclose(view.impedance, result.impedance, rtol=1e-12)
+            assert np.all(view.deviation == result.deviation)
+            assert np.all(view.level == result.level)
+            assert np.all(view.reference == plan.resistance)
+            part = view.window(3.995e6, 4.005e6)
+            assert len(part) > 0 and np.all((part.frequency >= 3.995e6) & (part.frequency <= 4.005e6))
+            assert np.all(view.column("captures") == 3)
+
+
+def testLegacyText(tmp_path):
+    source = str(tmp_path / "impedance_100mV_1000Ohm_Dec.txt")
+    shutil.copy(os.path.join(LEGACY, "impedance_100mV_1000Ohm_Dec.txt"), source)
+    data = np.loadtxt(source)
+
+    cache = ingestText(source)
+    assert cache == str(tmp_path / "impedance_100mV_1000Ohm_Dec.npz")
+    assert ingestText(source) == cache                                  # Converted only once
+    with openArchive(source) as archive:
+        view = archive.sweep(100, "Dec")
+        assert view.resistance == 1000
+        assert np.all(view.frequency == data[:, 0])
+        assert np.allclose(view.impedance, data[:, 1], rtol=1e-12)
+        assert np.allclose(view.phase, data[:, 2], rtol=1e-9)
+        assert np.all(view.level == 100)                                # Older columns fall back to the pass amplitude
+
+    folder = tmp_path / "export"
+    folder.mkdir()
+    names = exportText(cache, str(folder))
+    assert [os.path.basename(name) for name in names] == ["impedance_100mV_1000Ohm_Dec.txt"]
+    assert np.allclose(np.loadtxt(names[0]), data, rtol=1e-9)
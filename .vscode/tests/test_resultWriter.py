@@ -0,0 +1,62 @@
+"""
+   Result Writer Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Every column of the binary container holds exactly what the sweep measured, also when the columns have to grow
+   -> 'exportText' writes the classic text files with the values of the container
+"""
+
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from resultWriter import ResultWriter, readContainer, exportText
+from dwfSimulator import Capacitor
+
+import os
+import numpy as np
+
+
+# Measures a small Inc/Dec ladder, returns the results and the container written with a too small capacity
+def measure(device, filename):
+    dwf, hdwf = device(dut=Capacitor(100e-9))
+    plan = SweepPlan.linear(1e3, 2e3, 250, 100, 200, 100, resistance=100, decrease=True)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+    results = engine.run(plan)
+    with ResultWriter(filename, 3, {"mode": plan.mode}) as writer:
+        for result in results:
+            writer.add(result)
+    return results
+
+
+def testRoundTrip(device, tmp_path):
+    filename = str(tmp_path / "sweep.npz")
+    results = measure(device, filename)
+    columns, metadata = readContainer(filename)
+
+    assert metadata["mode"] == 8
+    assert metadata["points"] == 20
+    assert [entry[:3] for entry in metadata["passes"]] == [[100, 100, 0], [200, 100, 0], [100, 100, 1], [200, 100, 1]]
+    assert np.all(columns["frequency"] == np.concatenate([result.frequency for result in results]))
+    assert np.allclose(columns["impedance"], np.concatenate([result.Z() for result in results]), rtol=1e-12)
+    assert np.all(columns["amplitude"] == np.repeat([100, 200, 100, 200], 5))
+    assert np.all(columns["direction"] == np.repeat([0, 1], 10))
+    assert np.all(columns["timestamp"] == np.concatenate([result.timestamp for result in results]))
+    assert np.all(columns["resistance"] == 100)
+    assert np.all(columns["reference"] == 100)
+    assert np.all(columns["captures"] == 1)
+
+
+def testExportText(device, tmp_path):
+    filename = str(tmp_path / "sweep.npz")
+    results = measure(device, filename)
+    names = exportText(filename, str(tmp_path))
+
+    assert [os.path.basename(name) for name in names] == ["impedance_100mV_100Ohm_Inc.txt", "impedance_200mV_100Ohm_Inc.txt",
+                                                          "impedance_100mV_100Ohm_Dec.txt", "impedance_200mV_100Ohm_Dec.txt"]
+    for name, result in zip(names, results):
+        data = np.loadtxt(name)
+        assert np.all(data[:, 0] == result.frequency)
+        assert np.allclose(data[:, 1], result.impedance, rtol=1e-12)
+        assert np.allclose(data[:, 2], result.phase, rtol=1e-9)
@@ -0,0 +1,33 @@
+"""
+   Sweep Engine Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Pass order and values of Inc/Dec sweeps of the headless sweep engine
+"""
+
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan
+from settlePolicy import FixedSettle
+from dwfSimulator import Resistor
+
+import numpy as np
+
+
+def testIncreaseAndDecrease(device):
+    dwf, hdwf = device(dut=Resistor(470))
+    plan = SweepPlan.linear(1e3, 2e3, 100, 100, 200, 100, decrease=True)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+    passes = []
+    results = engine.run(plan, lambda amp, direction: passes.append((amp, direction)))
+
+    assert passes == [(100, "Inc"), (200, "Inc"), (100, "Dec"), (200, "Dec")]
+    assert [(result.amplitude, result.direction) for result in results] == passes
+    assert np.all(results[0].frequency == plan.frequencies)
+    assert np.all(results[2].frequency == plan.frequencies[::-1])
+    assert engine.points == plan.pointCount()
+    for result in results:
+        assert np.allclose(result.impedance, 470, rtol=0.03)
+        assert np.all(np.abs(result.phase) < 2)
+        assert np.all(np.diff(result.timestamp) >= 0)
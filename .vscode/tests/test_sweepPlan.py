@@ -0,0 +1,73 @@
+"""
+   Sweep Plan Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> Linear plans with sub-Hz steps reach the device without rounding drift
+   -> Segmented plans measure a point shared by two segments once, with the amplitude and averaging of the first segment
+   -> List and logarithmic plans
+"""
+
+from sweepEngine import SweepEngine
+from sweepPlan import SweepPlan, Segment
+from settlePolicy import FixedSettle
+from dwfSimulator import Resistor
+
+import pytest
+import numpy as np
+
+
+# Runs the plan on the simulator, returns the results and (frequency [Hz], amplitude [mV]) of every capture
+def measure(device, plan):
+    dwf, hdwf = device(dut=Resistor(470))
+    captures = []
+    acquire = dwf.acquire
+
+    def logCapture(dev):
+        captures.append((dev["frequency"], round(dev["amplitude"] * 1000, 6)))
+        return acquire(dev)
+
+    dwf.acquire = logCapture
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+    return engine.run(plan), captures
+
+
+def testSubHertzSteps(device):
+    plan = SweepPlan.linear(1000, 1002, 0.25, 100, 100, 100)
+    results, captures = measure(device, plan)
+
+    expected = [1000, 1000.25, 1000.5, 1000.75, 1001, 1001.25, 1001.5, 1001.75, 1002]
+    assert plan.frequencies.tolist() == expected                        # The end is on the grid and included, no accumulated error
+    assert [freq for freq, amp in captures] == expected
+    assert results[0].frequency.tolist() == expected
+    assert len(SweepPlan.linear(1000, 1001, 0.1, 100, 100, 100).frequencies) == 11
+
+
+def testSegmentBorders(device):
+    segments = [Segment(2e3, 4e3, 3, amplitude=50), Segment(1e3, 2e3, 5, averages=2)]     # Unsorted on purpose
+    plan = SweepPlan.segmented(segments, [100], decrease=True)
+    results, captures = measure(device, plan)
+
+    assert plan.frequencies.tolist() == [1000, 1250, 1500, 1750, 2000, 3000, 4000]
+    assert plan.averages.tolist() == [2, 2, 2, 2, 2, 1, 1]              # 2kHz belongs to the first segment
+    assert plan.passAmplitudes(100, "Inc").tolist() == [100, 100, 100, 100, 100, 50, 50]
+    assert plan.captureCount() == 2 * 12
+    inc = [(1000, 100)] * 2 + [(1250, 100)] * 2 + [(1500, 100)] * 2 + [(1750, 100)] * 2 + [(2000, 100)] * 2 + [(3000, 50), (4000, 50)]
+    assert captures == inc + inc[::-1]
+    assert results[1].level.tolist() == [50, 50, 100, 100, 100, 100, 100]
+    assert results[1].captures.tolist() == [1, 1, 2, 2, 2, 2, 2]
+
+
+def testOverlappingSegments():
+    with pytest.raises(ValueError):
+        SweepPlan.segmented([Segment(1e3, 3e3, 5), Segment(2e3, 4e3, 5)], [100])
+
+
+def testListAndLogarithmic():
+    plan = SweepPlan.fromList([3e3, 1e3, 2e3, 1e3], [100, 200])
+    assert plan.frequencies.tolist() == [1e3, 2e3, 3e3]
+    assert plan.pointCount() == 6
+    plan = SweepPlan.logarithmic(1e2, 1e6, 5, [100], decrease=True)
+    assert np.allclose(plan.frequencies, [1e2, 1e3, 1e4, 1e5, 1e6])
+    assert plan.passFrequencies("Dec")[0] == 1e6
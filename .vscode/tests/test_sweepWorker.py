@@ -0,0 +1,95 @@
+"""
+   Sweep Worker Tests
+   Author:  Lars Lindner
+   Revision:  18/10/2026
+
+   -> A cancel finishes the point in progress and starts no new one
+   -> The worker reports every pass and result and "finished" last, 'completed' is only set if the whole plan was measured
+   -> A cancelled or failed sweep says why in 'failure'
+"""
+
+from sweepEngine import SweepEngine, SweepCancelled
+from sweepPlan import SweepPlan
+from sweepWorker import SweepWorker
+from settlePolicy import FixedSettle
+from resultWriter import ResultWriter, readContainer
+from dwfSimulator import Resistor
+
+import time
+import pytest
+
+
+# Runs the worker to its end and returns all its messages
+def runWorker(worker, onMessage=None):
+    worker.start()
+    messages = []
+    while worker.is_alive() or not worker.messages.empty():
+        for message in worker.poll():
+            messages.append(message)
+            if onMessage is not None:
+                onMessage(message)
+        time.sleep(0.005)
+    worker.join()
+    return messages
+
+
+def testCancel(device):
+    dwf, hdwf = device(dut=Resistor(470))
+    plan = SweepPlan.linear(1e3, 2e3, 100, 100, 100, 100)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+
+    def onPoint(result, i):
+        if i == 2:
+            engine.cancel()
+
+    engine.start()
+    with pytest.raises(SweepCancelled):
+        engine.runPass(plan, 100, "Inc", onPoint=onPoint)
+    engine.stop()
+    assert engine.index == 3                                            # The point in progress is finished, no new one starts
+    assert engine.points == 3
+
+
+def testCompleted(device, tmp_path):
+    dwf, hdwf = device(dut=Resistor(470))
+    plan = SweepPlan.linear(1e3, 2e3, 100, 100, 200, 100, decrease=True)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+    filename = str(tmp_path / "sweep.npz")
+    worker = SweepWorker(engine, plan, ResultWriter(filename, plan.pointCount()))
+    messages = runWorker(worker)
+
+    assert [message[0] for message in messages] == ["pass", "result"] * 4 + ["finished"]
+    assert worker.completed and worker.failure is None
+    assert worker.progress() == 1.0
+    columns, metadata = readContainer(filename)
+    assert metadata["points"] == plan.pointCount()
+
+
+def testCancelledWorker(device, tmp_path):
+    dwf, hdwf = device(dut=Resistor(470), realtime=True)
+    plan = SweepPlan.linear(1e3, 5e3, 100, 100, 300, 100)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0))
+    engine.configure(plan)
+    filename = str(tmp_path / "sweep.npz")
+    worker = SweepWorker(engine, plan, ResultWriter(filename))
+    messages = runWorker(worker, lambda message: worker.cancel() if message[0] == "pass" else None)
+
+    assert ("cancelled",) in messages
+    assert messages[-1][0] == "finished"
+    assert not worker.completed and worker.failure == "cancelled"
+    assert engine.points < plan.pointCount()
+
+
+def testFailure(device):
+    dwf, hdwf = device(dut=Resistor(470), fail_after=5)
+    plan = SweepPlan.linear(1e3, 2e3, 100, 100, 100, 100)
+    engine = SweepEngine(dwf, hdwf, settle=FixedSettle(0), retries=0)
+    engine.configure(plan)
+    worker = SweepWorker(engine, plan)
+    messages = runWorker(worker)
+
+    assert [message[0] for message in messages] == ["pass", "error", "finished"]
+    assert not worker.completed
+    assert "failed" in worker.failure